@@ -0,0 +1,343 @@
+import os
+
+from numpy import (
+    arange, array, bincount, concatenate, cumsum, errstate, full, isinf,
+    isnan, isnat, median, nan, repeat, stack, where,
+)
+from pandas import DataFrame, MultiIndex, concat
+from src.columnar import is_fresh
+from src.metrics import get_registry
+from src.rolling import rolling_medians
+from src.stock import get_discount_factors
+from src.summaries import INDEX, to_rows
+
+KEYS = ['TICKER', 'YEAR']
+
+
+def get_prototype(stock):
+    """an instance of stock that only answers questions about its class"""
+    return stock(analyze=False)
+
+def get_tickers(stock, filenames):
+    """return {ticker: filename} keeping the last file of every ticker
+       like a summary table keeps the last row
+    """
+    prototype = get_prototype(stock)
+    return {prototype.get_ticker(filename): filename for filename in filenames}
+
+def collect_net_values(stock, filenames, store=None):
+    """return the net values the moving averages are taken over indexed by
+       (TICKER, YEAR), read one ticker at a time, and the filenames that
+       could not be read
+    """
+    frames, failed = {}, []
+    for filename in filenames:
+        try:
+            frames[filename] = stock(
+                filename=filename, store=store, analyze=False
+            ).get_moving_average_data()
+        except Exception:
+            failed.append(filename)
+    if not frames:
+        return None, failed
+    tickers = get_tickers(stock, frames)
+    return concat(
+        {ticker: frames[filename] for ticker, filename in tickers.items()},
+        names=KEYS,
+    ), failed
+
+def get_layout(prototype, record, needed):
+    """return the stored keys of the index, the doc type and the needed
+       columns of a stored file, or None when they do not fit the batch
+    """
+    if record['index'][2] != 'datetime64[ns]':
+        return
+    mapping = prototype.columns_mapping()
+    doc_type = prototype.doc_type().upper()
+    keys, doc_types = {}, []
+    for column, _, kind, key in record['columns']:
+        name = mapping.get(column.upper(), column.upper())
+        if name == doc_type and kind == 'str':
+            doc_types.append(key)
+        elif name in needed and kind == 'float64':
+            if name in keys:
+                return
+            keys[name] = key
+    if len(doc_types) != 1 or set(keys) != needed:
+        return
+    return record['index'][3], doc_types[0], tuple(sorted(keys.items()))
+
+def read_stored_net_values(stock, store, filenames):
+    """return annual net values indexed by (TICKER, YEAR) for filenames read
+       column by column from store for every file at once, and the filenames
+       left for the per ticker path, those not stored, changed since the
+       store was built or with columns that do not fit
+    """
+    prototype = get_prototype(stock)
+    registry = get_registry(prototype, 'net_value_metrics')
+    names = registry.names()
+    needed = set(registry.get_columns(names))
+    header = store.get_header()
+    tickers = get_tickers(stock, filenames)
+
+    layouts, left = {}, []
+    for ticker, filename in tickers.items():
+        record = header['files'].get(filename)
+        layout = None
+        if (
+            record is not None
+            and record['stop'] - record['start'] > 1
+            and is_fresh(
+                os.path.join(header['source'], filename), record['fingerprint']
+            )
+        ):
+            layout = get_layout(prototype, record, needed)
+        if layout is None:
+            left.append(filename)
+        else:
+            layouts.setdefault(layout, []).append((ticker, record))
+
+    frames = []
+    for (index_key, doc_key, keys), files in layouts.items():
+        rows = concatenate([
+            arange(record['start'], record['stop']) for _, record in files
+        ])
+        owners = repeat(
+            arange(len(files)),
+            [record['stop'] - record['start'] for _, record in files],
+        )
+        annual = (
+            (store.get_array(doc_key)[rows] == '10-K')
+          & ~store.get_array(f'{doc_key}_null')[rows]
+        )
+        rows, owners = rows[annual], owners[annual]
+        years = store.get_array(index_key)[rows]
+        undated = bincount(owners[isnat(years)], minlength=len(files)) > 0
+        left += [tickers[files[owner][0]] for owner in undated.nonzero()[0]]
+        rows, owners, years = (
+            rows[~undated[owners]], owners[~undated[owners]],
+            years[~undated[owners]],
+        )
+        columns = {}
+        for name, key in keys:
+            values = store.get_array(key)[rows]
+            columns[name] = where(isnan(values) | isinf(values), 0.0, values)
+        frames.append(DataFrame(
+            {
+                name: values if hasattr(values, 'shape')
+                else full(len(rows), values)
+                for name, values in registry.evaluate_arrays(
+                    columns, names
+                ).items()
+            },
+            index=MultiIndex.from_arrays(
+                [
+                    array([ticker for ticker, _ in files])[owners],
+                    years.astype('datetime64[Y]').astype('int64') + 1970,
+                ],
+                names=KEYS,
+            ),
+            columns=names,
+        ))
+    if not frames:
+        return None, left
+    return concat(frames), left
+
+def pad(net_values):
+    """return tickers, row counts and a (tickers, rows, metrics) array of
+       net_values with the rows of every ticker first and nan after them
+    """
+    labels = net_values.index.get_level_values(0).to_numpy()
+    starts = concatenate([[0], (labels[1:] != labels[:-1]).nonzero()[0] + 1])
+    lengths = concatenate([starts[1:], [len(labels)]]) - starts
+    owners = repeat(arange(len(starts)), lengths)
+    offsets = arange(len(labels)) - starts[owners]
+    values = full((len(starts), lengths.max(), net_values.shape[1]), nan)
+    values[owners, offsets] = net_values.to_numpy(dtype='float64')
+    years = full(values.shape[:2], nan)
+    years[owners, offsets] = net_values.index.get_level_values(1).to_numpy()
+    return labels[starts], lengths, values, years
+
+def get_group_medians(values, lengths):
+    """return the median of values[t, :, :lengths[t]] for every t"""
+    result = full(len(values), nan)
+    for length in set(lengths.tolist()):
+        group = (lengths == length).nonzero()[0]
+        result[group] = median(
+            values[group, :, :length].reshape(len(group), -1), axis=1
+        )
+    return result
+
+def summarize_net_values(stock, net_values, window=5):
+    """return the summaries of every ticker in net_values with at least two
+       rows as one DataFrame with a row per ticker and the columns of
+       Stock.get_summary, and the tickers with fewer rows
+    """
+    summaries, short = summarize_windows(stock, net_values, windows=[window])
+    if summaries is None:
+        return None, short
+    return summaries.loc[window], short
+
+def summarize_windows(stock, net_values, windows=(3, 5, 10)):
+    """return the summaries of net_values for every moving average window
+       indexed by (WINDOW, SYMBOL) and the tickers with fewer than two rows,
+       the rolling medians of all windows are taken in one pass
+    """
+    prototype = get_prototype(stock)
+    tickers, lengths, values, years = pad(net_values)
+    short = tickers[lengths < 2].tolist()
+    keep = lengths >= 2
+    if not keep.any():
+        return None, short
+    windows = list(windows)
+    moving_averages = rolling_medians(values[keep], windows, axis=1)
+    return concat(
+        [
+            summarize_moving_averages(
+                prototype, list(net_values.columns), tickers[keep],
+                lengths[keep], moving_averages[position], years[keep],
+            )
+            for position in range(len(windows))
+        ],
+        keys=windows, names=['WINDOW', INDEX],
+    ), short
+
+@errstate(divide='ignore', invalid='ignore', over='ignore')
+def summarize_moving_averages(prototype, names, tickers, lengths, moving_averages, years):
+    """return a row of Stock.get_summary for every ticker from its padded
+       (tickers, rows, metrics) moving averages
+    """
+    metrics = get_registry(prototype, 'moving_average_metrics')
+    positions = {name: position for position, name in enumerate(names)}
+    ticker_positions = arange(len(tickers))
+    last_rows = lengths - 1
+
+    columns = {name: moving_averages[:, :, positions[name]] for name in names}
+    last = {name: column[ticker_positions, last_rows] for name, column in columns.items()}
+    first = {name: column[:, 0] for name, column in columns.items()}
+
+    growth = {}
+    for name in names:
+        rates = full(len(tickers), nan)
+        for length in set(lengths.tolist()):
+            group = (lengths == length).nonzero()[0]
+            rates[group] = (
+                (last[name][group] / first[name][group])
+             ** (1.0 / (length - 1))
+            ) - 1
+        growth[f'GROWTH_{name}'] = where(isnan(rates) | isinf(rates), 0.0, rates)
+
+    averages = dict(last)
+    averages['NET_TANGIBLE'] = prototype.get_net_tangible(averages)
+    difference_names = get_registry(prototype, 'difference_metrics').names()
+    differences = metrics.evaluate_arrays(averages, difference_names)
+
+    per_share = {
+        f'PER_SHARE_{name}': columns[name] / columns['NET_SHARES']
+        for name in names
+    }
+    factors = get_discount_factors(
+        moving_averages.shape[1], discount_rate=prototype.discount_rate
+    )
+    for key, historic in (
+        ('PER_SHARE_NET_FCF', 'PER_SHARE_DCF_HISTORIC'),
+        ('PER_SHARE_NET_FCF_SHY', 'PER_SHARE_DCF_SHY_HISTORIC'),
+    ):
+        per_share[historic] = cumsum(per_share[key] / factors, axis=1)
+    per_share = {
+        name: column[ticker_positions, last_rows]
+        for name, column in per_share.items()
+    }
+
+    sums = {}
+    for name, column in columns.items():
+        total = 0
+        for row in range(moving_averages.shape[1]):
+            total = total + where(row < lengths, column[:, row], 0.0)
+        sums[name] = total
+    ratio_names = get_registry(prototype, 'ratio_metrics').names()
+    ratios = metrics.evaluate_arrays(sums, ratio_names)
+
+    returns = metrics.evaluate_arrays(columns, [
+        f'RATIO_{value}' for value in prototype.return_ratios()
+    ])
+    summary = {
+        'AVERAGE_GROWTH': median(
+            [growth[f'GROWTH_NET_{value}'] for value in prototype.financial_ratios()],
+            axis=0,
+        ),
+        'AVERAGE_RETURNS': get_group_medians(
+            stack(list(returns.values()), axis=1), lengths
+        ),
+        'AVERAGE_SAFETY': median(
+            [
+                *(differences[f'DIFF_{value}'] for value in prototype.safety_pairs()),
+                averages['NET_WORKING_CAPITAL'],
+            ],
+            axis=0,
+        ),
+        'DATA_END': years[:, 0],
+        'DATA_START': years[:, 1],
+        'PER_SHARE_DCF_FORWARD': per_share['PER_SHARE_NET_FCF'] / prototype.discount_rate,
+        'PER_SHARE_DCF_SHY_FORWARD': per_share['PER_SHARE_NET_FCF_SHY'] / prototype.discount_rate,
+        **differences,
+        **growth,
+        **averages,
+        **per_share,
+        **{
+            f'PER_SHARE_{name}': difference / averages['NET_SHARES']
+            for name, difference in differences.items()
+        },
+        **ratios,
+    }
+    return DataFrame(
+        summary, index=tickers, dtype='float64'
+    ).rename_axis(INDEX)
+
+def get_summary_columns(stock):
+    """return the columns of Stock.get_summary in order without reading a file"""
+    prototype = get_prototype(stock)
+    names = get_registry(prototype, 'net_value_metrics').names()
+    return list(summarize_moving_averages(
+        prototype, names, array(['']), array([2]),
+        full((1, 2, len(names)), 1.0), full((1, 2), nan),
+    ).columns)
+
+def summarize(stock, filenames, store=None, window=5):
+    """return the summaries of filenames as one DataFrame with a row per
+       ticker like Stock.get_summary and the filenames that failed,
+       tickers the batch does not take are summarized one at a time,
+       sources whose annual rows are picked by doc type are read from store
+    """
+    if store is not None and hasattr(stock, 'doc_type'):
+        net_values, left = read_stored_net_values(stock, store, filenames)
+        failed = []
+    else:
+        net_values, failed = collect_net_values(stock, filenames, store=store)
+        left = []
+    summaries, short = (
+        summarize_net_values(stock, net_values, window=window)
+        if net_values is not None else (None, [])
+    )
+    # a summary of fewer than two years is not a row of metrics and an
+    # empty file has nothing to summarize, so neither is tried one at a time
+    tickers = get_tickers(stock, filenames)
+    failed += [tickers[ticker] for ticker in short]
+    source = get_prototype(stock).source_folder()
+    singles = []
+    for filename in left:
+        if os.path.getsize(os.path.join(source, filename)) == 0:
+            failed.append(filename)
+            continue
+        try:
+            result = stock(filename=filename, store=store)
+            singles.append((result.ticker, result.get_summary()))
+        except Exception:
+            failed.append(filename)
+    print(
+        f'::summarized {0 if summaries is None else len(summaries)} tickers '
+        f'in one batch and {len(singles)} one at a time, {len(failed)} failed::'
+    )
+    return concat(
+        [summaries, to_rows(singles)], axis=0, sort=False
+    ).sort_index(), failed
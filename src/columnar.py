@@ -0,0 +1,211 @@
+import csv
+import json
+import os
+
+from numpy import array, asarray, load, nan, savez, stack
+from pandas import DataFrame, Index, concat, read_csv
+from pandas.api.types import is_object_dtype
+from src.utilities import cache_folder, file_fingerprint, makedir
+
+
+def read_raw_csv(filename, index_col=None):
+    return read_csv(
+        filename,
+        header=0,
+        index_col=index_col,
+        parse_dates=True,
+        infer_datetime_format=True,
+        engine="c",
+    )
+
+def read_header(filename):
+    with open(filename, newline='') as in_file:
+        return next(csv.reader(in_file), [])
+
+def is_wanted(name, columns=None):
+    """columns is None for every column, a collection of names
+       or a callable that takes a column name like read_csv's usecols
+    """
+    if columns is None:
+        return True
+    if callable(columns):
+        return columns(name)
+    return name in columns
+
+def cache_filename(filename, variant=None):
+    if variant:
+        return cache_folder(f'{filename}.{variant}.npz')
+    return cache_folder(f'{filename}.npz')
+
+def get_kind(values):
+    """return the block a column is stored in
+       strings are stored as fixed width unicode so they load without pickle,
+       other objects can not be stored
+    """
+    if not is_object_dtype(values.dtype):
+        return values.dtype.name
+    if all(isinstance(value, str) for value in values.dropna()):
+        return 'str'
+    raise ValueError(f'{values.name} holds values that are not strings')
+
+def encode_strings(values):
+    nulls = asarray(values.isna())
+    result = values.to_numpy(dtype=object).copy()
+    result[nulls] = ''
+    return array(result.tolist(), dtype=str), nulls
+
+def decode_strings(values, nulls):
+    result = values.astype(object)
+    result[nulls] = nan
+    return result
+
+def encode_block(kind, columns):
+    if kind == 'str':
+        encoded = [encode_strings(column) for column in columns]
+        return {
+            'block_str': stack([values for values, _ in encoded]).astype(str),
+            'null_str': stack([nulls for _, nulls in encoded]),
+        }
+    block = stack([column.to_numpy() for column in columns])
+    if is_object_dtype(block.dtype):
+        raise ValueError(f'{kind} columns can not be stored without pickle')
+    return {f'block_{kind}': block}
+
+def to_column_arrays(dataframe):
+    """return header metadata and one 2-D array per column data type"""
+    header = {
+        'index': {'name': dataframe.index.name, 'kind': 'native'},
+        'columns': [],
+    }
+    arrays = {'index': dataframe.index.to_numpy()}
+    if is_object_dtype(dataframe.index.dtype):
+        header['index']['kind'] = get_kind(dataframe.index.to_series())
+        arrays['index'], arrays['index_null'] = encode_strings(
+            dataframe.index.to_series()
+        )
+
+    blocks = {}
+    for name in dataframe.columns:
+        kind = get_kind(dataframe[name])
+        header['columns'].append({
+            'name': name, 'kind': kind,
+            'position': len(blocks.setdefault(kind, [])),
+        })
+        blocks[kind].append(dataframe[name])
+    for kind, columns in blocks.items():
+        arrays.update(encode_block(kind, columns))
+    return header, arrays
+
+def decode_index(header, arrays):
+    values = arrays['index']
+    if header['index']['kind'] == 'str':
+        values = decode_strings(values, arrays['index_null'])
+    return Index(values, name=header['index']['name'])
+
+def from_column_arrays(header, arrays, columns=None):
+    """return DataFrame from column arrays, only keeping the named columns"""
+    index = decode_index(header, arrays)
+    wanted = [
+        entry for entry in header['columns']
+        if is_wanted(entry['name'], columns)
+    ]
+    kinds = {}
+    for entry in wanted:
+        kinds.setdefault(entry['kind'], []).append(entry)
+
+    frames = []
+    for kind, entries in kinds.items():
+        block = arrays[f'block_{kind}']
+        positions = [entry['position'] for entry in entries]
+        if len(positions) < len(block):
+            block = block[positions]
+        if kind == 'str':
+            block = decode_strings(block, arrays['null_str'][positions])
+        frames.append(DataFrame(
+            block.T, index=index, dtype=block.dtype,
+            columns=Index([entry['name'] for entry in entries], dtype=object),
+        ))
+
+    names = [entry['name'] for entry in wanted]
+    if not frames:
+        return DataFrame(index=index, columns=names)
+    if len(frames) == 1:
+        return frames[0]
+    return concat(frames, axis=1, copy=False)[names]
+
+def is_fresh(filename, fingerprint):
+    """a cache entry is fresh when the source size matches and either
+       its modification time or its checksum is unchanged, when only the
+       checksum matches the new modification time is set in fingerprint
+       so the file is not hashed again once fingerprint is saved
+    """
+    try:
+        current = file_fingerprint(filename)
+    except FileNotFoundError:
+        return False
+    if current['size'] != fingerprint['size']:
+        return False
+    if current['mtime'] == fingerprint['mtime']:
+        return True
+    if file_fingerprint(filename, checksum=True)['sha1'] != fingerprint['sha1']:
+        return False
+    fingerprint['mtime'] = current['mtime']
+    return True
+
+def read_cache(filename, columns=None, variant=None):
+    """return cached DataFrame for filename or None if missing or stale"""
+    try:
+        with load(
+            cache_filename(filename, variant), allow_pickle=False
+        ) as cached:
+            header = json.loads(str(cached['header']))
+            mtime = header['fingerprint']['mtime']
+            if not is_fresh(filename, header['fingerprint']):
+                return
+            arrays = {key: cached[key] for key in cached.files}
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        return
+    if header['fingerprint']['mtime'] != mtime:
+        # the source was touched but not changed, keep its new time
+        write_cache(
+            filename, from_column_arrays(header, arrays),
+            fingerprint=header['fingerprint'], variant=variant,
+        )
+    return from_column_arrays(header, arrays, columns=columns)
+
+def write_cache(filename, dataframe, fingerprint=None, variant=None):
+    """write dataframe to the cache for filename atomically"""
+    if fingerprint is None:
+        fingerprint = file_fingerprint(filename, checksum=True)
+    header, arrays = to_column_arrays(dataframe)
+    header['fingerprint'] = fingerprint
+    target = cache_filename(filename, variant)
+    makedir(os.path.dirname(target))
+    temporary = f'{target}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as out_file:
+        savez(out_file, header=json.dumps(header), **arrays)
+    os.replace(temporary, target)
+
+def cached_read(filename, reader, columns=None, variant=None):
+    """return DataFrame for filename from the cache,
+       calling reader and refreshing the cache when it is stale
+       variant keeps readers that return different frames apart
+    """
+    result = read_cache(filename, columns=columns, variant=variant)
+    if result is None:
+        fingerprint = file_fingerprint(filename, checksum=True)
+        result = reader()
+        if result is not None:
+            try:
+                write_cache(
+                    filename, result, fingerprint=fingerprint, variant=variant
+                )
+            except ValueError:
+                # columns of other objects are read from the source each time
+                pass
+            if columns is not None:
+                result = result[[
+                    column for column in result.columns
+                    if is_wanted(column, columns)
+                ]]
+    return result
@@ -0,0 +1,60 @@
+import itertools
+import os
+
+from collections import namedtuple
+
+Job = namedtuple(
+    'Job', ['stock', 'source', 'to_folder', 'filename', 'slot'],
+    defaults=[None],
+)
+Record = namedtuple(
+    'Record',
+    [
+        'source', 'filename', 'ticker', 'summary', 'seconds', 'worker',
+        'error', 'slot', 'spans',
+    ],
+    defaults=[None, ()],
+)
+SKIP = object()
+
+
+def get_workers(processes=None, tasks=None):
+    """return processes or the number of cores this process may run on,
+       never more than there are tasks and at least one
+    """
+    if processes is None:
+        try:
+            processes = len(os.sched_getaffinity(0))
+        except AttributeError:
+            processes = os.cpu_count() or 1
+    if tasks is not None:
+        processes = min(processes, tasks)
+    return max(1, processes)
+
+def get_chunksize(tasks, workers, in_flight=None, chunks_per_worker=4):
+    """return how many tasks to hand a worker at once so every worker gets
+       about chunks_per_worker chunks, small runs are not chunked and at most
+       in_flight tasks are held in chunks so a bounded queue keeps every
+       worker busy
+    """
+    chunksize = tasks // (workers * chunks_per_worker)
+    if in_flight is not None:
+        chunksize = min(chunksize, in_flight // (2 * workers))
+    return max(1, chunksize)
+
+def interleave(*sequences):
+    """return the items of sequences taking one from each in turn"""
+    return [
+        item
+        for items in itertools.zip_longest(*sequences, fillvalue=SKIP)
+        for item in items if item is not SKIP
+    ]
+
+def get_jobs(sources):
+    """return one Job for every filename of every (stock, source, to_folder,
+       filenames) in sources with the sources interleaved
+    """
+    return interleave(*(
+        [Job(stock, source, to_folder, filename) for filename in filenames]
+        for stock, source, to_folder, filenames in sources
+    ))
@@ -2,19 +2,86 @@
 from utilities import (
     analysis_folder, edgar_folder, industry_folder,
     stockpup_folder, sectors_folder, processed_folder,
-    benchmark, munge_data
+    benchmark, munge_data, store_folder
 )
 # from haystack_munger import Munge
 from stock import Edgar, StockPup, AssignIndustry, AssignSector
+from store import build_store, get_store_folder, open_store
+from batch import summarize
+from panel import build_panel, get_panel_folder
+from price_store import PriceStore
+from manifest import Manifest, code_version
+from executor import get_jobs
+from pipeline import Pipeline
+from service import serve
+# every module records spans in src.spans, a bare spans import would load
+# a second copy whose spans are never collected, so keep the src prefix
+from src.spans import write_spans
+from stages import Graph, Scheduler, Stage, write_timings
+from summaries import SummaryTable
 from sectors import Sectors
 from industries import Industries
 from industry import Industry
 from sector import Sector
 from os import listdir
-from multiprocessing import Pool
 
+import sys
 import time
 
+def ingest_edgar():
+    """Pack every EDGAR csv into one store that Edgar can slice tickers from"""
+    benchmark(
+        report="EDGAR_INGEST",
+        job=build_store,
+        from_folder=edgar_folder(),
+        index_col='fiscal_year',
+    )
+
+def ingest_stockpup():
+    """Pack every StockPup csv into one store that StockPup can slice tickers from"""
+    benchmark(
+        report="STOCKPUP_INGEST",
+        job=build_store,
+        from_folder=stockpup_folder(),
+        index_col='Quarter end',
+    )
+
+def panel_edgar():
+    """Pack annual EDGAR net values into one (tickers, years, metrics) panel"""
+    benchmark(
+        report="EDGAR_PANEL",
+        job=build_panel,
+        stock=Edgar,
+        from_folder=edgar_folder(),
+        store=open_store(edgar_folder()),
+    )
+
+def panel_stockpup():
+    """Pack annual StockPup net values into one (tickers, years, metrics) panel"""
+    benchmark(
+        report="STOCKPUP_PANEL",
+        job=build_panel,
+        stock=StockPup,
+        from_folder=stockpup_folder(),
+        store=open_store(stockpup_folder()),
+    )
+
+def batch_summarize(stock=None, source=None):
+    summaries, failed = summarize(
+        stock, listdir(source), store=open_store(source)
+    )
+    SummaryTable(processed_folder(source)).write_part(summaries)
+    print('[FAILED]:', failed)
+
+def batch_edgar():
+    """Summarize every EDGAR file in one batch into the summary table"""
+    benchmark(
+        report="EDGAR_BATCH",
+        job=batch_summarize,
+        stock=Edgar,
+        source=edgar_folder(),
+    )
+
 def munge_sectors():
     """Clean SPDRS data and write files to sectors_folder, 
     removing extra info
@@ -82,7 +149,7 @@ def stockpup_sectors():
         report="ANALYZE_STOCKPUP_SECTORS",
         job=Sectors,
         sectors_folder=processed_folder(analysis_folder(sectors_folder())), 
-        stocks_folder=processed_folder(analysis_folder(stockpup_folder())), 
+        stocks_folder=processed_folder(stockpup_folder()), 
         to_folder=processed_folder(analysis_folder(sectors_folder(stockpup_folder()))),
     )
 
@@ -92,7 +159,7 @@ def stockpup_industries():
         report="ANALYZE_STOCKPUP_INDUSTRIES",
         job=Industries,
         industry_folder=processed_folder(analysis_folder(industry_folder())),
-        stocks_folder=processed_folder(analysis_folder(stockpup_folder())),
+        stocks_folder=processed_folder(stockpup_folder()),
         to_folder=processed_folder(analysis_folder(industry_folder(stockpup_folder()))),
     )
 
@@ -102,7 +169,7 @@ def edgar_sectors():
         report="ANALYZE_EDGAR_SECTORS",
         job=Sectors,
         sectors_folder=processed_folder(analysis_folder(sectors_folder())),
-        stocks_folder=processed_folder(analysis_folder(edgar_folder())),
+        stocks_folder=processed_folder(edgar_folder()),
         to_folder=processed_folder(analysis_folder(sectors_folder(edgar_folder()))),
     )
 
@@ -112,7 +179,7 @@ def edgar_industries():
         report="ANALYZE_EDGAR_INDUSTRIES",
         job=Industries,
         industry_folder=processed_folder(analysis_folder(industry_folder())),
-        stocks_folder=processed_folder(analysis_folder(edgar_folder())),
+        stocks_folder=processed_folder(edgar_folder()),
         to_folder=processed_folder(analysis_folder(industry_folder(edgar_folder()))),
     )
     
@@ -168,51 +235,181 @@ def process_all_files(stock=None, source=None):
     failed = []
     for filename in listdir(source):
         try:
-            stock(filename=filename).to_csv(processed_folder(source))
+            stock(filename=filename).to_summary_table(processed_folder(source))
         except Exception as error:
             print('[ERROR]::Could not process::', filename)
             failed.append(filename)
     print('[FAILED]:', failed)
 
 def process_file(stock, filename=None, source=None):
+    """return the source file and the ticker summarized for it,
+       or None for the ticker when the file could not be processed
+    """
+    output = None
     try:
-        stock(filename=filename).to_csv(processed_folder(source))
+        output = stock(filename=filename).to_summary_table(processed_folder(source))
     except Exception as error:
         print('[ERROR]::Could not process::', filename)
+    return f'{source}{filename}', output
 
 def process_stockpup(filename):
-    process_file(StockPup, filename=filename, source=stockpup_folder())
+    return process_file(StockPup, filename=filename, source=stockpup_folder())
 
 def process_edgar(filename):
-    process_file(Edgar, filename=filename, source=edgar_folder())
-    
-def parallel_process_stock():
-    with Pool(16) as pool:
-        pool.map(process_stockpup, listdir(stockpup_folder()), 2) 
-        pool.map(process_edgar, listdir(edgar_folder())) 
-    # StockPup parallel with 16 processes = 86seconds
-    # StockPup sequential = 117 seconds
-    # StockPup with cpu_count = 97 seconds
-    # StockPup with imap - no file creation - learn to use imap
-    # StockPup with 100 processes = 127 seconds
+    return process_file(Edgar, filename=filename, source=edgar_folder())
+
+def plan_changes(manifest, source, version):
+    """return the files in source to process and drop outputs of deleted files"""
+    filenames = listdir(source)
+    summaries = SummaryTable(processed_folder(source))
+    deleted = manifest.remove_deleted(source, filenames, remove=summaries.remove)
+    # files whose summary was removed or wiped are processed again
+    changed = manifest.get_changed(
+        source, filenames, version, exists=summaries.tickers().__contains__
+    )
+    print(f'::{source} {len(changed)} new or changed, {len(deleted)} deleted::')
+    return changed
+
+def report_progress(total):
+    """return a callback printing every hundredth of total completed files"""
+    completed = []
+    step = max(1, total // 100)
+    def callback(record):
+        completed.append(record)
+        if len(completed) % step == 0 or len(completed) == total:
+            print(f'::{len(completed)}/{total} files analyzed::')
+    return callback
+
+def parallel_process_stock(manifest_file=processed_folder('manifest.json')):
+    manifest = Manifest(manifest_file)
+    version = code_version()
+    # both sources share one queue so workers are not left idle between them,
+    # worker count and chunk size follow the cores and the number of files
+    jobs = get_jobs([
+        (stock, source, processed_folder(source), plan_changes(manifest, source, version))
+        for stock, source in ((StockPup, stockpup_folder()), (Edgar, edgar_folder()))
+    ])
+    records = []
+    if jobs:
+        # summaries come back through shared memory instead of being pickled
+        pipeline = Pipeline(callbacks=[report_progress(len(jobs))], shared=True)
+        try:
+            records = pipeline.run_jobs(jobs)
+        finally:
+            pipeline.close()
+        write_spans()
+    for record in records:
+        manifest.record(f'{record.source}{record.filename}', record.ticker, version)
+    manifest.save()
+
+def import_prices(folder='prices'):
+    """append the daily price pickles in folder not imported yet to the
+       price store
+    """
+    print(f'::stored {PriceStore().import_pickles(folder)} prices from {folder}::')
+
+def get_stages():
+    """return the stage graph of the entry points above, every stage reads
+       and writes the folders given to its job
+    """
+    analysis = lambda folder: processed_folder(analysis_folder(folder))
+    return Graph([
+        Stage('ingest_edgar', ingest_edgar, [edgar_folder()], [get_store_folder(edgar_folder())]),
+        Stage('ingest_stockpup', ingest_stockpup, [stockpup_folder()], [get_store_folder(stockpup_folder())]),
+        Stage(
+            'panel_edgar', panel_edgar,
+            [edgar_folder(), get_store_folder(edgar_folder())],
+            [get_panel_folder(edgar_folder())],
+        ),
+        Stage(
+            'panel_stockpup', panel_stockpup,
+            [stockpup_folder(), get_store_folder(stockpup_folder())],
+            [get_panel_folder(stockpup_folder())],
+        ),
+        Stage('import_prices', import_prices, ['prices'], [store_folder('prices')]),
+        Stage(
+            'parallel_process_stock', parallel_process_stock,
+            [stockpup_folder(), edgar_folder()],
+            [processed_folder(stockpup_folder()), processed_folder(edgar_folder())],
+        ),
+        Stage(
+            'munge_sectors', munge_sectors,
+            [processed_folder(sectors_folder())], [analysis(sectors_folder())],
+        ),
+        Stage('assign_industries', assign_industries, [industry_folder()], [analysis(industry_folder())]),
+        Stage(
+            'analyze_stockpup', analyze_stockpup,
+            [processed_folder(stockpup_folder())], [analysis(stockpup_folder())],
+        ),
+        Stage(
+            'analyze_edgar', analyze_edgar,
+            [processed_folder(edgar_folder())], [analysis(edgar_folder())],
+        ),
+        Stage(
+            'stockpup_sectors', stockpup_sectors,
+            [analysis(sectors_folder()), processed_folder(stockpup_folder())],
+            [analysis(sectors_folder(stockpup_folder()))],
+        ),
+        Stage(
+            'stockpup_industries', stockpup_industries,
+            [analysis(industry_folder()), processed_folder(stockpup_folder())],
+            [analysis(industry_folder(stockpup_folder()))],
+        ),
+        Stage(
+            'edgar_sectors', edgar_sectors,
+            [analysis(sectors_folder()), processed_folder(edgar_folder())],
+            [analysis(sectors_folder(edgar_folder()))],
+        ),
+        Stage(
+            'edgar_industries', edgar_industries,
+            [analysis(industry_folder()), processed_folder(edgar_folder())],
+            [analysis(industry_folder(edgar_folder()))],
+        ),
+        Stage(
+            'write_stockpup_sector_reports', write_stockpup_sector_reports,
+            [analysis(sectors_folder(stockpup_folder()))],
+            [analysis(sectors_folder(stockpup_folder('score_total_reports/')))],
+        ),
+        Stage(
+            'write_stockpup_industry_reports', write_stockpup_industry_reports,
+            [analysis(industry_folder(stockpup_folder()))],
+            [analysis(industry_folder(stockpup_folder('score_total_reports/')))],
+        ),
+        Stage(
+            'write_edgar_sector_reports', write_edgar_sector_reports,
+            [analysis(sectors_folder(edgar_folder()))],
+            [analysis(sectors_folder(edgar_folder('score_total_reports/')))],
+        ),
+        Stage(
+            'write_edgar_industry_reports', write_edgar_industry_reports,
+            [analysis(industry_folder(edgar_folder()))],
+            [analysis(industry_folder(edgar_folder('score_total_reports/')))],
+        ),
+    ])
+
+def run_stages(targets=None, force=False):
+    """run targets, every stage when None, after the stages they depend on
+       skipping those whose inputs did not change and report their timings
+    """
+    timings = Scheduler(
+        get_stages(), state_file=processed_folder('stages.json'),
+        version=code_version(),
+    ).run(targets=targets, force=force)
+    write_timings(timings)
+    return timings
 
 if __name__ == '__main__':
-    # munge_sectors()
-    # assign_industries()
-    # assign_sectors()
-    # analyze_stockpup()
-    # analyze_edgar()
-    # stockpup_sectors()
-    # stockpup_industries()
-    # edgar_sectors()
-    # edgar_industries()
-    # write_stockpup_sector_reports()
-    # write_stockpup_industry_reports()
-    # write_edgar_sector_reports()
-    # write_edgar_industry_reports()
-    # time_it(process_all_files, stock=StockPup, source=stockpup_folder())
-    # time_it(process_all_files, stock=Edgar, source=edgar_folder())
-    time_it(parallel_process_stock)
+    # python haystack.py [--force] [stage ...], stages default to
+    # parallel_process_stock, the stages they read from run first when
+    # their inputs changed, batch_edgar and assign_sectors are run by hand
+    # python haystack.py serve [port] answers queries over warm data instead
+    arguments = sys.argv[1:]
+    if arguments[:1] == ['serve']:
+        serve(port=int(arguments[1]) if len(arguments) > 1 else 8765)
+        sys.exit()
+    force = '--force' in arguments
+    targets = [argument for argument in arguments if argument != '--force']
+    time_it(run_stages, targets=targets or ['parallel_process_stock'], force=force)
     """
     StockPup Failures:
     ['BHF_quarterly_financial_data.csv', 'ZTS_quarterly_financial_data.csv', 
@@ -3,6 +3,7 @@ import json
 import yfinance as yahoo_finance
 
 from . import utilities
+from .prices import get_current_prices
 from scipy.stats import hmean
 from .utilities import (
     list_filetype, os, test_folder, makedir
@@ -350,38 +351,13 @@ class Analyst:
                 threading=16
             )
 
-    def get_current_prices(self, symbols="", df=None):
-        """Return """
+    def get_current_prices(self, symbols="", df=None, provider=None):
+        """Return the current price of every symbol or of every row of df"""
         try:
             tickers = df.index
         except AttributeError:
             tickers = symbols
-
-        today = datetime.date.today()
-        prices_today = f"prices/{str(today)}_current_prices.pkl"
-        try:
-            current_prices = pandas.read_pickle(prices_today)
-        except FileNotFoundError:
-            try:
-                prices = self.yahoo_finance_download(
-                    tickers=tickers, start=today,
-                )
-            except ValueError:
-                prices = self.yahoo_finance_download(
-                    tickers=tickers,
-                    start=today - datetime.timedelta(days=1),
-                )
-            current_prices = prices["Adj Close"].T.squeeze()
-            current_prices.to_pickle(prices_today)
-        except Exception:
-            print("I could not download current prices, "
-                  "using last known prices instead")
-            last_known_prices = sorted(
-                list_filetype(in_folder="prices", extension="pkl")
-            )[-1]
-            return pandas.read_pickle(last_known_prices)
-
-        return current_prices
+        return get_current_prices(tickers, provider=provider)
 
     def get_ratio(self, numerator, denominator):
         """returns ratio for positive numbers
@@ -1,32 +1,109 @@
-from haystack_utilities import os, makedir
+import os
+import time
+
+from multiprocessing import Pool
+from src.utilities import list_filetype, makedir
+
+SUBSTITUTIONS = (
+    (b'None', b'0'),
+    (b'NaN', b'0'),
+    (b'2000-01-01', b'1999-12-31'),
+)
+
+
+def substitute(buffer):
+    """return buffer with the substitutions made over the whole buffer"""
+    for old, new in SUBSTITUTIONS:
+        buffer = buffer.replace(old, new)
+    return buffer
+
+def get_ticker(filename):
+    return (
+        os.path.splitext(os.path.split(filename)[1])[0]
+          .split('_')[0]
+          .upper()
+    )
+
+def is_up_to_date(old_file, new_file):
+    try:
+        return os.stat(new_file).st_mtime_ns >= os.stat(old_file).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def munge_file(old_file, new_file):
+    """write old_file to new_file with the substitutions made and
+       return the number of bytes read, 0 when new_file is up to date
+    """
+    if is_up_to_date(old_file, new_file):
+        return 0
+    with open(old_file, 'rb') as in_file:
+        buffer = in_file.read()
+    temporary = f'{new_file}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as out_file:
+        out_file.write(substitute(buffer))
+    os.replace(temporary, new_file)
+    return len(buffer)
+
+def munge_task(task):
+    old_file, new_file = task
+    try:
+        return old_file, munge_file(old_file, new_file)
+    except OSError:
+        print(f"[ERROR]::Could not write '{old_file}' to '{new_file}'::")
+        return old_file, None
+
+def munge_folder(from_folder=None, to_folder=None, processes=1, chunksize=32):
+    """munge every csv in from_folder to to_folder, skipping files whose
+       output is newer than the source. files are munged in this process
+       unless processes asks for a pool, munging is mostly file system work
+       so a pool only pays off with several cores and disks
+    """
+    start_time = time.time()
+    makedir(to_folder)
+    tasks = [
+        (
+            os.path.join(from_folder, filename),
+            os.path.join(to_folder, f'{get_ticker(filename)}.csv'),
+        )
+        for filename in list_filetype(in_folder=from_folder)
+    ]
+    stale = [task for task in tasks if not is_up_to_date(*task)]
+    munged, failed, size = 0, [], 0
+    if stale and processes != 1:
+        with Pool(processes) as pool:
+            results = list(pool.imap_unordered(munge_task, stale, chunksize=chunksize))
+    else:
+        results = map(munge_task, stale)
+    for old_file, read in results:
+        if read is None:
+            failed.append(old_file)
+        else:
+            munged += 1
+            size += read
+    duration = time.time() - start_time
+    print(
+        f'::munged {munged} of {len(tasks)} files from {from_folder} to '
+        f'{to_folder} at {size / 1e6 / duration:.1f} MB/s, '
+        f'{len(failed)} failed::'
+    )
+    return failed
 
 
 class Munge:
 
     def __init__(self, filename, to_folder=None):
         self.filename = filename
-        self.ticker = (os.path.splitext(os.path.split(filename)[1])[0]
-                              .split('_')[0]
-                              .upper())
+        self.ticker = get_ticker(filename)
         self.newfile = f'{to_folder}{self.ticker}.csv'
         self.munge_file(self.filename, self.newfile)
 
     def munge_file(self, old_file, new_file):
-        new_folder = os.path.dirname(new_file)
         old_folder = os.path.dirname(old_file)
-
         if not os.path.exists(old_folder):
             print(f'{old_folder} does not Exist, '
                    'Please check the name and try agan')
             return
-
-        if old_folder != new_folder and not os.path.exists(new_file):
-            makedir(new_folder)
-            with open(f'{old_file}') as in_file, \
-                 open(f'{new_file}', 'w') as out_file:
-                 print(f"Writing '{old_file}' to '{new_file}' ...")
-                 [out_file.write(line.replace('None', '0')
-                                     .replace('NaN', '0')
-                                     .replace('2000-01-01', '1999-12-31')) 
-                  for line in in_file]
-                  
\ No newline at end of file
+        if old_folder != os.path.dirname(new_file):
+            print(f"Writing '{old_file}' to '{new_file}' ...")
+            makedir(os.path.dirname(new_file))
+            munge_file(old_file, new_file)
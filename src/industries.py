@@ -1,4 +1,5 @@
 from stock import Stock
+from summaries import read_summaries
 from pandas import concat
 from numpy import median
 from utilities import (
@@ -11,6 +12,7 @@ class Industries:
     def __init__(self, 
                  industry_folder=None, stocks_folder=None,
                  to_folder=processed_folder(analysis_folder(industry_folder())),
+                 stocks_df=None,
                  ):
         analyst = Stock(from_folder=industry_folder,
                           to_folder=to_folder)
@@ -19,8 +21,9 @@ class Industries:
             industry_folder, file_col="SECTOR", header=0
         )
         
-        self.stocks_df = analyst.combine_files(
-            stocks_folder, axis=1, ignore_index=True
+        # summaries already in memory, like Pipeline.get_summaries, skip the table
+        self.stocks_df = (
+            read_summaries(stocks_folder) if stocks_df is None else stocks_df
         )
 
 
@@ -1,15 +1,199 @@
+import atexit
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from collections import namedtuple
 from datetime import datetime
 
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'WARNING': WARNING, 'ERROR': ERROR}
+NAMES = {value: name for name, value in LEVELS.items()}
+STOP = None
+
+Entry = namedtuple('Entry', ['time', 'level', 'ticker', 'message', 'pid'])
+
+
+def get_level(level):
+    """return the number of a level given by name or number"""
+    return LEVELS[level.upper()] if isinstance(level, str) else level
+
+def format_text(entry):
+    prefix = f'[{NAMES.get(entry.level, entry.level)}] ' if entry.level >= WARNING else ''
+    return (
+        f'{prefix}{datetime.fromtimestamp(entry.time)}'
+        f'::Ticker::{entry.ticker}::{entry.message}'
+    )
+
+def format_json(entry):
+    return json.dumps({
+        'time': datetime.fromtimestamp(entry.time).isoformat(),
+        'level': NAMES.get(entry.level, entry.level),
+        'ticker': entry.ticker,
+        'message': entry.message,
+        'pid': entry.pid,
+    })
+
+FORMATS = {'text': format_text, 'json': format_json}
+
+
+class StreamSink:
+    """buffers entries and writes them a line each to filename or stream,
+       standard output by default, every buffer_size entries, on errors and
+       when flushed. entries are only formatted when they are written
+    """
+
+    def __init__(self, format='text', filename=None, stream=None, buffer_size=64):
+        self.format = FORMATS[format]
+        self.filename = filename
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.entries = []
+        self.lock = threading.Lock()
+
+    def emit(self, entries):
+        with self.lock:
+            self.entries.extend(entries)
+            full = len(self.entries) >= self.buffer_size
+        if full or any(entry.level >= ERROR for entry in entries):
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            entries, self.entries = self.entries, []
+        if not entries:
+            return
+        lines = ''.join(f'{self.format(entry)}\n' for entry in entries)
+        if self.filename is not None:
+            with open(self.filename, 'a') as out_file:
+                out_file.write(lines)
+            return
+        stream = sys.stdout if self.stream is None else self.stream
+        stream.write(lines)
+        stream.flush()
+
+
+class QueueSink:
+    """buffers entries and puts them on queue in batches of buffer_size"""
+
+    def __init__(self, queue, buffer_size=64):
+        self.queue = queue
+        self.buffer_size = buffer_size
+        self.entries = []
+        self.lock = threading.Lock()
+
+    def emit(self, entries):
+        with self.lock:
+            self.entries.extend(entries)
+            full = len(self.entries) >= self.buffer_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            entries, self.entries = self.entries, []
+        if entries:
+            self.queue.put(entries)
+
+
+LEVEL = get_level(os.environ.get('HAYSTACK_LOG_LEVEL', 'INFO'))
+FORMAT = os.environ.get('HAYSTACK_LOG_FORMAT', 'text')
+FILENAME = os.environ.get('HAYSTACK_LOG_FILE')
+SINK = StreamSink(format=FORMAT, filename=FILENAME)
+
+
+def configure(level=None, sink=None):
+    """set the lowest level logged and the sink entries go to, entries
+       buffered by the previous sink are not flushed
+    """
+    global LEVEL, SINK
+    if level is not None:
+        LEVEL = get_level(level)
+    if sink is not None:
+        SINK = sink
+
+def get_sink():
+    return SINK
+
+def flush():
+    """write the entries buffered by the sink"""
+    SINK.flush()
+
+atexit.register(flush)
+
+def write_entries(queue, format, filename):
+    """write every batch of entries on queue until STOP"""
+    sink = StreamSink(format=format, filename=filename)
+    for entries in iter(queue.get, STOP):
+        sink.emit(entries)
+    sink.flush()
+
+
+class LogWriter:
+    """a process that writes the entries of every other process
+
+       within the context entries of this process go to the writer too,
+       worker processes send theirs with QueueSink(writer.queue)
+    """
+
+    def __init__(self, format=None, filename=None):
+        self.queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=write_entries,
+            args=(self.queue, format or FORMAT, filename or FILENAME),
+            daemon=True,
+        )
+        self.previous = None
+
+    def __enter__(self):
+        flush()
+        self.previous = get_sink()
+        self.process.start()
+        configure(sink=QueueSink(self.queue))
+        return self
+
+    def __exit__(self, *exception):
+        flush()
+        configure(sink=self.previous)
+        self.queue.put(STOP)
+        self.process.join()
+        self.queue.close()
+
+
 class Logger:
+    """logs messages of a ticker at a level, messages below the configured
+       level are dropped before they are formatted, messages are formatted
+       with args the way % does
+    """
 
     def __init__(self, ticker):
         self.ticker = ticker
-        
-    def log(self, message=None, prefix=''):
-        print(f'{prefix}{datetime.now()}::Ticker::{self.ticker}::{message}')
 
-    def error(self, message):
-        return self.log(f'{message}::FAILED::', prefix='[ERROR] ')
+    def is_enabled(self, level):
+        return level >= LEVEL
+
+    def write(self, level, message, args):
+        if level < LEVEL:
+            return
+        SINK.emit([Entry(
+            time.time(), level, self.ticker,
+            message % args if args else message, os.getpid(),
+        )])
+
+    def debug(self, message=None, *args):
+        self.write(DEBUG, message, args)
+
+    def log(self, message=None, *args):
+        self.write(INFO, message, args)
+
+    def warning(self, message=None, *args):
+        self.write(WARNING, message, args)
+
+    def error(self, message, *args):
+        self.write(ERROR, f'{message}::FAILED::', args)
 
-    def success(self, message):
-        return self.log(f'{message}Succeeded::')
\ No newline at end of file
+    def success(self, message, *args):
+        self.write(INFO, f'{message}Succeeded::', args)
@@ -0,0 +1,127 @@
+import ast
+import hashlib
+import json
+import os
+
+from src.columnar import is_fresh
+from src.utilities import file_fingerprint, makedir
+
+
+def get_imports(filename):
+    """return the modules of src imported by the module in filename"""
+    with open(filename, 'rb') as in_file:
+        tree = ast.parse(in_file.read(), filename=filename)
+    imports = set()
+    for statement in ast.walk(tree):
+        if isinstance(statement, ast.ImportFrom) and statement.module:
+            if statement.module == 'src':
+                imports.update(f'{alias.name}.py' for alias in statement.names)
+            elif statement.module.startswith('src.'):
+                imports.add(f'{statement.module[4:]}.py')
+        elif isinstance(statement, ast.Import):
+            imports.update(
+                f'{alias.name[4:]}.py' for alias in statement.names
+                if alias.name.startswith('src.')
+            )
+    return imports
+
+def get_modules(modules, folder):
+    """return modules and every module of src they import in folder"""
+    found, waiting = set(), list(modules)
+    while waiting:
+        module = waiting.pop()
+        filename = os.path.join(folder, module)
+        if module in found or not os.path.exists(filename):
+            continue
+        found.add(module)
+        waiting.extend(get_imports(filename))
+    return sorted(found)
+
+def code_version(
+    modules=('stock.py', 'batch.py', 'store.py'), folder=None, **config
+):
+    """return a digest of the analysis source code and its configuration
+       so summaries are rebuilt when either changes, the code is modules
+       and every module of src they import
+    """
+    digest = hashlib.sha1(repr(sorted(config.items())).encode())
+    folder = os.path.dirname(os.path.abspath(__file__)) if folder is None else folder
+    for module in get_modules(modules, folder):
+        digest.update(module.encode())
+        with open(os.path.join(folder, module), 'rb') as in_file:
+            digest.update(in_file.read())
+    return digest.hexdigest()
+
+
+def remove_output(outputs):
+    for output in outputs:
+        if os.path.exists(output):
+            os.remove(output)
+
+
+class Manifest:
+    """records the input fingerprint, code version and output of every
+       processed file so a run only recomputes what changed
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        try:
+            with open(filename) as in_file:
+                self.entries = json.load(in_file)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def is_current(self, source, version, exists=os.path.exists):
+        """a source is current when its code version and fingerprint are
+           unchanged and exists finds the output it produced
+        """
+        entry = self.entries.get(source)
+        return (
+            entry is not None
+            and entry['version'] == version
+            and (entry['output'] is None or exists(entry['output']))
+            and is_fresh(source, entry['fingerprint'])
+        )
+
+    def get_changed(self, folder, filenames, version, exists=os.path.exists):
+        """return filenames in folder that are new or changed or whose
+           output exists does not find
+        """
+        return [
+            filename for filename in filenames
+            if not self.is_current(
+                os.path.join(folder, filename), version, exists=exists
+            )
+        ]
+
+    def remove_deleted(self, folder, filenames, remove=remove_output):
+        """forget sources in folder that no longer exist and call remove
+           with the outputs they produced
+        """
+        current = {os.path.join(folder, filename) for filename in filenames}
+        deleted = [
+            source for source in self.entries
+            if os.path.dirname(source) == os.path.normpath(folder)
+            and source not in current
+        ]
+        outputs = [self.entries.pop(source)['output'] for source in deleted]
+        remove([output for output in outputs if output is not None])
+        return deleted
+
+    def record(self, source, output, version):
+        """output is None for sources that could not be processed,
+           they are retried once the source or the code changes
+        """
+        self.entries[source] = {
+            'fingerprint': file_fingerprint(source, checksum=True),
+            'output': output,
+            'version': version,
+        }
+
+    def save(self):
+        makedir(os.path.dirname(self.filename))
+        temporary = f'{self.filename}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as out_file:
+            json.dump(self.entries, out_file, indent=1, sort_keys=True)
+        os.replace(temporary, self.filename)
@@ -0,0 +1,96 @@
+import functools
+
+from collections import defaultdict
+from pandas import DataFrame
+
+
+class Graph:
+    """results of the nodes of one instance and what they were computed from
+
+       a node that calls another node while it is computed becomes its
+       dependent, invalidating an input or a node invalidates its dependents
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.dependents = defaultdict(set)
+        self.computing = []
+        self.computed = defaultdict(int)
+        self.hits = defaultdict(int)
+
+    def get(self, name, compute, inputs=()):
+        if self.computing:
+            self.dependents[name].add(self.computing[-1])
+        if name in self.values:
+            self.hits[name] += 1
+            return self.values[name]
+        for source in inputs:
+            self.dependents[source].add(name)
+        self.computing.append(name)
+        try:
+            value = compute()
+        finally:
+            self.computing.pop()
+        self.values[name] = value
+        self.computed[name] += 1
+        return value
+
+    def invalidate(self, name):
+        self.values.pop(name, None)
+        for dependent in self.dependents.pop(name, ()):
+            self.invalidate(dependent)
+
+    def get_stats(self):
+        names = sorted({*self.computed, *self.hits})
+        return DataFrame(
+            {
+                'COMPUTED': [self.computed[name] for name in names],
+                'HITS': [self.hits[name] for name in names],
+            },
+            index=names,
+        )
+
+
+def node(*inputs, copy=True):
+    """cache the result of a method that takes no arguments until one of
+       inputs changes, a node with no inputs depends on every input.
+       callers outside the graph get their own copy of the result so
+       changing it does not change the cached result, nodes computed from
+       it share it and only read it, with copy=False every caller shares it
+    """
+    def decorator(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self):
+            graph = self.get_graph()
+            value = graph.get(
+                name, lambda: method(self), inputs if inputs else self.inputs
+            )
+            if copy and not graph.computing and hasattr(value, 'copy'):
+                return value.copy()
+            return value
+        return wrapper
+    return decorator
+
+
+class Memoized:
+    """invalidates the nodes computed from an input when it is set"""
+
+    inputs = ()
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in self.inputs:
+            self.get_graph().invalidate(name)
+
+    def get_graph(self):
+        try:
+            return self.__dict__['graph']
+        except KeyError:
+            graph = self.__dict__['graph'] = Graph()
+            return graph
+
+    def get_node_stats(self):
+        """return how often each node was computed and served from cache"""
+        return self.get_graph().get_stats()
@@ -0,0 +1,224 @@
+import operator
+
+from numpy import errstate, full, negative
+from pandas import DataFrame
+from src.ratios import ratio_kernel
+
+OPERATIONS = {
+    'add': operator.add,
+    'sub': operator.sub,
+    'mul': operator.mul,
+    'truediv': operator.truediv,
+    'neg': negative,
+    'ratio': ratio_kernel,
+}
+
+
+class Expression:
+    """a metric as an expression over base columns
+
+       expressions are built with arithmetic on Symbols so the methods that
+       compute metrics from a DataFrame also describe them, equal
+       expressions have equal keys and are evaluated once
+    """
+
+    def __init__(self, operation, *arguments):
+        if operation not in ('column', 'constant', 'metric'):
+            arguments = tuple(as_expression(argument) for argument in arguments)
+        self.operation = operation
+        self.arguments = arguments
+        self.key = (operation, *(
+            argument.key if isinstance(argument, Expression) else argument
+            for argument in arguments
+        ))
+
+    def __add__(self, other):
+        return Expression('add', self, other)
+
+    def __radd__(self, other):
+        return Expression('add', other, self)
+
+    def __sub__(self, other):
+        return Expression('sub', self, other)
+
+    def __rsub__(self, other):
+        return Expression('sub', other, self)
+
+    def __mul__(self, other):
+        return Expression('mul', self, other)
+
+    def __rmul__(self, other):
+        return Expression('mul', other, self)
+
+    def __truediv__(self, other):
+        return Expression('truediv', self, other)
+
+    def __rtruediv__(self, other):
+        return Expression('truediv', other, self)
+
+    def __neg__(self):
+        return Expression('neg', self)
+
+
+def as_expression(value):
+    if isinstance(value, Expression):
+        return value
+    return Expression('constant', float(value))
+
+
+class Symbols:
+    """stands in for a DataFrame, every column is a column expression"""
+
+    def __getitem__(self, name):
+        return Expression('column', name)
+
+
+def metric(name):
+    """refer to another metric of the same registry by name"""
+    return Expression('metric', name)
+
+
+def ratio(numerator, denominator):
+    """ratio with the sign rules of ratios.get_ratio"""
+    return Expression('ratio', numerator, denominator)
+
+
+class Registry:
+    """metric definitions that are compiled into an evaluation plan
+
+       a plan holds every distinct subexpression of the requested metrics
+       once, in dependency order, so only what they need is evaluated.
+       columns always name columns of the data, metrics refer to other
+       metrics with metric(name)
+    """
+
+    def __init__(self, definitions):
+        self.definitions = {
+            name: as_expression(expression)
+            for name, expression in definitions.items()
+        }
+        self.plans = {}
+
+    def __contains__(self, name):
+        return name in self.definitions
+
+    def names(self):
+        return list(self.definitions)
+
+    def resolve(self, expression, resolving=()):
+        if expression.operation == 'metric':
+            name = expression.arguments[0]
+            if name not in self.definitions:
+                raise KeyError(f'{name} is not a metric')
+            if name in resolving:
+                raise ValueError(f'{name} is defined in terms of itself')
+            return self.resolve(self.definitions[name], (*resolving, name))
+        if expression.operation in ('column', 'constant'):
+            return expression
+        return Expression(
+            expression.operation,
+            *(self.resolve(argument, resolving) for argument in expression.arguments)
+        )
+
+    def compile(self, names):
+        """return (steps, outputs) for names
+           steps are (key, operation, argument keys) in evaluation order
+           outputs map every name to the key of its result
+        """
+        steps, seen, outputs = [], set(), {}
+
+        def visit(expression):
+            if expression.key in seen:
+                return
+            for argument in expression.arguments:
+                if isinstance(argument, Expression):
+                    visit(argument)
+            seen.add(expression.key)
+            steps.append((
+                expression.key, expression.operation,
+                tuple(
+                    argument.key if isinstance(argument, Expression) else argument
+                    for argument in expression.arguments
+                ),
+            ))
+
+        for name in names:
+            expression = self.resolve(self.definitions[name], (name,))
+            visit(expression)
+            outputs[name] = expression.key
+        return steps, outputs
+
+    def get_plan(self, names):
+        names = tuple(names)
+        if names not in self.plans:
+            self.plans[names] = self.compile(names)
+        return self.plans[names]
+
+    def get_columns(self, names):
+        """return the columns of the data that names are computed from"""
+        steps, _ = self.get_plan(names)
+        return [
+            arguments[0] for _, operation, arguments in steps
+            if operation == 'column'
+        ]
+
+    def evaluate_arrays(self, columns, names):
+        """return {name: array} of names computed from columns,
+           a mapping of column names to arrays of one shape
+        """
+        steps, outputs = self.get_plan(names)
+        values = {}
+        with errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for key, operation, arguments in steps:
+                if operation == 'column':
+                    values[key] = columns[arguments[0]]
+                elif operation == 'constant':
+                    values[key] = arguments[0]
+                else:
+                    values[key] = OPERATIONS[operation](
+                        *(values[argument] for argument in arguments)
+                    )
+        return {name: values[outputs[name]] for name in names}
+
+    def evaluate(self, data, names=None):
+        """return {name: values} of names computed from the columns of data
+           a DataFrame gives a Series per metric and a Series gives a number
+        """
+        names = self.names() if names is None else names
+        if isinstance(data, DataFrame):
+            length = len(data)
+            columns = {
+                name: data[name].to_numpy(dtype='float64')
+                for name in self.get_columns(names)
+            }
+        else:
+            length = 1
+            positions = {label: position for position, label in enumerate(data.index)}
+            row = data.to_numpy(dtype='float64')[None, :]
+            columns = {
+                name: row[:, positions[name]]
+                for name in self.get_columns(names)
+            }
+
+        results = {}
+        for name, result in self.evaluate_arrays(columns, names).items():
+            if not hasattr(result, 'shape'):
+                result = full(length, result)
+            results[name] = result
+        if isinstance(data, DataFrame):
+            frame = DataFrame(results, index=data.index, columns=list(names))
+            return {name: frame[name] for name in names}
+        return {name: result[0] for name, result in results.items()}
+
+
+registries = {}
+
+
+def get_registry(owner, definitions):
+    """return the Registry of definitions for the class of owner,
+       built once from owner.definitions() with Symbols for its data
+    """
+    key = (type(owner), definitions)
+    if key not in registries:
+        registries[key] = Registry(getattr(owner, definitions)(Symbols()))
+    return registries[key]
@@ -1,41 +1,92 @@
 from src.logger import Logger
+from src.spans import timed
 from numpy import inf, nan
+from pandas import Timestamp
 
 
 class Munger:
+    """copy=False munges without copying the data: the 2000-01-01 fix is
+       applied to the index only, headers are renamed in one pass and the
+       result shares its values with raw_data. copies counts the full
+       copies of the frame made while munging
+    """
 
     def __init__(self,
-        ticker=None, raw_data=None, mappings=None, filename=None
+        ticker=None, raw_data=None, mappings=None, filename=None,
+        copy=True, date_index=True,
     ):
         self.logger = Logger(ticker)
+        self.copy = copy
+        self.date_index = date_index
+        self.copies = 0
         self.munge_data(raw_data=raw_data, mappings=mappings, filename=filename)
 
+    @timed('Munger')
     def munge_data(self, mappings=None, raw_data=None, filename=None):
         if len(raw_data) > 1:
-            self.munged_data = self.rename_columns(
-                dataframe=self.convert_2000_new_year_to_1999_year_end(
-                    raw_data
-                ),
-                mappings=mappings
+            if self.copy:
+                self.munged_data = self.rename_columns(
+                    dataframe=self.convert_2000_new_year_to_1999_year_end(
+                        raw_data
+                    ),
+                    mappings=mappings
+                )
+            else:
+                self.munged_data = self.relabel(
+                    dataframe=raw_data, mappings=mappings
+                )
+            self.logger.success(
+                'Munging data with %s copies from File::%s::',
+                self.copies, filename,
             )
-            self.logger.success(f"Munging data from File::{filename}::")
         else:
-            self.logger.error(f"Munging data from File::{filename}::")
+            self.logger.error('Munging data from File::%s::', filename)
             self.munged_data = None
 
     def convert_2000_new_year_to_1999_year_end(self, dataframe):
-        self.logger.log('Converted 1999-12-31 to 2000-01-01')
+        self.logger.debug('Converted 1999-12-31 to 2000-01-01')
         try:
+            self.copies += 1
             return dataframe.replace('2000-01-01', '1999-12-31')
         except KeyError:
             return dataframe
 
     def set_uppercase_column_names(self, dataframe):
-        self.logger.log('Setting Column Names to UPPERCASE Labels')
+        self.logger.debug('Setting Column Names to UPPERCASE Labels')
+        self.copies += 1
         return dataframe.rename(str.upper, axis='columns')
 
     def rename_columns(self, dataframe=None, mappings=None):
-        self.logger.log('Converting Column Names')
+        self.logger.debug('Converting Column Names')
+        self.copies += 1
         return self.set_uppercase_column_names(dataframe).rename(
             columns=mappings
-        )
\ No newline at end of file
+        )
+
+    def convert_2000_new_year_in_index(self, index):
+        self.logger.debug('Converted 2000-01-01 to 1999-12-31 in index')
+        try:
+            new_year = index == Timestamp('2000-01-01')
+        except TypeError:
+            return index
+        if not new_year.any():
+            return index
+        return index.where(~new_year, Timestamp('1999-12-31'))
+
+    def get_column_names(self, columns, mappings=None):
+        mappings = mappings if mappings else {}
+        return [
+            mappings.get(name.upper(), name.upper())
+            for name in columns
+        ]
+
+    def relabel(self, dataframe=None, mappings=None):
+        """return a view of dataframe with new labels,
+           only the index and the header are rebuilt
+        """
+        self.logger.debug('Converting Column Names')
+        result = dataframe.copy(deep=False)
+        result.columns = self.get_column_names(dataframe.columns, mappings)
+        if self.date_index:
+            result.index = self.convert_2000_new_year_in_index(dataframe.index)
+        return result
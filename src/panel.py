@@ -0,0 +1,149 @@
+import os
+import shutil
+
+from numpy import (
+    array, int64, isin, load, nan, nanmedian, save, searchsorted
+)
+from numpy.lib.format import open_memmap
+from pandas import DataFrame, Index
+from src.utilities import list_filetype, makedir, panel_folder
+
+VALUES = 'values.npy'
+
+
+def get_panel_folder(from_folder):
+    return panel_folder(os.path.basename(os.path.normpath(from_folder)))
+
+def get_annual_net_values(stock, filename, store=None):
+    try:
+        result = stock(filename=filename, store=store, analyze=False)
+        return result.ticker, result.get_annual_net_values()
+    except Exception:
+        print('[ERROR]::Could not get net values::', filename)
+        return None, None
+
+def build_panel(stock=None, from_folder=None, to_folder=None, filenames=None, store=None):
+    """write the annual net values of every file in from_folder to a
+       (tickers, years, metrics) float64 array with label arrays next to it
+       years a ticker has no data for are nan
+    """
+    to_folder = to_folder if to_folder else get_panel_folder(from_folder)
+    if filenames is None:
+        filenames = list_filetype(in_folder=from_folder)
+    frames = {}
+    for filename in filenames:
+        ticker, net_values = get_annual_net_values(stock, filename, store=store)
+        if net_values is not None and len(net_values):
+            frames[ticker] = net_values
+
+    tickers = array(sorted(frames), dtype=str)
+    years = array(
+        sorted({year for frame in frames.values() for year in frame.index}),
+        dtype=int64,
+    )
+    metrics = array(
+        sorted({metric for frame in frames.values() for metric in frame.columns}),
+        dtype=str,
+    )
+
+    temporary = f'{to_folder}.{os.getpid()}.tmp'
+    makedir(temporary)
+    values = open_memmap(
+        f'{temporary}/{VALUES}', mode='w+', dtype='float64',
+        shape=(len(tickers), len(years), len(metrics)),
+    )
+    values[:] = nan
+    for position, ticker in enumerate(tickers):
+        frame = frames[ticker]
+        values[
+            position,
+            searchsorted(years, frame.index.to_numpy())[:, None],
+            searchsorted(metrics, frame.columns.to_numpy(dtype=str)),
+        ] = frame.to_numpy(dtype='float64')
+    values.flush()
+    del values
+    save(f'{temporary}/tickers.npy', tickers)
+    save(f'{temporary}/years.npy', years)
+    save(f'{temporary}/metrics.npy', metrics)
+
+    shutil.rmtree(to_folder, ignore_errors=True)
+    os.replace(temporary, to_folder)
+    print(
+        f'::packed {len(tickers)} tickers, {len(years)} years and '
+        f'{len(metrics)} metrics into {to_folder}::'
+    )
+
+
+class Panel:
+    """read only (tickers, years, metrics) view of a panel written by build_panel
+
+       values are memory mapped so every process that opens the panel shares
+       the same pages, pickling a Panel only sends its folder
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.tickers = load(f'{folder}/tickers.npy')
+        self.years = load(f'{folder}/years.npy')
+        self.metrics = load(f'{folder}/metrics.npy')
+        self.values = load(f'{folder}/{VALUES}', mmap_mode='r')
+        self.positions = {ticker: position for position, ticker in enumerate(self.tickers)}
+
+    def __getstate__(self):
+        return {'folder': self.folder}
+
+    def __setstate__(self, state):
+        self.__init__(state['folder'])
+
+    def ticker_positions(self, tickers):
+        return array([self.positions[ticker] for ticker in tickers], dtype=int64)
+
+    @staticmethod
+    def find(labels, label, name):
+        """return the position of label in the sorted labels"""
+        position = int(searchsorted(labels, label))
+        if position == len(labels) or labels[position] != label:
+            raise KeyError(f'no {name} {label} in the panel')
+        return position
+
+    def metric_position(self, metric):
+        return self.find(self.metrics, metric, 'metric')
+
+    def year_position(self, year):
+        return self.find(self.years, year, 'year')
+
+    def get(self, ticker):
+        """return the annual net values of ticker, years without data are dropped"""
+        return DataFrame(
+            self.values[self.positions[ticker]],
+            index=Index(self.years, name='YEAR'),
+            columns=self.metrics,
+        ).dropna(how='all')
+
+    def metric(self, metric, tickers=None):
+        """return a (tickers, years) array of metric"""
+        values = self.values[:, :, self.metric_position(metric)]
+        if tickers is None:
+            return values
+        return values[self.ticker_positions(tickers)]
+
+    def cross_section(self, year, tickers=None):
+        """return a (tickers, metrics) array for year"""
+        values = self.values[:, self.year_position(year)]
+        if tickers is None:
+            return values
+        return values[self.ticker_positions(tickers)]
+
+    def median(self, tickers=None):
+        """return the (years, metrics) median of tickers, ignoring missing data"""
+        values = self.values
+        if tickers is not None:
+            values = values[isin(self.tickers, list(tickers))]
+        return nanmedian(values, axis=0)
+
+
+def open_panel(from_folder):
+    """return the Panel built from from_folder or None if there is none"""
+    folder = get_panel_folder(from_folder)
+    if os.path.exists(f'{folder}/{VALUES}'):
+        return Panel(folder)
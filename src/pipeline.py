@@ -0,0 +1,309 @@
+import os
+import queue
+import threading
+import time
+
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
+from pandas import Series, concat
+from src import logger, spans
+from src.batch import get_summary_columns
+from src.executor import Job, Record, get_chunksize, get_workers
+from src.shared import SharedSummaries
+from src.summaries import SummaryTable, to_rows
+
+STOP = None
+SHARED = None
+
+
+def attach(layout, entries, level):
+    """attach a worker to the shared summaries of the run, if any, and send
+       its log entries to the log writer of the run
+    """
+    global SHARED
+    if layout is not None:
+        SHARED = SharedSummaries.attach(layout)
+        # closed when the worker exits after the pool is closed
+        Finalize(SHARED, SHARED.close, exitpriority=10)
+    logger.configure(level=level, sink=logger.QueueSink(entries))
+
+def analyze(task):
+    """return a Record of the summary computed from prefetched raw data,
+       its ticker and summary are None when the file could not be analyzed,
+       with shared summaries the summary is written to the slot of the job
+       instead of being returned, unless it does not fit their columns
+    """
+    job, raw_data = task
+    start_time = time.time()
+    with spans.collect() as collected:
+        try:
+            result = job.stock(filename=job.filename, raw_data=raw_data)
+            ticker, summary, error = result.ticker, result.get_summary(), None
+        except Exception as exception:
+            print('[ERROR]::Could not process::', job.filename)
+            ticker, summary, error = None, None, repr(exception)
+    if SHARED is not None and job.slot is not None:
+        if SHARED.write(job.slot, summary):
+            summary = None
+        elif not isinstance(summary, Series):
+            ticker, summary = None, None
+    # entries of a file go to the log writer in one batch
+    logger.flush()
+    return Record(
+        job.source, job.filename, ticker, summary,
+        time.time() - start_time, os.getpid(), error, job.slot,
+        tuple(collected),
+    )
+
+def get_columns(stocks):
+    """return the summary columns of every stock in order without repeats"""
+    columns = {}
+    for stock in stocks:
+        columns.update(dict.fromkeys(get_summary_columns(stock)))
+    return list(columns)
+
+
+class Pipeline:
+    """overlaps reading, analysis and writing of summaries
+
+       a reader thread prefetches raw data, a process pool analyzes it and a
+       writer thread appends summaries to the summary table in batches. at most queue_depth files
+       are in flight between the reader and the writer so a slow stage
+       holds back the others instead of filling memory
+
+       jobs from several sources can share one run so the pool is not left
+       idle between them, callbacks are called in the parent with every
+       Record as it completes
+
+       with shared=True workers write summaries to SharedSummaries instead
+       of returning them, they stay readable with get_summaries until close
+
+       log entries of the workers and the reader go through a queue to one
+       LogWriter process so they are written in batches, not interleaved.
+       workers send the spans of every file with its Record, they are added
+       to spans.SPANS under the worker that timed them
+    """
+
+    def __init__(
+        self, stock=None, source=None, to_folder=None, processes=None,
+        queue_depth=64, batch_size=32, cache=True, store=None,
+        chunksize=None, callbacks=(), shared=False,
+    ):
+        self.stock = stock
+        self.source = source
+        self.to_folder = to_folder
+        self.processes = processes
+        self.queue_depth = queue_depth
+        self.batch_size = batch_size
+        self.cache = cache
+        self.store = store
+        self.chunksize = chunksize
+        self.callbacks = list(callbacks)
+        self.shared = shared
+        self.summaries = None
+        self.tasks = queue.Queue(maxsize=queue_depth)
+        self.results = queue.Queue(maxsize=queue_depth)
+        self.in_flight = threading.BoundedSemaphore(queue_depth)
+        self.stopping = threading.Event()
+        self.records = []
+
+    def prefetch(self, job):
+        try:
+            return job.stock(
+                filename=job.filename, cache=self.cache, store=self.store,
+                analyze=False,
+            ).get_raw_data(used_columns_only=True)
+        except Exception:
+            return
+
+    def read(self, jobs):
+        try:
+            for job in jobs:
+                if self.stopping.is_set():
+                    break
+                self.tasks.put((job, self.prefetch(job)))
+        finally:
+            self.tasks.put(STOP)
+
+    def get_tasks(self):
+        while True:
+            self.in_flight.acquire()
+            task = self.tasks.get()
+            if task is STOP or self.stopping.is_set():
+                return
+            yield task
+
+    def stop(self, reader):
+        """unblock the reader and the task feeder of the pool after a
+           failure, the reader stops at its next file
+        """
+        self.stopping.set()
+        while reader.is_alive():
+            try:
+                self.tasks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        try:
+            # wakes a feeder waiting for a task
+            self.tasks.put_nowait(STOP)
+        except queue.Full:
+            pass
+        try:
+            # wakes a feeder waiting for a slot
+            self.in_flight.release()
+        except ValueError:
+            pass
+
+    def write_batch(self, batch):
+        written = set()
+        for to_folder, records in self.group_by_folder(batch).items():
+            try:
+                written.update(
+                    (to_folder, ticker)
+                    for ticker in self.append(to_folder, records)
+                )
+            except Exception:
+                print('[ERROR]::Could not write batch to::', to_folder)
+        for to_folder, record in batch:
+            if (to_folder, record.ticker) not in written:
+                record = record._replace(ticker=None)
+            self.records.append(record)
+
+    def append(self, to_folder, records):
+        table = SummaryTable(to_folder)
+        if self.summaries is None:
+            return table.append(
+                (record.ticker, record.summary) for _, record in records
+            )
+        return table.append_rows(self.read_summaries(
+            record for _, record in records
+        ))
+
+    def read_summaries(self, records):
+        """return the summaries of records from shared memory, or from the
+           record when the worker could not write it there
+        """
+        records = [record for record in records if record.ticker is not None]
+        shared = [record for record in records if record.summary is None]
+        rows = self.summaries.read(
+            [record.slot for record in shared],
+            [record.ticker for record in shared],
+        )
+        returned = to_rows(
+            (record.ticker, record.summary) for record in records
+            if record.summary is not None
+        )
+        if not len(returned):
+            return rows
+        rows = concat([rows, returned], axis=0, sort=False)
+        return rows[~rows.index.duplicated(keep='last')]
+
+    def get_summaries(self, source):
+        """return the shared summaries written for files of source"""
+        return self.read_summaries(
+            record for record in self.records if record.source == source
+        )
+
+    def close(self):
+        """release the shared summaries"""
+        if self.summaries is not None:
+            self.summaries.unlink()
+            self.summaries = None
+
+    @staticmethod
+    def group_by_folder(batch):
+        groups = {}
+        for to_folder, record in batch:
+            groups.setdefault(to_folder, []).append((to_folder, record))
+        return groups
+
+    def write(self):
+        batch = []
+        while True:
+            result = self.results.get()
+            if result is STOP:
+                break
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+        self.write_batch(batch)
+
+    def completed(self, folders, record):
+        self.in_flight.release()
+        spans.SPANS.add_all(record.spans, worker=record.worker)
+        for callback in self.callbacks:
+            callback(record)
+        self.results.put((folders[record.source], record))
+
+    def run_jobs(self, jobs):
+        """return a Record for every Job in jobs, its ticker is None when no
+           summary was written for the file
+        """
+        jobs = list(jobs)
+        layout = None
+        if self.shared:
+            self.close()
+            self.summaries = SharedSummaries(
+                get_columns({job.stock: None for job in jobs}), len(jobs)
+            )
+            jobs = [job._replace(slot=slot) for slot, job in enumerate(jobs)]
+            layout = self.summaries.get_layout()
+        start_time = time.time()
+        workers = get_workers(self.processes, tasks=len(jobs))
+        # the pool waits for a whole chunk before sending it, a chunk larger
+        # than queue_depth would wait for files that are never let in
+        chunksize = min(
+            self.chunksize or get_chunksize(len(jobs), workers, in_flight=self.queue_depth),
+            self.queue_depth,
+        )
+        folders = {job.source: job.to_folder for job in jobs}
+        # a failed run may leave tasks and slots behind
+        self.tasks = queue.Queue(maxsize=self.queue_depth)
+        self.in_flight = threading.BoundedSemaphore(self.queue_depth)
+        self.stopping.clear()
+        with logger.LogWriter() as log_writer:
+            reader = threading.Thread(target=self.read, args=(jobs,), daemon=True)
+            writer = threading.Thread(target=self.write)
+            reader.start()
+            writer.start()
+            try:
+                with Pool(
+                    workers, initializer=attach,
+                    initargs=(layout, log_writer.queue, logger.LEVEL),
+                ) as pool:
+                    try:
+                        for record in pool.imap_unordered(
+                            analyze, self.get_tasks(), chunksize=chunksize
+                        ):
+                            self.completed(folders, record)
+                    except BaseException:
+                        self.stop(reader)
+                        raise
+                    # workers exit on their own and release what they attached
+                    pool.close()
+                    pool.join()
+            finally:
+                self.results.put(STOP)
+                writer.join()
+            reader.join()
+        duration = time.time() - start_time
+        print(
+            f'::analyzed {len(self.records)} files from '
+            f'{", ".join(sorted(folders))} with {workers} workers in chunks of '
+            f'{chunksize} in {duration:.2f} seconds, '
+            f'{len(self.records) / duration:.1f} files/sec::'
+        )
+        return self.records
+
+    def run(self, filenames):
+        """return (source file, ticker) for every file in filenames,
+           ticker is None when no summary was written for the file
+        """
+        return [
+            (f'{record.source}{record.filename}', record.ticker)
+            for record in self.run_jobs(
+                Job(self.stock, self.source, self.to_folder, filename)
+                for filename in filenames
+            )
+        ]
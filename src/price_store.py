@@ -0,0 +1,210 @@
+import itertools
+import json
+import os
+import re
+import time
+
+from numpy import (
+    array, concatenate, datetime64, empty, full, int64, lexsort, load, nan,
+    savez, searchsorted, unique,
+)
+from pandas import DataFrame, Series, read_pickle
+from src.columnar import is_fresh
+from src.utilities import file_fingerprint, list_filetype, makedir, store_folder
+
+sequence = itertools.count()
+
+
+def to_days(dates):
+    """return dates as int64 days since 1970-01-01"""
+    return array(dates, dtype='datetime64[D]').astype(int64)
+
+def read_prices_pickle(filename):
+    """return (dates, tickers, prices) saved by get_current_prices in a
+       {date}_current_prices.pkl file, a Series of one day or a DataFrame
+       with a column per day
+    """
+    prices = read_pickle(filename)
+    if isinstance(prices, Series):
+        day = re.search(r'(\d{4}-\d{2}-\d{2})_current_prices', filename)[1]
+        prices = prices.to_frame(name=day)
+    prices = prices.stack().dropna()
+    tickers = prices.index.get_level_values(0).astype(str).to_numpy()
+    dates = to_days(prices.index.get_level_values(1).to_numpy())
+    return dates, tickers, prices.to_numpy(dtype='float64')
+
+
+class PriceStore:
+    """an append only store of prices indexed by (ticker, date)
+
+       every append writes a new part file so writers never rewrite what is
+       stored, reading merges the parts sorted by ticker and date keeping
+       the price appended last for a (ticker, date), compaction rewrites
+       the parts as one under the name of the newest part it replaces
+    """
+
+    def __init__(self, folder=store_folder('prices')):
+        self.folder = folder
+
+    def parts(self):
+        return [
+            os.path.join(self.folder, filename)
+            for filename in list_filetype(in_folder=self.folder, extension='npz')
+            if filename.startswith('part_')
+        ]
+
+    def write_part(self, dates, tickers, prices, target=None):
+        makedir(self.folder)
+        if target is None:
+            target = os.path.join(
+                self.folder,
+                f'part_{time.time_ns():020d}_{os.getpid()}_{next(sequence)}.npz'
+            )
+        temporary = f'{target}.tmp'
+        with open(temporary, 'wb') as out_file:
+            savez(
+                out_file, dates=to_days(dates),
+                tickers=array(tickers, dtype=str),
+                prices=array(prices, dtype='float64'),
+            )
+        os.replace(temporary, target)
+        return target
+
+    def append(self, prices, date):
+        """store a Series of prices by ticker for date, nan is left out"""
+        prices = prices.dropna()
+        if len(prices):
+            self.write_part(
+                full(len(prices), datetime64(date, 'D')),
+                prices.index.astype(str), prices.to_numpy(dtype='float64'),
+            )
+        return len(prices)
+
+    def read(self):
+        """return (dates, tickers, prices) arrays sorted by ticker and date
+           with one price per (ticker, date)
+        """
+        dates, tickers, prices = [], [], []
+        for part in self.parts():
+            with load(part) as arrays:
+                dates.append(arrays['dates'])
+                tickers.append(arrays['tickers'])
+                prices.append(arrays['prices'])
+        if not dates:
+            return empty(0, int64), empty(0, str), empty(0)
+        dates, tickers, prices = (
+            concatenate(dates), concatenate(tickers), concatenate(prices)
+        )
+        # parts are listed oldest first so the stable sort keeps the order
+        # they were appended in within a (ticker, date)
+        order = lexsort((dates, tickers))
+        dates, tickers, prices = dates[order], tickers[order], prices[order]
+        last = concatenate([
+            (dates[1:] != dates[:-1]) | (tickers[1:] != tickers[:-1]), [True]
+        ])
+        return dates[last], tickers[last], prices[last]
+
+    def to_frame(self):
+        """return every stored price with a (TICKER, DATE) index"""
+        dates, tickers, prices = self.read()
+        return DataFrame(
+            {'TICKER': tickers, 'DATE': dates.astype('datetime64[D]'), 'PRICE': prices}
+        ).set_index(['TICKER', 'DATE'])
+
+    def lookup(self, tickers, date):
+        """return the latest price and its date of every ticker on or before
+           date, nan and NaT for tickers without one, date may be one date or
+           one per ticker
+        """
+        dates, names, prices = self.read()
+        tickers = array(list(tickers), dtype=str)
+        found_prices = Series(nan, index=tickers, dtype='float64')
+        found_dates = Series(None, index=tickers, dtype='datetime64[ns]')
+        if not len(dates):
+            return found_prices, found_dates
+        # one sorted key per stored price, a ticker's code times a width
+        # larger than any day plus the day, so one searchsorted finds the
+        # last price on or before the date of every ticker
+        labels, stored_codes = unique(names, return_inverse=True)
+        codes = searchsorted(labels, tickers).clip(max=len(labels) - 1)
+        width = int64(1) << 32
+        positions = searchsorted(
+            stored_codes * width + dates,
+            codes * width + full(len(tickers), 0, dtype=int64) + to_days(date),
+            side='right',
+        ) - 1
+        found = (
+            (labels[codes] == tickers) & (positions >= 0)
+          & (stored_codes[positions.clip(0)] == codes)
+        )
+        positions = positions[found]
+        found_prices[found] = prices[positions]
+        found_dates[found] = dates[positions].astype('datetime64[D]')
+        return found_prices, found_dates
+
+    def as_of(self, tickers, date):
+        """return the latest price of every ticker on or before date"""
+        return self.lookup(tickers, date)[0]
+
+    def compact(self, before=None):
+        """rewrite all parts as one, with before only the last price of each
+           ticker before that date is kept so as of lookups on or after
+           before answer the same
+        """
+        parts = self.parts()
+        dates, tickers, prices = self.read()
+        if before is not None:
+            old = dates < to_days(before)
+            # the last old price of a ticker is followed by another ticker
+            # or by a price that is not old
+            last_old = concatenate([
+                (tickers[1:] != tickers[:-1]) | ~old[1:], [True]
+            ])
+            keep = ~old | last_old
+            dates, tickers, prices = dates[keep], tickers[keep], prices[keep]
+        if len(dates):
+            # parts appended while compacting sort after the newest part
+            # so their prices are still read as appended last
+            self.write_part(
+                dates.astype('datetime64[D]'), tickers, prices, target=parts[-1]
+            )
+            parts = parts[:-1]
+        for part in parts:
+            os.remove(part)
+
+    def imported_filename(self):
+        return os.path.join(self.folder, 'imported.json')
+
+    def read_imported(self):
+        try:
+            with open(self.imported_filename()) as in_file:
+                return json.load(in_file)
+        except FileNotFoundError:
+            return {}
+
+    def write_imported(self, imported):
+        makedir(self.folder)
+        temporary = f'{self.imported_filename()}.tmp'
+        with open(temporary, 'w') as out_file:
+            json.dump(imported, out_file)
+        os.replace(temporary, self.imported_filename())
+
+    def import_pickles(self, folder='prices'):
+        """append every {date}_current_prices.pkl in folder in date order
+           and return how many prices were stored, pickles imported before
+           are skipped unless they changed since
+        """
+        imported = self.read_imported()
+        count = 0
+        for filename in list_filetype(in_folder=folder, extension='pkl'):
+            source = os.path.join(folder, filename)
+            if filename in imported and is_fresh(source, imported[filename]):
+                continue
+            fingerprint = file_fingerprint(source, checksum=True)
+            dates, tickers, prices = read_prices_pickle(source)
+            if len(dates):
+                self.write_part(dates.astype('datetime64[D]'), tickers, prices)
+                count += len(dates)
+            imported[filename] = fingerprint
+            self.write_imported(imported)
+        return count
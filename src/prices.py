@@ -0,0 +1,198 @@
+import asyncio
+import datetime
+import os
+import time
+import yfinance as yahoo_finance
+import zlib
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from pandas import Series, Timestamp, concat
+from src.logger import Logger
+from src.price_store import PriceStore
+
+
+def to_last_prices(prices, tickers):
+    """return the last known close of every ticker from a download with a
+       row per day and a column per ticker, or a column per field for one
+       ticker
+    """
+    if prices is None or not len(prices):
+        return Series(dtype='float64')
+    field = 'Adj Close' if 'Adj Close' in prices.columns.get_level_values(0) else 'Close'
+    closes = prices[field]
+    if isinstance(closes, Series):
+        closes = closes.to_frame(name=list(tickers)[0])
+    return closes.ffill().iloc[-1].dropna().astype('float64')
+
+def get_batches(tickers, size):
+    tickers = list(dict.fromkeys(tickers))
+    return [tickers[start:start + size] for start in range(0, len(tickers), size)]
+
+
+class PriceProvider(ABC):
+    """returns the current price of tickers as a Series indexed by ticker,
+       tickers without a price are left out
+    """
+
+    @abstractmethod
+    def get_prices(self, tickers):
+        """return the prices of tickers found by the provider"""
+
+
+class StubProvider(PriceProvider):
+    """deterministic prices that need no network, prices given are used as
+       they are and every other ticker gets a price from its name
+    """
+
+    def __init__(self, prices=None):
+        self.prices = dict(prices or {})
+
+    def get_price(self, ticker):
+        if ticker in self.prices:
+            return self.prices[ticker]
+        return 1 + zlib.crc32(str(ticker).encode()) % 50000 / 100
+
+    def get_prices(self, tickers):
+        return Series(
+            {ticker: self.get_price(ticker) for ticker in dict.fromkeys(tickers)},
+            dtype='float64',
+        )
+
+
+class LastKnownProvider(PriceProvider):
+    """the latest stored price of every ticker on or before date"""
+
+    def __init__(self, store=None, date=None):
+        self.store = PriceStore() if store is None else store
+        self.date = date
+
+    def get_prices(self, tickers):
+        date = datetime.date.today() if self.date is None else self.date
+        return self.store.as_of(tickers, date).dropna()
+
+
+class RateLimit:
+    """lets at most calls per second start, one after the other"""
+
+    def __init__(self, calls=2.0):
+        self.interval = 1 / calls
+        self.next = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            delay = self.next - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next = time.monotonic() + self.interval
+
+
+class YahooProvider(PriceProvider):
+    """downloads prices from yahoo finance in batches of batch_size tickers
+
+       at most concurrency batches are downloaded at a time, starting no
+       more than rate batches a second, a failed batch is retried with
+       growing waits and tickers of batches that still fail are left out
+    """
+
+    def __init__(
+        self, batch_size=100, concurrency=4, rate=2.0, retries=3,
+        backoff=1.0, download=None, days=5,
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.download = download if download is not None else self.download_yahoo
+        self.days = days
+        self.failed = []
+
+    def download_yahoo(self, tickers):
+        return yahoo_finance.download(
+            list(tickers),
+            start=datetime.date.today() - datetime.timedelta(days=self.days),
+            progress=False,
+            threads=False,
+        )
+
+    async def get_batch(self, tickers, slots, limit):
+        logger = Logger(','.join(tickers))
+        for attempt in range(self.retries + 1):
+            async with slots:
+                await limit.wait()
+                try:
+                    prices = await asyncio.get_running_loop().run_in_executor(
+                        None, self.download, tickers
+                    )
+                    return to_last_prices(prices, tickers)
+                except Exception as error:
+                    logger.warning(
+                        'Downloading %s prices, attempt %s FAILED::%r',
+                        len(tickers), attempt + 1, error,
+                    )
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        logger.error('Downloading %s prices', len(tickers))
+        self.failed += tickers
+
+    async def gather(self, tickers):
+        slots = asyncio.Semaphore(self.concurrency)
+        limit = RateLimit(self.rate)
+        return await asyncio.gather(*(
+            self.get_batch(batch, slots, limit)
+            for batch in get_batches(tickers, self.batch_size)
+        ))
+
+    def run(self, tickers):
+        """return the batches of tickers, from within a running event loop,
+           as in a notebook, they are gathered on a loop of their own in
+           another thread
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.gather(tickers))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.gather(tickers)).result()
+
+    def get_prices(self, tickers):
+        self.failed = []
+        prices = [
+            batch for batch in self.run(tickers)
+            if batch is not None and len(batch)
+        ]
+        if not prices:
+            return Series(dtype='float64')
+        prices = concat(prices)
+        return prices[~prices.index.duplicated(keep='last')]
+
+
+def get_provider():
+    """return the provider named by HAYSTACK_PRICES, yahoo by default and
+       stub to run without a network
+    """
+    if os.environ.get('HAYSTACK_PRICES', 'yahoo').lower() == 'stub':
+        return StubProvider()
+    return YahooProvider()
+
+def get_current_prices(tickers, provider=None, store=None, today=None):
+    """return the current price of tickers, prices are stored once a day
+       and tickers the provider has no price for get their last stored one
+    """
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    today = datetime.date.today() if today is None else today
+    store = PriceStore() if store is None else store
+    prices, dates = store.lookup(tickers, today)
+    missing = [
+        ticker for ticker, date in zip(tickers, dates)
+        if date != Timestamp(today)
+    ]
+    if missing:
+        provider = get_provider() if provider is None else provider
+        if not store.append(provider.get_prices(missing), today):
+            print('I could not download current prices, using last known prices instead')
+        prices = store.as_of(tickers, today)
+    return prices
@@ -1,3 +1,5 @@
+from src import prices
+
 def calc_growth(self, dataframe, using="simple"):
     "Return Simple or Compound Growth Rate"
     if using == "compound":
@@ -80,38 +82,13 @@ def yahoo_finance_download(self, tickers=None, start=None):
                 threading=16
             )
 
-def get_current_prices(self, symbols="", dataframe=None):
-    """Return """
+def get_current_prices(self, symbols="", dataframe=None, provider=None):
+    """Return the current price of every symbol or of every row of dataframe"""
     try:
         tickers = dataframe.index
     except AttributeError:
         tickers = symbols
-
-    today = datetime.date.today()
-    prices_today = f"prices/{str(today)}_current_prices.pkl"
-    try:
-        current_prices = pandas.read_pickle(prices_today)
-    except FileNotFoundError:
-        try:
-            prices = self.yahoo_finance_download(
-                tickers=tickers, start=today,
-            )
-        except ValueError:
-            prices = self.yahoo_finance_download(
-                tickers=tickers,
-                start=today - datetime.timedelta(days=1),
-            )
-        current_prices = prices["Adj Close"].T.squeeze()
-        current_prices.to_pickle(prices_today)
-    except Exception:
-        self.logger.error("I could not download current prices, "
-                "using last known prices instead")
-        last_known_prices = sorted(
-            list_filetype(in_folder="prices", extension="pkl")
-        )[-1]
-        return pandas.read_pickle(last_known_prices)
-
-    return current_prices
+    return prices.get_current_prices(tickers, provider=provider)
 
 def get_ticker_and_filename(self, filename=None, ticker=None,
                             folder=None):
@@ -1,34 +1,29 @@
-from pandas import concat, Series
-
-def zero_numerator(numerator, denominator):
-    return -abs(denominator[numerator == 0])
-
-def negative_denominator(numerator, denominator):
-    # returns -abs(x/y) when y is negative
-    return -abs(numerator[(numerator != 0) & (denominator < 0)] / denominator[(numerator != 0) & (denominator < 0)])
-
-def negative_numerator(numerator, denominator):
-    return -abs(numerator[(numerator < 0) & (denominator > 0)] / denominator[(numerator < 0) & (denominator > 0)])
-
-def negative_numerator_zero_denominator(numerator, denominator):
-    return -abs(numerator[(numerator < 0) & (denominator == 0)])
-
-def zero_denominator(numerator, denominator):
-    return numerator[(numerator > 0) & (denominator == 0)]
-
-def classic_series_ratio(numerator, denominator):
-    return numerator[(numerator > 0) & (denominator > 0)] / denominator[(numerator > 0) & (denominator > 0)]
+from numpy import absolute, asarray, errstate, where
+from pandas import Series
+
+def ratio_kernel(numerator, denominator):
+    """return ratios of arrays of any shape with the sign rules of get_ratio
+       -abs(denominator) when the numerator is 0
+       the numerator when the denominator is 0
+       -abs(ratio) when either is negative
+       nan where either is nan
+    """
+    numerator = asarray(numerator, dtype='float64')
+    denominator = asarray(denominator, dtype='float64')
+    with errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    result = where(
+        (numerator > 0) & (denominator > 0), result, -absolute(result)
+    )
+    result = where(denominator == 0, numerator, result)
+    return where(numerator == 0, -absolute(denominator), result)
 
 def get_series_ratio(numerator, denominator):
-    return concat(
-        [
-            zero_numerator(numerator, denominator), 
-            negative_denominator(numerator, denominator), 
-            negative_numerator(numerator, denominator),
-            negative_numerator_zero_denominator(numerator, denominator), 
-            zero_denominator(numerator, denominator), 
-            classic_series_ratio(numerator, denominator)
-        ],axis=0
+    if not numerator.index.equals(denominator.index):
+        numerator, denominator = numerator.align(denominator)
+    return Series(
+        ratio_kernel(numerator.to_numpy(), denominator.to_numpy()),
+        index=numerator.index,
     )
 
 def get_dataframe_ratio(numerator, denominator):
@@ -52,4 +47,4 @@ def get_ratio(numerator, denominator):
     if isinstance(numerator, Series) and isinstance(denominator, Series):
         return get_series_ratio(numerator, denominator)
     else:
-        return get_dataframe_ratio(numerator, denominator)
\ No newline at end of file
+        return get_dataframe_ratio(numerator, denominator)
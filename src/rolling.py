@@ -0,0 +1,133 @@
+from numpy import (
+    arange, asarray, concatenate, cumsum, full, isinf, isnan, moveaxis, nan,
+    sort, take_along_axis, where, zeros,
+)
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def pad_front(values, width):
+    """return values with width nan positions before the first along the
+       last axis
+    """
+    return concatenate(
+        [full(values.shape[:-1] + (width,), nan), values], axis=-1
+    )
+
+def get_counts(values, widest):
+    """return the running count of values that are not nan along the last
+       axis with widest zeros in front, so the count of a window ending at
+       end is counts[end + widest] - counts[end + widest - window]
+    """
+    return concatenate(
+        [
+            zeros(values.shape[:-1] + (widest,), dtype='int64'),
+            cumsum(~isnan(values), axis=-1),
+        ],
+        axis=-1,
+    )
+
+def get_window_counts(counts, window, widest):
+    """return the count of values that are not nan in every window"""
+    return counts[..., widest:] - counts[..., widest - window:-window]
+
+def get_sorted_windows(padded, window, widest):
+    """return every window of padded values sorted along a new last axis,
+       nan sorts last
+    """
+    return sort(
+        sliding_window_view(padded[..., widest - window:], window, axis=-1),
+        axis=-1,
+    )
+
+def get_ranked(ordered, position):
+    """return ordered at position along its last axis"""
+    return take_along_axis(ordered, position[..., None], axis=-1)[..., 0]
+
+def check_periods(windows, min_periods):
+    if min(windows) < 1:
+        raise ValueError('window must be at least 1')
+    if min_periods < 0 or min_periods > min(windows):
+        raise ValueError(f'min_periods {min_periods} must be between 0 and window')
+
+def prepare(values, axis):
+    """return values as floats with axis last"""
+    return moveaxis(asarray(values, dtype='float64'), axis, -1)
+
+def rolling_medians(values, windows, axis=0, min_periods=1):
+    """return the rolling median of values along axis for every window,
+       shaped (windows, *values.shape)
+
+       the values are padded and counted once for all windows and every
+       window sorts a view of the padded values, nan sorts last so the middle
+       values are picked by count, nan and infinite values are left out and
+       windows with fewer than min_periods values are nan like
+       DataFrame.rolling(window, min_periods).median()
+    """
+    windows = list(windows)
+    check_periods(windows, min_periods)
+    values = prepare(values, axis)
+    values = where(isinf(values), nan, values)
+    widest = max(windows)
+    padded = pad_front(values, widest - 1)
+    counts = get_counts(values, widest)
+    result = full((len(windows), *values.shape), nan)
+    for position, window in enumerate(windows):
+        ordered = get_sorted_windows(padded, window, widest)
+        count = get_window_counts(counts, window, widest)
+        low = get_ranked(ordered, ((count - 1) // 2).clip(0))
+        high = get_ranked(ordered, (count // 2).clip(max=window - 1))
+        result[position] = where(
+            (count == 0) | (count < min_periods),
+            nan,
+            where(count % 2 == 1, high, (high + low) / 2),
+        )
+    return moveaxis(result, -1, axis + 1)
+
+def rolling_median(values, window, axis=0, min_periods=1):
+    """return the rolling median of values along axis"""
+    return rolling_medians(
+        values, [window], axis=axis, min_periods=min_periods
+    )[0]
+
+def rolling_mean(values, window, axis=0, min_periods=1):
+    """return the rolling mean of values along axis leaving out nan and
+       infinite values, windows with fewer than min_periods values are nan
+       like DataFrame.rolling(window, min_periods).mean()
+    """
+    check_periods([window], min_periods)
+    values = prepare(values, axis)
+    values = where(isinf(values), nan, values)
+    counts = get_window_counts(get_counts(values, window), window, window)
+    padded = pad_front(values, window - 1)
+    totals = sliding_window_view(
+        where(isnan(padded), 0.0, padded), window, axis=-1
+    ).sum(axis=-1)
+    with_values = (counts > 0) & (counts >= min_periods)
+    result = where(with_values, totals / where(with_values, counts, 1), nan)
+    return moveaxis(result, -1, axis)
+
+def rolling_trimmed_mean(values, window, proportion=0.1, axis=0, min_periods=1):
+    """return the rolling mean of values along axis without the
+       int(proportion * count) lowest and highest values of every window
+       like scipy.stats.trim_mean, nan and infinite values are left out
+       like DataFrame.rolling(window, min_periods).mean() does and windows
+       with fewer than min_periods values are nan
+    """
+    check_periods([window], min_periods)
+    if not 0 <= proportion < 0.5:
+        raise ValueError(f'proportion {proportion} must be in [0, 0.5)')
+    values = prepare(values, axis)
+    values = where(isinf(values), nan, values)
+    ordered = get_sorted_windows(pad_front(values, window - 1), window, window)
+    counts = get_window_counts(get_counts(values, window), window, window)
+    trimmed = (counts * proportion).astype('int64')
+    positions = arange(window)
+    kept = (
+        (positions >= trimmed[..., None])
+      & (positions < (counts - trimmed)[..., None])
+    )
+    kept_counts = counts - 2 * trimmed
+    with_values = (kept_counts > 0) & (counts >= min_periods)
+    totals = where(kept, ordered, 0.0).sum(axis=-1)
+    result = where(with_values, totals / where(with_values, kept_counts, 1), nan)
+    return moveaxis(result, -1, axis)
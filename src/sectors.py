@@ -1,6 +1,7 @@
 from pandas import concat
 from numpy import median
 from stock import Stock
+from summaries import read_summaries
 from utilities import (
     processed_folder, sectors_folder, analysis_folder
 )
@@ -11,7 +12,8 @@ class Sectors:
 
     def __init__(
         self, sectors_folder=None, stocks_folder=None,
-        to_folder=processed_folder(analysis_folder(sectors_folder()))
+        to_folder=processed_folder(analysis_folder(sectors_folder())),
+        stocks_df=None,
     ):
         analyst = Stock(
             from_folder=sectors_folder, to_folder=to_folder
@@ -21,8 +23,9 @@ class Sectors:
             sectors_folder, file_col="SECTOR", header=0
         )
         
-        self.stocks_df = analyst.combine_files(
-            stocks_folder, axis=1, ignore_index=True
+        # summaries already in memory, like Pipeline.get_summaries, skip the table
+        self.stocks_df = (
+            read_summaries(stocks_folder) if stocks_df is None else stocks_df
         )
 
         if self.stocks_df is not None and self.sectors_df is not None:
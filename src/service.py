@@ -0,0 +1,321 @@
+import json
+import math
+import os
+import resource
+import threading
+import time
+
+from collections import Counter, OrderedDict, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pandas import DataFrame, Series, concat, read_csv
+from src.batch import get_prototype, summarize
+from src.stock import Edgar, StockPup
+from src.store import open_store
+from src.utilities import edgar_folder, list_filetype, sectors_folder, stockpup_folder
+
+SOURCES = ((Edgar, edgar_folder()), (StockPup, stockpup_folder()))
+
+
+class NotFound(KeyError):
+    """no ticker, sector or route of the name asked for, answered with 404"""
+
+
+class BadRequest(ValueError):
+    """a query parameter that can not be used, answered with 400"""
+
+
+def to_json(value):
+    """return value with Series and DataFrames as dicts and nan as None"""
+    if isinstance(value, DataFrame):
+        return {
+            str(index): to_json(row) for index, row in value.iterrows()
+        }
+    if isinstance(value, Series):
+        return {str(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, dict):
+        return {str(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if hasattr(value, 'item'):
+        return to_json(value.item())
+    return value
+
+def read_sectors(folder):
+    """return the SPDR sector symbol of every ticker held by the sector
+       funds in folder
+    """
+    frames = []
+    for filename in list_filetype(in_folder=folder):
+        holdings = read_csv(
+            os.path.join(folder, filename), header=1,
+            usecols=['Symbol', 'Company Name'], index_col='Symbol',
+        )
+        frames.append(Series(
+            os.path.splitext(filename)[0].upper(), index=holdings.index,
+            name='SECTOR_SYMBOL',
+        ))
+    sectors = concat(frames) if frames else Series(dtype=str, name='SECTOR_SYMBOL')
+    return sectors[~sectors.index.duplicated(keep='first')]
+
+def get_memory_use():
+    """return the resident and peak resident memory of this process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        with open('/proc/self/statm') as in_file:
+            resident = int(in_file.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        resident = None
+    return {'resident_bytes': resident, 'peak_resident_bytes': peak}
+
+
+class Cache:
+    """a least recently used mapping that counts hits and misses"""
+
+    def __init__(self, size=None):
+        self.size = size
+        self.items = OrderedDict()
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def get(self, key, load):
+        """return the item of key, calling load for it when it is missing"""
+        with self.lock:
+            if key in self.items:
+                self.counts['hits'] += 1
+                self.items.move_to_end(key)
+                return self.items[key]
+            self.counts['misses'] += 1
+        item = load()
+        with self.lock:
+            # a request loading the same key at the same time keeps its item
+            item = self.items.setdefault(key, item)
+            self.items.move_to_end(key)
+            while self.size is not None and len(self.items) > self.size:
+                self.items.popitem(last=False)
+        return item
+
+    def get_status(self):
+        requests = self.counts['hits'] + self.counts['misses']
+        return {
+            'items': len(self.items),
+            'hits': self.counts['hits'],
+            'misses': self.counts['misses'],
+            'hit_rate': self.counts['hits'] / requests if requests else None,
+        }
+
+
+class Analysis:
+    """keeps stores, stocks, summaries and sectors warm between queries
+
+       stocks are kept with their memoised intermediate results so repeated
+       queries for a ticker only look results up, the summaries of every
+       source are computed once in one batch for sector rankings
+    """
+
+    def __init__(self, sources=SOURCES, sectors=sectors_folder(), max_stocks=512):
+        self.sources = list(sources)
+        self.sectors_folder = sectors
+        self.stores = Cache()
+        self.stocks = Cache(size=max_stocks)
+        self.summaries = Cache()
+        self.sectors = Cache()
+        # locks are never evicted, a request holding one while another
+        # gets a new lock for the same ticker would not be serialised
+        self.locks = defaultdict(threading.Lock)
+        self.locks_lock = threading.Lock()
+
+    def get_store(self, source):
+        return self.stores.get(source, lambda: open_store(source))
+
+    def find(self, ticker):
+        """return the stock class and source of the first source with ticker"""
+        for stock, source in self.sources:
+            filename = get_prototype(stock).get_filename(ticker)
+            if os.path.exists(os.path.join(source, filename)):
+                return stock, source
+        raise NotFound(f'no source has {ticker}')
+
+    def get_stock(self, ticker):
+        ticker = ticker.upper()
+        def load():
+            stock, source = self.find(ticker)
+            return stock(ticker=ticker, store=self.get_store(source))
+        return self.stocks.get(ticker, load)
+
+    def get_lock(self, ticker):
+        with self.locks_lock:
+            return self.locks[ticker.upper()]
+
+    def call(self, ticker, method):
+        """return method of the stock of ticker, one query at a time per
+           ticker since a stock fills its results in as they are asked for
+        """
+        stock = self.get_stock(ticker)
+        with self.get_lock(ticker):
+            return method(stock)
+
+    def get_summary(self, ticker):
+        return self.call(ticker, lambda stock: stock.get_summary())
+
+    def get_ratios(self, ticker):
+        return self.call(ticker, lambda stock: {
+            'average': stock.get_average_moving_average_ratios(),
+            'years': stock.get_moving_average_ratios(),
+        })
+
+    def get_summaries(self):
+        """return the summaries of every source, a ticker in several sources
+           keeps the summary of the first
+        """
+        def load():
+            frames = []
+            for stock, source in self.sources:
+                summaries, _ = summarize(
+                    stock, list_filetype(in_folder=source),
+                    store=self.get_store(source),
+                )
+                frames.append(summaries)
+            summaries = concat(frames, axis=0, sort=False)
+            return summaries[~summaries.index.duplicated(keep='first')]
+        return self.summaries.get('all', load)
+
+    def get_sectors(self):
+        return self.sectors.get('all', lambda: read_sectors(self.sectors_folder))
+
+    def rank_sector(self, sector, by='AVERAGE_GROWTH', top=None):
+        """return the tickers of sector best first by the summary column by"""
+        summaries = self.get_summaries()
+        if by not in summaries.columns:
+            raise BadRequest(f'{by} is not a summary column')
+        sectors = self.get_sectors()
+        tickers = sectors.index[sectors == sector.upper()]
+        if not len(tickers):
+            raise NotFound(f'no sector {sector}')
+        ranked = summaries[by].reindex(tickers).dropna().sort_values(
+            ascending=False, kind='stable'
+        )
+        return ranked if top is None else ranked.head(top)
+
+    def rank(self, ticker, by='AVERAGE_GROWTH'):
+        """return the sector of ticker and its place in the sector ranking"""
+        ticker = ticker.upper()
+        sectors = self.get_sectors()
+        if ticker not in sectors.index:
+            raise NotFound(f'{ticker} is in no sector')
+        ranked = self.rank_sector(sectors[ticker], by=by)
+        if ticker not in ranked.index:
+            raise NotFound(f'{ticker} has no {by}')
+        return {
+            'sector': sectors[ticker],
+            'rank': ranked.index.get_loc(ticker) + 1,
+            'of': len(ranked),
+            by: ranked[ticker],
+        }
+
+    def warm(self):
+        """load the stores, summaries and sectors before the first query"""
+        for _, source in self.sources:
+            self.get_store(source)
+        self.get_summaries()
+        self.get_sectors()
+
+    def get_status(self):
+        return {
+            'memory': get_memory_use(),
+            'caches': {
+                name: cache.get_status() for name, cache in (
+                    ('stores', self.stores), ('stocks', self.stocks),
+                    ('summaries', self.summaries), ('sectors', self.sectors),
+                )
+            },
+        }
+
+
+class Handler(BaseHTTPRequestHandler):
+    """answers GET /summary/<ticker>, /ratios/<ticker>, /rank/<ticker>,
+       /sectors/<sector> and /admin/status with json, unknown names are
+       404, bad by or top 400 and any other failure 500 with the error
+    """
+
+    def do_GET(self):
+        start_time = time.time()
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if not self.server.slots.acquire(timeout=self.server.wait):
+            return self.respond(503, {'error': 'too many requests'})
+        try:
+            status, body = 200, self.answer(parts, query)
+        except NotFound as error:
+            status, body = 404, {'error': str(error.args[0])}
+        except BadRequest as error:
+            status, body = 400, {'error': str(error)}
+        except Exception as error:
+            # a file that can not be analyzed is a failure of the server,
+            # not of the request
+            status, body = 500, {'error': repr(error)}
+        finally:
+            self.server.slots.release()
+        body['seconds'] = time.time() - start_time
+        self.respond(status, body)
+
+    def answer(self, parts, query):
+        analysis = self.server.analysis
+        by = query.get('by', 'AVERAGE_GROWTH')
+        try:
+            top = int(query['top']) if 'top' in query else None
+        except ValueError:
+            raise BadRequest(f'top must be a whole number, not {query["top"]}')
+        routes = {
+            'summary': lambda name: analysis.get_summary(name),
+            'ratios': lambda name: analysis.get_ratios(name),
+            'rank': lambda name: analysis.rank(name, by=by),
+            'sectors': lambda name: analysis.rank_sector(name, by=by, top=top),
+        }
+        if parts == ['admin', 'status']:
+            return analysis.get_status()
+        if len(parts) != 2 or parts[0] not in routes:
+            raise NotFound(f'no route {"/".join(parts)}')
+        return {parts[0]: to_json(routes[parts[0]](parts[1]))}
+
+    def respond(self, status, body):
+        content = json.dumps(to_json(body)).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    """an http server over one Analysis answering at most concurrency
+       requests at a time, others wait up to wait seconds for a slot
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, address=('127.0.0.1', 8765), analysis=None, concurrency=4,
+        wait=1.0,
+    ):
+        super().__init__(address, Handler)
+        self.analysis = Analysis() if analysis is None else analysis
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.wait = wait
+
+
+def serve(host='127.0.0.1', port=8765, concurrency=4):
+    server = Server((host, port), concurrency=concurrency)
+    server.analysis.warm()
+    print(f'::serving haystack on http://{host}:{port}::')
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,85 @@
+from multiprocessing.shared_memory import SharedMemory
+
+from numpy import nan, ndarray
+from pandas import DataFrame, Series
+from src.summaries import INDEX
+
+
+class SharedSummaries:
+    """a (slots, columns) float64 array of summaries in shared memory
+
+       the parent creates it with the column layout fixed up front and hands
+       get_layout() to workers, every worker attaches by name and writes the
+       summary of its slot in place so no Series is pickled back to the
+       parent. slots never written stay nan and are left out when reading,
+       a summary whose metrics are not the columns is not written so the
+       caller can send it another way
+    """
+
+    def __init__(self, columns, slots, name=None):
+        self.columns = list(columns)
+        self.column_set = set(self.columns)
+        self.slots = slots
+        size = slots * len(self.columns) * 8
+        self.memory = SharedMemory(
+            name=name, create=name is None, size=max(1, size + slots)
+        )
+        self.values = ndarray(
+            (slots, len(self.columns)), dtype='float64', buffer=self.memory.buf
+        )
+        self.written = ndarray(
+            (slots,), dtype='bool', buffer=self.memory.buf, offset=size
+        )
+        if name is None:
+            self.values[:] = nan
+            self.written[:] = False
+
+    def get_layout(self):
+        """return what a worker needs to attach to this array"""
+        return self.columns, self.slots, self.memory.name
+
+    @classmethod
+    def attach(cls, layout):
+        columns, slots, name = layout
+        return cls(columns, slots, name=name)
+
+    def write(self, slot, summary):
+        """write summary to slot and return whether it fit the layout,
+           summaries with values that are not numbers do not fit
+        """
+        if (
+            not isinstance(summary, Series)
+            or not summary.index.is_unique
+            or len(summary) != len(self.columns)
+            or set(summary.index) != self.column_set
+        ):
+            return False
+        try:
+            values = summary.reindex(self.columns).to_numpy(dtype='float64')
+        except (TypeError, ValueError):
+            return False
+        self.values[slot] = values
+        self.written[slot] = True
+        return True
+
+    def read(self, slots, tickers):
+        """return a DataFrame with one row per ticker from the written slots"""
+        pairs = [
+            (slot, ticker) for slot, ticker in zip(slots, tickers)
+            if self.written[slot]
+        ]
+        rows = DataFrame(
+            self.values[[slot for slot, _ in pairs]],
+            index=[ticker for _, ticker in pairs],
+            columns=self.columns,
+        ).rename_axis(INDEX)
+        return rows[~rows.index.duplicated(keep='last')]
+
+    def close(self):
+        del self.values, self.written
+        self.memory.close()
+
+    def unlink(self):
+        """release the array, called once by the process that created it"""
+        self.close()
+        self.memory.unlink()
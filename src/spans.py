@@ -0,0 +1,191 @@
+import datetime
+import functools
+import math
+import os
+import threading
+
+from collections import Counter
+from contextlib import contextmanager
+from pandas import DataFrame, Index, MultiIndex
+from time import perf_counter
+
+ENABLED = os.environ.get('HAYSTACK_SPANS', '1') != '0'
+MINIMUM = 1e-7
+GROWTH = 2 ** (1 / 8)
+PERCENTILES = (50, 95, 99)
+COLUMNS = ['COUNT', 'TOTAL', 'MEAN', 'P50', 'P95', 'P99', 'MAX']
+COLLECTED = None
+
+
+def get_bucket(seconds):
+    """return the bucket of seconds, buckets grow by GROWTH from MINIMUM"""
+    if seconds <= MINIMUM:
+        return 0
+    return int(math.log(seconds / MINIMUM, GROWTH)) + 1
+
+def get_middle(bucket):
+    return MINIMUM * GROWTH ** (bucket - 0.5) if bucket else MINIMUM
+
+
+class Histogram:
+    """counts of durations by bucket, percentiles are the middle of their
+       bucket so they are within 5% of the exact duration whatever the
+       count, the smallest and largest durations are kept as they are
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[get_bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def get_percentile(self, percentile):
+        if not self.count:
+            return math.nan
+        rank = math.ceil(percentile / 100 * self.count)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(max(get_middle(bucket), self.min), self.max)
+        return self.max
+
+    def get_row(self):
+        return [
+            self.count, self.total, self.total / self.count if self.count else math.nan,
+            *(self.get_percentile(percentile) for percentile in PERCENTILES),
+            self.max,
+        ]
+
+
+class Spans:
+    """a Histogram of span durations for every stage and worker"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage, seconds, worker=None):
+        worker = os.getpid() if worker is None else worker
+        with self.lock:
+            histogram = self.histograms.get((stage, worker))
+            if histogram is None:
+                histogram = self.histograms[stage, worker] = Histogram()
+            histogram.add(seconds)
+
+    def add_all(self, spans, worker=None):
+        """add (stage, seconds) pairs collected in worker"""
+        for stage, seconds in spans:
+            self.add(stage, seconds, worker=worker)
+
+    def clear(self):
+        with self.lock:
+            self.histograms = {}
+
+    def get_histograms(self, by_worker=False):
+        """return the histograms by (stage, worker), or by stage with the
+           histograms of every worker merged
+        """
+        with self.lock:
+            histograms = dict(self.histograms)
+        if by_worker:
+            return histograms
+        stages = {}
+        for (stage, _), histogram in histograms.items():
+            stages.setdefault(stage, Histogram()).merge(histogram)
+        return stages
+
+    def get_table(self, by_worker=False):
+        """return count, total, mean, percentiles and max seconds of every
+           stage, or of every stage and worker
+        """
+        histograms = self.get_histograms(by_worker=by_worker)
+        keys = sorted(histograms, key=str)
+        if by_worker:
+            index = MultiIndex.from_tuples(keys, names=['STAGE', 'WORKER'])
+        else:
+            index = Index(keys, name='STAGE')
+        return DataFrame(
+            [histograms[key].get_row() for key in keys],
+            index=index, columns=COLUMNS,
+        )
+
+
+SPANS = Spans()
+
+
+def record(stage, seconds):
+    if COLLECTED is not None:
+        COLLECTED.append((stage, seconds))
+    else:
+        SPANS.add(stage, seconds)
+
+@contextmanager
+def collect():
+    """yield the (stage, seconds) of spans ending within the context instead
+       of adding them to SPANS, so a worker can send them with its result
+    """
+    global COLLECTED
+    previous, COLLECTED = COLLECTED, []
+    try:
+        yield COLLECTED
+    finally:
+        COLLECTED = previous
+
+@contextmanager
+def span(stage):
+    """time the context as a span of stage"""
+    start_time = perf_counter()
+    try:
+        yield
+    finally:
+        if ENABLED:
+            record(stage, perf_counter() - start_time)
+
+def timed(stage):
+    """time every call of the decorated function as a span of stage, with
+       HAYSTACK_SPANS=0 the function is left as it is
+    """
+    def decorator(function):
+        if not ENABLED:
+            return function
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start_time = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(stage, perf_counter() - start_time)
+        return wrapper
+    return decorator
+
+def write_spans(spans=SPANS, folder='benchmarks/', report='SPANS'):
+    """print the spans of every stage and append the spans of every stage
+       and worker to the benchmark of report
+    """
+    print(spans.get_table().to_string(float_format=lambda seconds: f'{seconds:.6f}'))
+    run = datetime.datetime.now()
+    lines = [
+        f'RUN:{run},STAGE:{stage},WORKER:{worker},'
+        + ','.join(f'{column}:{value}' for column, value in zip(COLUMNS, row))
+        for (stage, worker), row in spans.get_table(by_worker=True).iterrows()
+    ]
+    os.makedirs(folder, exist_ok=True)
+    with open(f'{folder}{report}_benchmark.txt', 'a') as out_file:
+        out_file.write(''.join(f'{line}\n' for line in lines))
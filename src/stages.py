@@ -0,0 +1,194 @@
+import datetime
+import hashlib
+import json
+import os
+import time
+
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from src.executor import get_workers
+from src.utilities import makedir
+
+Stage = namedtuple(
+    'Stage', ['name', 'function', 'inputs', 'outputs', 'after'],
+    defaults=[(), (), ()],
+)
+Timing = namedtuple('Timing', ['name', 'status', 'seconds'])
+
+
+def get_status(path):
+    """return the name, size and modification time of path or of the files
+       directly inside it when it is a folder, None when it does not exist
+    """
+    if os.path.isdir(path):
+        return sorted(
+            (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in os.scandir(path) if entry.is_file()
+        )
+    if os.path.exists(path):
+        status = os.stat(path)
+        return [('', status.st_size, status.st_mtime_ns)]
+
+def get_fingerprint(paths):
+    """return a digest of the status of every path, subfolders are left out
+       so stages writing below their inputs do not change them
+    """
+    digest = hashlib.sha1()
+    for path in sorted(os.path.normpath(path) for path in paths):
+        digest.update(repr((path, get_status(path))).encode())
+    return digest.hexdigest()
+
+def is_under(path, folder):
+    path, folder = os.path.normpath(path), os.path.normpath(folder)
+    return path == folder or path.startswith(f'{folder}{os.sep}')
+
+
+class Graph:
+    """stages linked by the paths they read and write
+
+       a stage depends on every other stage writing one of its inputs or a
+       folder its input is in, and on the stages named in its after
+    """
+
+    def __init__(self, stages):
+        self.stages = {stage.name: stage for stage in stages}
+        self.dependencies = {
+            name: self.get_dependencies(stage)
+            for name, stage in self.stages.items()
+        }
+        self.get_order()
+
+    def get_dependencies(self, stage):
+        dependencies = set(stage.after)
+        for name, other in self.stages.items():
+            if name != stage.name and any(
+                is_under(path, output)
+                for path in stage.inputs for output in other.outputs
+            ):
+                dependencies.add(name)
+        unknown = dependencies - set(self.stages)
+        if unknown:
+            raise KeyError(f'{stage.name} runs after unknown stages {sorted(unknown)}')
+        return dependencies
+
+    def get_order(self, names=None):
+        """return names and their dependencies with every stage after the
+           stages it depends on
+        """
+        order, visiting = [], set()
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f'stages depend on each other through {name}')
+            visiting.add(name)
+            for dependency in sorted(self.dependencies[name]):
+                visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+        for name in self.stages if names is None else names:
+            if name not in self.stages:
+                raise KeyError(f'unknown stage {name}')
+            visit(name)
+        return order
+
+
+class Scheduler:
+    """runs the stages of a graph, independent stages at the same time
+
+       a stage is skipped when its inputs and the code version are the same
+       as when it last ran and its outputs exist, the state is kept in
+       state_file so the check holds across runs
+    """
+
+    def __init__(self, graph, state_file=None, version='', workers=None):
+        self.graph = graph
+        self.state_file = state_file
+        self.version = version
+        self.workers = workers
+        try:
+            with open(state_file) as in_file:
+                self.state = json.load(in_file)
+        except (FileNotFoundError, TypeError, ValueError):
+            self.state = {}
+
+    def save(self):
+        if self.state_file is None:
+            return
+        makedir(os.path.dirname(self.state_file) or '.')
+        temporary = f'{self.state_file}.tmp'
+        with open(temporary, 'w') as out_file:
+            json.dump(self.state, out_file, indent=1, sort_keys=True)
+        os.replace(temporary, self.state_file)
+
+    def get_entry(self, stage):
+        return {'inputs': get_fingerprint(stage.inputs), 'version': self.version}
+
+    def is_current(self, stage, entry):
+        return (
+            bool(stage.inputs)
+            and self.state.get(stage.name) == entry
+            and all(os.path.exists(output) for output in stage.outputs)
+        )
+
+    def run_stage(self, stage):
+        start_time = time.time()
+        stage.function()
+        return time.time() - start_time
+
+    def run(self, targets=None, force=False):
+        """return a Timing for targets and the stages they depend on,
+           every stage runs once all of its dependencies ran or were skipped
+        """
+        order = self.graph.get_order(targets)
+        waiting = {
+            name: set(self.graph.dependencies[name]) for name in order
+        }
+        timings, entries, running = {}, {}, {}
+        workers = get_workers(self.workers, tasks=len(order))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while waiting or running:
+                for name in [name for name in order if name in waiting]:
+                    dependencies = waiting[name]
+                    if any(timings[dependency].status in ('failed', 'blocked')
+                           for dependency in dependencies if dependency in timings):
+                        del waiting[name]
+                        timings[name] = Timing(name, 'blocked', 0.0)
+                    elif all(dependency in timings for dependency in dependencies):
+                        del waiting[name]
+                        stage = self.graph.stages[name]
+                        entries[name] = self.get_entry(stage)
+                        if not force and self.is_current(stage, entries[name]):
+                            timings[name] = Timing(name, 'skipped', 0.0)
+                        else:
+                            print(f'::running stage {name}::')
+                            running[executor.submit(self.run_stage, stage)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        timings[name] = Timing(name, 'ran', future.result())
+                    except Exception as error:
+                        print(f'[ERROR]::stage {name} failed::', repr(error))
+                        timings[name] = Timing(name, 'failed', 0.0)
+                        continue
+                    self.state[name] = entries[name]
+                    self.save()
+        return [timings[name] for name in order]
+
+
+def write_timings(timings, folder='benchmarks/', report='STAGES'):
+    """print a line per stage and append them to the benchmark of report"""
+    run = datetime.datetime.now()
+    lines = [
+        f'RUN:{run},STAGE:{timing.name},STATUS:{timing.status},'
+        f'DURATION: {timing.seconds}'
+        for timing in timings
+    ]
+    for timing in timings:
+        print(f'{timing.name:<40}{timing.status:<10}{timing.seconds:10.2f}s')
+    makedir(folder)
+    with open(f'{folder}{report}_benchmark.txt', 'a') as out_file:
+        out_file.write(''.join(f'{line}\n' for line in lines))
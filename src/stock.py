@@ -1,20 +1,30 @@
 import datetime
+import hashlib
 import json
 import yfinance as yahoo_finance
 
 from datetime import datetime
 from itertools import product
 from re import search
+from src.columnar import cached_read, read_header, read_raw_csv
 from src.logger import Logger
+from src.memoize import Memoized, node
 from src.munger import Munger
+from src.metrics import get_registry, ratio
 from src.ratios import get_ratio
+from src.rolling import rolling_median, rolling_medians
+from src.spans import timed
+from src.summaries import SummaryTable
 from pandas.errors import EmptyDataError
 from pandas.api.types import is_object_dtype
-from numpy import inf, nan, median
+from numpy import (
+    arange, argsort, asarray, cumsum, errstate, exp, inf, isnan, nan, median,
+    repeat, tile, unique, where, zeros,
+)
 from scipy.stats import hmean
 from pandas import (
-    DataFrame, Series, MultiIndex, Index, read_csv, to_numeric,
-    concat
+    DataFrame, DatetimeIndex, Series, MultiIndex, Index, read_csv,
+    to_numeric, concat
 )
 from src.utilities import (
     analysis_folder, industry_folder, processed_folder,
@@ -30,18 +40,59 @@ def get_discount_cash_flow_value(values, discount_rate=0.0316):
         ]
     )
 
-class Stock:
+RAW_DATA_INPUTS = ('cache', 'filename', 'raw_data', 'store', 'ticker')
+
+def get_discount_factors(periods, discount_rate=0.0316, compounding='annual'):
+    """return what the cash flow of each period is divided by
+       compounding is 'annual', 'continuous' or the number of
+       compounding periods per period
+    """
+    if compounding == 'continuous':
+        return exp(discount_rate * arange(periods))
+    if compounding == 'annual':
+        compounding = 1
+    return (1 + discount_rate / compounding) ** (compounding * arange(periods))
+
+def get_discount_cash_flow_values(
+    values, discount_rate=0.0316, compounding='annual', axis=0
+):
+    """return get_discount_cash_flow_value of every prefix of values along
+       axis as one cumulative sum, prefixes that contain nan are nan
+    """
+    values = asarray(values, dtype='float64')
+    shape = [1] * values.ndim
+    shape[axis] = values.shape[axis]
+    return cumsum(
+        values / get_discount_factors(
+            values.shape[axis], discount_rate=discount_rate,
+            compounding=compounding,
+        ).reshape(shape),
+        axis=axis,
+    )
+
+class Stock(Memoized):
+
+    inputs = (
+        'cache', 'discount_rate', 'filename', 'moving_averages',
+        'raw_data', 'store', 'ticker',
+    )
 
     def __init__(self,
         ticker=None,
         filename=None,
         discount_rate=0.0316,
-        source="STOCKPUP"
+        source="STOCKPUP",
+        cache=True,
+        store=None,
+        raw_data=None,
     ):
         self.discount_rate = discount_rate
         self.source = source.upper()
         self.ticker = ticker
         self.filename = filename
+        self.cache = cache
+        self.store = store
+        self.raw_data = raw_data
         self.logger = Logger(ticker)
 
     def stock_sources(self):
@@ -52,7 +103,8 @@ class Stock:
 
     def get_stock(self):
         return self.stock_sources().get(self.source)(
-            ticker=self.ticker, filename=self.filename
+            ticker=self.ticker, filename=self.filename,
+            cache=self.cache, store=self.store, raw_data=self.raw_data,
         )
 
     def get_net_equity(self, dataframe):
@@ -74,66 +126,210 @@ class Stock:
           + dataframe['NET_GOODWILL']
         )
 
+    @node(*RAW_DATA_INPUTS)
     def get_munged_data(self):
         return self.set_numeric_datatypes(
             Munger(
                 ticker=self.ticker,
-                raw_data=self.get_raw_data(),
+                raw_data=self.get_raw_data(used_columns_only=True),
                 mappings=self.columns_mapping(),
                 filename=self.filename,
+                copy=False,
+                date_index=self.has_date_index(),
             ).munged_data
         )
 
+    def has_date_index(self):
+        return True
+
+    def net_value_metrics(self, data):
+        return {
+            "CURRENT_ASSETS": data["CURRENT_ASSETS"],
+            "CURRENT_LIABILITIES": data["CURRENT_LIABILITIES"],
+            "NET_ASSETS": data["NET_ASSETS"],
+            "NET_CASH": data["NET_CASH"],
+            "NET_CASH_FIN": -data["NET_CASH_FIN"],
+            "NET_CASH_INVESTED": -data["NET_CASH_INVESTED"],
+            "NET_CASH_OP": data["NET_CASH_OP"],
+            "NET_DEBT": data["NET_DEBT"],
+            "NET_DIVIDENDS": self.get_net_dividends(data),
+            "NET_EQUITY": data["NET_EQUITY"],
+            "NET_EXPENSES": data["NET_REVENUE"] - data["NET_INCOME"],
+            "NET_FCF": self.get_net_fcf(data),
+            "NET_FCF_SHY": data["NET_CASH_OP"] + data["NET_CASH_INVESTED"],
+            "NET_GOODWILL": data["NET_GOODWILL"],
+            "NET_INCOME": data["NET_INCOME"],
+            "NET_INVESTED_CAPITAL": self.get_net_invested_capital(data),
+            "NET_LIABILITIES": self.get_net_liabilities(data),
+            "NET_NONCONTROLLING": self.get_net_noncontrolling(data),
+            "NET_RETAINED": self.get_net_retained(data),
+            "NET_REVENUE": data["NET_REVENUE"],
+            "NET_SHARES": self.get_net_shares(data),
+            "NET_TANGIBLE": self.get_net_tangible(data),
+            "NET_WORKING_CAPITAL": data["CURRENT_ASSETS"] - data["CURRENT_LIABILITIES"],
+        }
+
+    @node(*RAW_DATA_INPUTS)
+    @timed('get_net_values')
     def get_net_values(self):
-        self.logger.log('Calculating Net Values')
-        munged_data = self.get_munged_data()
-        return DataFrame({
-            "CURRENT_ASSETS": munged_data["CURRENT_ASSETS"],
-            "CURRENT_LIABILITIES": munged_data["CURRENT_LIABILITIES"],
-            "NET_ASSETS": munged_data["NET_ASSETS"],
-            "NET_CASH": munged_data["NET_CASH"],
-            "NET_CASH_FIN": -munged_data["NET_CASH_FIN"],
-            "NET_CASH_INVESTED": -munged_data["NET_CASH_INVESTED"],
-            "NET_CASH_OP": munged_data["NET_CASH_OP"],
-            "NET_DEBT": munged_data["NET_DEBT"],
-            "NET_DIVIDENDS": self.get_net_dividends(munged_data),
-            "NET_EQUITY": munged_data["NET_EQUITY"],
-            "NET_EXPENSES": munged_data["NET_REVENUE"] - munged_data["NET_INCOME"],
-            "NET_FCF": self.get_net_fcf(munged_data),
-            "NET_FCF_SHY": munged_data["NET_CASH_OP"] + munged_data["NET_CASH_INVESTED"],
-            "NET_GOODWILL": munged_data["NET_GOODWILL"],
-            "NET_INCOME": munged_data["NET_INCOME"],
-            "NET_INVESTED_CAPITAL": self.get_net_invested_capital(munged_data),
-            "NET_LIABILITIES": self.get_net_liabilities(munged_data),
-            "NET_NONCONTROLLING": self.get_net_noncontrolling(munged_data),
-            "NET_RETAINED": self.get_net_retained(munged_data),
-            "NET_REVENUE": munged_data["NET_REVENUE"],
-            "NET_SHARES": self.get_net_shares(munged_data),
-            "NET_TANGIBLE": self.get_net_tangible(munged_data),
-            "NET_WORKING_CAPITAL": munged_data["CURRENT_ASSETS"] - munged_data["CURRENT_LIABILITIES"],
-        })
+        self.logger.debug('Calculating Net Values')
+        return DataFrame(
+            get_registry(self, 'net_value_metrics').evaluate(
+                self.get_munged_data()
+            )
+        )
+
+    @node(*RAW_DATA_INPUTS)
+    def get_annual_net_values(self):
+        """return net values with one row per year"""
+        net_values = self.get_net_values()
+        return net_values[~net_values.index.duplicated(keep='last')]
+
+    def get_moving_average_data(self):
+        """return the net values the moving averages are taken over"""
+        return self.get_net_values()
+
+    @timed('get_moving_averages')
+    def get_moving_averages(self, window=5):
+        self.logger.debug('Calculating %s year moving averages for Net Values', window)
+        data = self.get_moving_average_data()
+        self.moving_averages = DataFrame(
+            rolling_median(data.to_numpy(dtype='float64'), window),
+            index=data.index,
+            columns=data.columns,
+        )
+
+    def get_window_moving_averages(self, windows=(3, 5, 10)):
+        """return the moving averages of every window indexed by
+           (WINDOW, YEAR), the rolling medians are taken in one pass
+        """
+        data = self.get_moving_average_data()
+        windows = list(windows)
+        return DataFrame(
+            rolling_medians(data.to_numpy(dtype='float64'), windows).reshape(
+                -1, data.shape[1]
+            ),
+            index=MultiIndex.from_arrays(
+                [
+                    repeat(windows, len(data)),
+                    tile(data.index.to_numpy(), len(windows)),
+                ],
+                names=['WINDOW', data.index.name],
+            ),
+            columns=data.columns,
+        )
+
+    def get_window_summaries(self, windows=(3, 5, 10)):
+        """return get_summary for the moving averages of every window
+           as one row per window
+        """
+        moving_averages = self.__dict__.get('moving_averages')
+        window_moving_averages = self.get_window_moving_averages(windows)
+        summaries = {}
+        try:
+            for window in windows:
+                self.moving_averages = window_moving_averages.loc[window]
+                summaries[window] = self.get_summary()
+        finally:
+            if moving_averages is None:
+                del self.__dict__['moving_averages']
+                self.get_graph().invalidate('moving_averages')
+            else:
+                self.moving_averages = moving_averages
+        return DataFrame(summaries).T.rename_axis('WINDOW')
 
     def raw_data_status(self):
         return f"Getting RAW data from {self.filename}::"
 
-    def get_raw_data(self):
+    def raw_data_filename(self):
+        return f'{self.source_folder()}/{self.filename}'
+
+    def read_raw_data(self):
+        return read_raw_csv(
+            self.raw_data_filename(), index_col=self.get_index_column()
+        )
+
+    def used_columns(self):
+        """upper case names of the raw columns the analysis reads"""
+        return set(self.columns_mapping())
+
+    def is_used_column(self, name):
+        return name.upper() in self.used_columns()
+
+    def get_column_dtype(self, name):
+        return 'float64'
+
+    def used_columns_variant(self):
+        return 'used-' + hashlib.sha1(
+            repr(sorted(self.used_columns())).encode()
+        ).hexdigest()[:8]
+
+    def read_used_columns(self):
+        """parse only the used columns with pinned dtypes and ISO dates,
+           falling back to read_raw_data for files that do not fit
+        """
+        filename = self.raw_data_filename()
+        index_column = self.get_index_column()
+        columns = [
+            name for name in read_header(filename)
+            if self.is_used_column(name)
+        ]
         try:
-            self.logger.log(self.raw_data_status())
-            return read_csv(
-                f'{self.source_folder()}/{self.filename}',
+            dataframe = read_csv(
+                filename,
                 header=0,
-                index_col=self.get_index_column(),
-                parse_dates=True,
-                infer_datetime_format=True,
+                usecols=[index_column, *columns],
+                index_col=index_column,
+                dtype={
+                    index_column: str,
+                    **{name: self.get_column_dtype(name) for name in columns}
+                },
+                na_values=['None'],
                 engine="c",
             )
+            # dates are ISO 8601 so numpy parses them without inference
+            dataframe.index = DatetimeIndex(
+                dataframe.index.to_numpy().astype('datetime64[ns]'),
+                name=index_column,
+            )
+        except (ValueError, TypeError):
+            return self.read_raw_data()
+        return dataframe
+
+    def load_raw_data(self, used_columns_only=False):
+        if self.raw_data is not None:
+            return self.raw_data
+        if self.store is not None:
+            stored = self.store.get(
+                self.filename,
+                columns=self.is_used_column if used_columns_only else None,
+            )
+            if stored is not None:
+                return stored
+        if used_columns_only:
+            reader = self.read_used_columns
+            variant = self.used_columns_variant()
+        else:
+            reader = self.read_raw_data
+            variant = None
+        if self.cache:
+            return cached_read(
+                self.raw_data_filename(), reader, variant=variant
+            )
+        return reader()
+
+    @timed('get_raw_data')
+    def get_raw_data(self, used_columns_only=False):
+        try:
+            self.logger.log(self.raw_data_status())
+            return self.load_raw_data(used_columns_only=used_columns_only)
         except (ValueError, EmptyDataError):
             self.logger.error(self.raw_data_status())
 
     def fourth_quarter(self):
         return lambda x: x[0]
 
-    def get_differences(self, data):
+    def difference_metrics(self, data):
         return {
             "DIFF_ASSETS_DEBT": data['NET_ASSETS'] - data['NET_DEBT'],
             "DIFF_ASSETS_LIABILITIES": data['NET_ASSETS'] - data['NET_LIABILITIES'],
@@ -155,11 +351,18 @@ class Stock:
             "DIFF_TANGIBLE_LIABILITIES": data['NET_TANGIBLE']  - data['NET_LIABILITIES'],
         }
 
+    def get_differences(self, data):
+        return self.get_metrics(
+            get_registry(self, 'difference_metrics').names(), data=data
+        )
+
+    @node()
     def get_moving_average_differences(self):
         return DataFrame(
             self.get_differences(self.moving_averages)
         )
 
+    @node()
     def get_average_moving_average_differences(self):
         return Series(
             self.get_differences(
@@ -167,6 +370,7 @@ class Stock:
             )
         )
 
+    @node()
     def get_average_moving_average_ratios(self):
         return Series(
             self.get_ratios(
@@ -177,8 +381,9 @@ class Stock:
     def get_average_net_shares(self, dataframe):
         return self.get_average_moving_averages()['NET_SHARES']
 
+    @node()
     def get_average_per_share_differences(self):
-        self.logger.log('Calculating Average Differences Per Share')
+        self.logger.debug('Calculating Average Differences Per Share')
         return self.add_prefix(
             self.get_average_moving_average_differences()
                 .div(
@@ -188,8 +393,9 @@ class Stock:
                 )
         )
 
+    @node()
     def get_average_per_share_averages(self):
-        self.logger.log('Calculating Moving Averages Per Share')
+        self.logger.debug('Calculating Moving Averages Per Share')
         return self.get_moving_averages_per_share().iloc[-1]
 
     def financial_ratios(self):
@@ -198,41 +404,46 @@ class Stock:
             'INVESTED_CAPITAL', 'REVENUE', 'TANGIBLE'
         )
 
+    @node()
     def get_median_growth_rate(self):
-        self.logger.log('Calculating Median Growth Rates')
+        self.logger.debug('Calculating Median Growth Rates')
         return median([
             self.get_moving_average_growth_rates()[f'GROWTH_NET_{value}']
             for value in self.financial_ratios()
         ])
 
+    def return_ratios(self):
+        return (
+            'INCOME_ASSETS',
+            'INCOME_CASH',
+            'INCOME_CASH_INVESTED',
+            'INCOME_EQUITY',
+            'INCOME_EXPENSES',
+            'INCOME_INVESTED_CAPITAL',
+            'INCOME_TANGIBLE',
+            'FCF_ASSETS',
+            'FCF_CASH',
+            'FCF_CASH_INVESTED',
+            'FCF_EQUITY',
+            'FCF_EXPENSES',
+            'FCF_INVESTED_CAPITAL',
+            'FCF_TANGIBLE',
+            'FCF_SHY_ASSETS',
+            'FCF_SHY_CASH',
+            'FCF_SHY_CASH_INVESTED',
+            'FCF_SHY_EQUITY',
+            'FCF_SHY_EXPENSES',
+            'FCF_SHY_INVESTED_CAPITAL',
+            'FCF_SHY_TANGIBLE',
+        )
+
+    @node()
     def get_median_returns(self):
-        self.logger.log('Calculating Median Returns')
+        self.logger.debug('Calculating Median Returns')
         moving_average_ratios = self.get_moving_average_ratios()
         return median([
             moving_average_ratios[f'RATIO_{value}']
-            for value in (
-                'INCOME_ASSETS',
-                'INCOME_CASH',
-                'INCOME_CASH_INVESTED',
-                'INCOME_EQUITY',
-                'INCOME_EXPENSES',
-                'INCOME_INVESTED_CAPITAL',
-                'INCOME_TANGIBLE',
-                'FCF_ASSETS',
-                'FCF_CASH',
-                'FCF_CASH_INVESTED',
-                'FCF_EQUITY',
-                'FCF_EXPENSES',
-                'FCF_INVESTED_CAPITAL',
-                'FCF_TANGIBLE',
-                'FCF_SHY_ASSETS',
-                'FCF_SHY_CASH',
-                'FCF_SHY_CASH_INVESTED',
-                'FCF_SHY_EQUITY',
-                'FCF_SHY_EXPENSES',
-                'FCF_SHY_INVESTED_CAPITAL',
-                'FCF_SHY_TANGIBLE'
-            )
+            for value in self.return_ratios()
         ])
 
     def obligations(self):
@@ -258,8 +469,9 @@ class Stock:
             )
         )
 
+    @node()
     def get_median_safety(self):
-        self.logger.log('Calculating Median Safety')
+        self.logger.debug('Calculating Median Safety')
         safety = self.get_average_moving_average_differences()
         return median([
             *(safety[f'DIFF_{value}'] for value in self.safety_pairs()),
@@ -278,8 +490,9 @@ class Stock:
         except IndexError:
             return 0
 
+    @node()
     def get_averages(self):
-        self.logger.log('Calculating Average Scores')
+        self.logger.debug('Calculating Average Scores')
         return Series({
             'AVERAGE_GROWTH': self.get_median_growth_rate(),
             'AVERAGE_RETURNS': self.get_median_returns(),
@@ -307,9 +520,10 @@ class Stock:
             return self.get_simple_growth_rate(dataframe)
 
     def get_simple_growth_rate(self, dataframe):
-        self.logger.log('Calculating Compound Growth Rates FAILED::Using Simple Growth Rate Instead')
+        self.logger.warning('Calculating Compound Growth Rates FAILED::Using Simple Growth Rate Instead')
         return dataframe.pct_change(axis=0)
 
+    @node()
     def get_moving_average_growth_rates(self):
         return self.add_prefix(
             self.replace_null_values_with_zero(
@@ -320,93 +534,155 @@ class Stock:
             prefix='GROWTH_',
         )
 
-    def get_dcf_valuation(self, dataframe=None, key=None):
-        return (
-            dataframe[key]
-            .expanding(min_periods=1)
-            .apply(get_discount_cash_flow_value, raw=True)
+    def get_dcf_valuation(self, dataframe=None, key=None, compounding='annual'):
+        cash_flows = dataframe[key]
+        values = get_discount_cash_flow_values(
+            cash_flows.to_numpy(dtype='float64'),
+            discount_rate=self.discount_rate,
+            compounding=compounding,
         )
+        if isinstance(cash_flows, DataFrame):
+            return DataFrame(
+                values, index=cash_flows.index, columns=cash_flows.columns
+            )
+        return Series(values, index=cash_flows.index, name=cash_flows.name)
 
     def add_prefix(self, dataframe, prefix='PER_SHARE_'):
         return dataframe.add_prefix(prefix)
 
+    @node()
     def get_moving_averages_per_share(self):
         result = self.add_prefix(
             self.moving_averages.div(
                 self.moving_averages['NET_SHARES'], axis=0
             )
         )
-        result['PER_SHARE_DCF_HISTORIC'] = self.get_dcf_valuation(
-            dataframe=result,
-            key='PER_SHARE_NET_FCF'
-        )
-        result['PER_SHARE_DCF_SHY_HISTORIC'] = self.get_dcf_valuation(
+        historic = self.get_dcf_valuation(
             dataframe=result,
-            key='PER_SHARE_NET_FCF_SHY'
+            key=['PER_SHARE_NET_FCF', 'PER_SHARE_NET_FCF_SHY']
         )
+        result['PER_SHARE_DCF_HISTORIC'] = historic['PER_SHARE_NET_FCF']
+        result['PER_SHARE_DCF_SHY_HISTORIC'] = historic['PER_SHARE_NET_FCF_SHY']
         return result
 
+    def ratio_pairs(self):
+        return {
+            "RATIO_CASH_ASSETS": ("NET_CASH", "NET_ASSETS"),
+            "RATIO_CASH_DEBT": ("NET_CASH", "NET_DEBT"),
+            "RATIO_CASH_LIABILITIES": ("NET_CASH", "NET_LIABILITIES"),
+            "RATIO_CASH_TANGIBLE": ("NET_CASH", "NET_TANGIBLE"),
+            "RATIO_CURRENT": ("CURRENT_ASSETS", "CURRENT_LIABILITIES"),
+            "RATIO_CURRENT_ASSETS_LIABILITIES": ("CURRENT_ASSETS", "NET_LIABILITIES"),
+            "RATIO_CURRENT_DEBT": ("CURRENT_ASSETS", "NET_DEBT"),
+            "RATIO_EQUITY_ASSETS": ("NET_EQUITY", "NET_ASSETS"),
+            "RATIO_EQUITY_DEBT": ("NET_EQUITY", "NET_DEBT"),
+            "RATIO_EQUITY_LIABILITIES": ("NET_EQUITY", "NET_LIABILITIES"),
+            "RATIO_EQUITY_TANGIBLE": ("NET_EQUITY", "NET_TANGIBLE"),
+            "RATIO_EXPENSES_REVENUE": ("NET_EXPENSES", "NET_REVENUE"),
+            "RATIO_FCF_ASSETS": ("NET_FCF", "NET_ASSETS"),
+            "RATIO_FCF_CASH": ("NET_FCF", "NET_CASH"),
+            "RATIO_FCF_CASH_INVESTED": ("NET_FCF", "NET_CASH_INVESTED"),
+            "RATIO_FCF_DEBT": ("NET_FCF", "NET_DEBT"),
+            "RATIO_FCF_EQUITY": ("NET_FCF", "NET_EQUITY"),
+            "RATIO_FCF_EXPENSES": ("NET_FCF", "NET_EXPENSES"),
+            "RATIO_FCF_INVESTED_CAPITAL": ("NET_FCF", "NET_INVESTED_CAPITAL"),
+            "RATIO_FCF_LIABILITIES": ("NET_FCF", "NET_LIABILITIES"),
+            "RATIO_FCF_TANGIBLE": ("NET_FCF", "NET_TANGIBLE"),
+            "RATIO_FCF_SHY_ASSETS": ("NET_FCF_SHY", "NET_ASSETS"),
+            "RATIO_FCF_SHY_CASH": ("NET_FCF_SHY", "NET_CASH"),
+            "RATIO_FCF_SHY_CASH_INVESTED": ("NET_FCF_SHY", "NET_CASH_INVESTED"),
+            "RATIO_FCF_SHY_DEBT": ("NET_FCF_SHY", "NET_DEBT"),
+            "RATIO_FCF_SHY_EQUITY": ("NET_FCF_SHY", "NET_EQUITY"),
+            "RATIO_FCF_SHY_EXPENSES": ("NET_FCF_SHY", "NET_EXPENSES"),
+            "RATIO_FCF_SHY_INVESTED_CAPITAL": ("NET_FCF_SHY", "NET_INVESTED_CAPITAL"),
+            "RATIO_FCF_SHY_LIABILITIES": ("NET_FCF_SHY", "NET_LIABILITIES"),
+            "RATIO_FCF_SHY_TANGIBLE": ("NET_FCF_SHY", "NET_TANGIBLE"),
+            "RATIO_INCOME_ASSETS": ("NET_INCOME", "NET_ASSETS"),
+            "RATIO_INCOME_CASH": ("NET_INCOME", "NET_CASH"),
+            "RATIO_INCOME_CASH_INVESTED": ("NET_INCOME", "NET_CASH_INVESTED"),
+            "RATIO_INCOME_DEBT": ("NET_INCOME", "NET_DEBT"),
+            "RATIO_INCOME_EQUITY": ("NET_INCOME", "NET_EQUITY"),
+            "RATIO_INCOME_EXPENSES": ("NET_INCOME", "NET_EXPENSES"),
+            "RATIO_INCOME_INVESTED_CAPITAL": ("NET_INCOME", "NET_INVESTED_CAPITAL"),
+            "RATIO_INCOME_LIABILITIES": ("NET_INCOME", "NET_LIABILITIES"),
+            "RATIO_INCOME_TANGIBLE": ("NET_INCOME", "NET_TANGIBLE"),
+            "RATIO_TANGIBLE_ASSETS": ("NET_TANGIBLE", "NET_ASSETS"),
+            "RATIO_TANGIBLE_LIABILITIES": ("NET_TANGIBLE", "NET_LIABILITIES"),
+            "RATIO_TANGIBLE_DEBT": ("NET_TANGIBLE", "NET_DEBT"),
+        }
+
+    def signed_ratios(self):
+        """ratios that use the sign rules of get_ratio"""
+        return {
+            "RATIO_CASH_DEBT",
+            "RATIO_CASH_TANGIBLE",
+            "RATIO_CURRENT",
+            "RATIO_CURRENT_ASSETS_LIABILITIES",
+            "RATIO_CURRENT_DEBT",
+            "RATIO_EQUITY_DEBT",
+            "RATIO_EQUITY_TANGIBLE",
+            "RATIO_EXPENSES_REVENUE",
+            "RATIO_FCF_DEBT",
+            "RATIO_FCF_EQUITY",
+            "RATIO_FCF_TANGIBLE",
+            "RATIO_FCF_SHY_DEBT",
+            "RATIO_FCF_SHY_EQUITY",
+            "RATIO_FCF_SHY_TANGIBLE",
+            "RATIO_INCOME_DEBT",
+            "RATIO_INCOME_EQUITY",
+            "RATIO_INCOME_TANGIBLE",
+            "RATIO_TANGIBLE_DEBT",
+        }
+
+    def ratio_metrics(self, data):
+        signed = self.signed_ratios()
+        return {
+            name: ratio(data[numerator], data[denominator]) if name in signed
+            else data[numerator] / data[denominator]
+            for name, (numerator, denominator) in self.ratio_pairs().items()
+        }
+
     def get_ratios(self, data):
+        return self.get_metrics(
+            get_registry(self, 'ratio_metrics').names(), data=data
+        )
+
+    def per_share_metrics(self, data):
         return {
-            "RATIO_CASH_ASSETS": data['NET_CASH'] / data['NET_ASSETS'],
-            "RATIO_CASH_DEBT": get_ratio(data['NET_CASH'], data['NET_DEBT']),
-            "RATIO_CASH_LIABILITIES": data['NET_CASH'] / data['NET_LIABILITIES'],
-            "RATIO_CASH_TANGIBLE": get_ratio(data['NET_CASH'], data['NET_TANGIBLE']),
-            "RATIO_CURRENT": get_ratio(
-                data['CURRENT_ASSETS'], data["CURRENT_LIABILITIES"]
-            ),
-            "RATIO_CURRENT_ASSETS_LIABILITIES": get_ratio(
-                data['CURRENT_ASSETS'], data['NET_LIABILITIES']
-            ),
-            "RATIO_CURRENT_DEBT": get_ratio(data['CURRENT_ASSETS'], data['NET_DEBT']),
-            "RATIO_EQUITY_ASSETS": data['NET_EQUITY'] / data['NET_ASSETS'],
-            "RATIO_EQUITY_DEBT": get_ratio(data['NET_EQUITY'], data['NET_DEBT']),
-            "RATIO_EQUITY_LIABILITIES": data['NET_EQUITY'] / data['NET_LIABILITIES'],
-            "RATIO_EQUITY_TANGIBLE": get_ratio(data['NET_EQUITY'], data['NET_TANGIBLE']),
-            "RATIO_EXPENSES_REVENUE": get_ratio(data['NET_EXPENSES'], data['NET_REVENUE']),
-            "RATIO_FCF_ASSETS": data['NET_FCF'] / data['NET_ASSETS'],
-            "RATIO_FCF_CASH": data['NET_FCF'] / data['NET_CASH'],
-            "RATIO_FCF_CASH_INVESTED": data['NET_FCF'] / data['NET_CASH_INVESTED'],
-            "RATIO_FCF_DEBT": get_ratio(data['NET_FCF'], data['NET_DEBT']),
-            "RATIO_FCF_EQUITY": get_ratio(data['NET_FCF'], data['NET_EQUITY']),
-            "RATIO_FCF_EXPENSES": data['NET_FCF'] / data['NET_EXPENSES'],
-            "RATIO_FCF_INVESTED_CAPITAL": data['NET_FCF'] / data['NET_INVESTED_CAPITAL'],
-            "RATIO_FCF_LIABILITIES": data['NET_FCF'] / data['NET_LIABILITIES'],
-            "RATIO_FCF_TANGIBLE": get_ratio(data['NET_FCF'], data['NET_TANGIBLE']),
-            "RATIO_FCF_SHY_ASSETS": data['NET_FCF_SHY'] / data['NET_ASSETS'],
-            "RATIO_FCF_SHY_CASH": data['NET_FCF_SHY'] / data['NET_CASH'],
-            "RATIO_FCF_SHY_CASH_INVESTED": data['NET_FCF_SHY'] / data['NET_CASH_INVESTED'],
-            "RATIO_FCF_SHY_DEBT": get_ratio(data['NET_FCF_SHY'], data['NET_DEBT']),
-            "RATIO_FCF_SHY_EQUITY": get_ratio(data['NET_FCF_SHY'], data['NET_EQUITY']),
-            "RATIO_FCF_SHY_EXPENSES": data['NET_FCF_SHY'] / data['NET_EXPENSES'],
-            "RATIO_FCF_SHY_INVESTED_CAPITAL": data['NET_FCF_SHY'] / data['NET_INVESTED_CAPITAL'],
-            "RATIO_FCF_SHY_LIABILITIES": data['NET_FCF_SHY'] / data['NET_LIABILITIES'],
-            "RATIO_FCF_SHY_TANGIBLE": get_ratio(data['NET_FCF_SHY'], data['NET_TANGIBLE']),
-            "RATIO_INCOME_ASSETS": data['NET_INCOME'] / data['NET_ASSETS'],
-            "RATIO_INCOME_CASH": data['NET_INCOME'] / data['NET_CASH'],
-            "RATIO_INCOME_CASH_INVESTED": data['NET_INCOME'] / data['NET_CASH_INVESTED'],
-            "RATIO_INCOME_DEBT": get_ratio(data['NET_INCOME'], data['NET_DEBT']),
-            "RATIO_INCOME_EQUITY": get_ratio(data['NET_INCOME'], data['NET_EQUITY']),
-            "RATIO_INCOME_EXPENSES": data['NET_INCOME'] / data['NET_EXPENSES'],
-            "RATIO_INCOME_INVESTED_CAPITAL": data['NET_INCOME'] / data['NET_INVESTED_CAPITAL'],
-            "RATIO_INCOME_LIABILITIES": data['NET_INCOME'] / data['NET_LIABILITIES'],
-            "RATIO_INCOME_TANGIBLE": get_ratio(data['NET_INCOME'], data['NET_TANGIBLE']),
-            "RATIO_TANGIBLE_ASSETS": data['NET_TANGIBLE'] / data['NET_ASSETS'],
-            "RATIO_TANGIBLE_LIABILITIES": data['NET_TANGIBLE'] / data['NET_LIABILITIES'],
-            "RATIO_TANGIBLE_DEBT": get_ratio(data['NET_TANGIBLE'], data['NET_DEBT']),
+            f'PER_SHARE_{name}': data[name] / data['NET_SHARES']
+            for name in get_registry(self, 'net_value_metrics').names()
+        }
+
+    def moving_average_metrics(self, data):
+        return {
+            **self.difference_metrics(data),
+            **self.ratio_metrics(data),
+            **self.per_share_metrics(data),
         }
 
+    def get_metrics(self, names, data=None):
+        """return {name: values} of the difference, ratio and per share
+           metrics in names computed from data, the moving averages by default,
+           only the columns and subexpressions they need are evaluated
+        """
+        return get_registry(self, 'moving_average_metrics').evaluate(
+            self.moving_averages if data is None else data, names
+        )
+
+    @node()
     def get_moving_average_ratios(self):
         return DataFrame(self.get_ratios(self.moving_averages))
 
+    @node()
     def get_moving_average_sums(self):
         return self.moving_averages.apply(sum)
 
 
 
+    @node()
     def get_average_moving_averages(self):
         try:
-            result = self.moving_averages.iloc[-1]
+            result = self.moving_averages.iloc[-1].copy()
         except IndexError:
             result = self.moving_averages
         result['NET_TANGIBLE'] = self.get_net_tangible(result)
@@ -415,6 +691,8 @@ class Stock:
         # )
         return result
 
+    @node()
+    @timed('get_summary')
     def get_summary(self):
         return concat([
             self.get_averages(),
@@ -427,26 +705,43 @@ class Stock:
         ], axis=0)
 
     def replace_null_values_with_zero(self, dataframe):
-        self.logger.log(f"Replaced Null Values with 0")
+        self.logger.debug('Replaced Null Values with 0')
         return dataframe.replace([inf, -inf, nan, 'None', 'NaN'], 0)
 
     def to_csv(self, output_folder):
-        self.logger.log(f'Writing {self.ticker} summary to csv')
-        write_report(
+        self.logger.log('Writing %s summary to csv', self.ticker)
+        return write_report(
             data_frame=self.get_summary(),
             report='summary',
             to_file=self.ticker,
             to_folder=output_folder,
         )
 
+    def to_summary_table(self, output_folder):
+        """append the summary as one row of the summary table in output_folder
+           and return the ticker or None when it could not be written
+        """
+        self.logger.log('Appending %s summary to summary table', self.ticker)
+        written = SummaryTable(output_folder).append(
+            [(self.ticker, self.get_summary())]
+        )
+        return written[0] if written else None
+
 
 class StockPup(Stock):
 
-    def __init__(self, ticker=None, filename=None):
+    def __init__(
+        self, ticker=None, filename=None, cache=True, store=None,
+        raw_data=None, analyze=True,
+    ):
         self.ticker = ticker if ticker else self.get_ticker(filename)
         self.filename = filename if filename else self.get_filename(ticker)
-        super().__init__(ticker=self.ticker, filename=self.filename)
-        self.get_moving_averages()
+        super().__init__(
+            ticker=self.ticker, filename=self.filename,
+            cache=cache, store=store, raw_data=raw_data,
+        )
+        if analyze:
+            self.get_moving_averages()
 
     def get_filename(self, ticker):
         return f'{ticker}_quarterly_financial_data.csv'
@@ -461,7 +756,7 @@ class StockPup(Stock):
         return 'Quarter end'
 
     def set_index(self, dataframe):
-        self.logger.log(f"Setting Index to Years")
+        self.logger.debug('Setting Index to Years')
         if not isinstance(dataframe.index, MultiIndex):
             return dataframe.set_index([
                 Index(dataframe.index.year, name="YEAR"),
@@ -501,17 +796,18 @@ class StockPup(Stock):
             "SHARES SPLIT ADJUSTED": "NET_SHARES",
         }
 
+    @timed('set_numeric_datatypes')
     def set_numeric_datatypes(self, dataframe):
-        self.logger.log('Converting to Numeric DataTypes')
+        self.logger.debug('Converting to Numeric DataTypes')
         return self.replace_null_values_with_zero(
             self.get_annual_data(dataframe)
         ).apply(to_numeric)
 
     def get_incomplete_years(self, dataframe):
-        return [
-            year for year in dataframe.index.levels[0]
-            if len(dataframe.loc[year]) != 4
-        ]
+        years, counts = unique(
+            dataframe.index.get_level_values(0), return_counts=True
+        )
+        return years[counts != 4].tolist()
 
     def get_annual_data(self, dataframe):
         result = self.set_index(dataframe)
@@ -562,19 +858,68 @@ class StockPup(Stock):
             "NET_WORKING_CAPITAL": self.fourth_quarter,
         }
 
+    def aggregate_quarters(self, dataframe, mappings):
+        """return one row per year of four quarters with the sums and fourth
+           quarters of mappings taken over a (years, 4, metrics) array,
+           or None for data or mappings the array path does not cover
+        """
+        columns = list(mappings)
+        if (
+            not len(dataframe) or len(dataframe) % 4
+         or not set(columns) <= set(dataframe.columns)
+         or any(
+                mapping not in (sum, self.fourth_quarter)
+                for mapping in mappings.values()
+            )
+        ):
+            return
+        years = dataframe.index.get_level_values('YEAR').to_numpy()
+        order = argsort(years, kind='stable')
+        years = years[order].reshape(-1, 4)
+        if (years != years[:, :1]).any():
+            return
+        quarters = dataframe[columns].to_numpy(dtype='float64')[order].reshape(
+            len(years), 4, len(columns)
+        )
+        # groupby turns the builtin sum into its compensated sum that
+        # skips nan, so the quarters are added the same way
+        sums = zeros(quarters[:, 0].shape)
+        compensation = zeros(sums.shape)
+        with errstate(invalid='ignore'):
+            for quarter in range(4):
+                values = quarters[:, quarter]
+                present = ~isnan(values)
+                adjusted = values - compensation
+                total = sums + adjusted
+                compensation = where(
+                    present, total - sums - adjusted, compensation
+                )
+                sums = where(present, total, sums)
+        return DataFrame(
+            where(
+                [mappings[column] is sum for column in columns],
+                sums, quarters[:, 0],
+            ),
+            index=Index(years[:, 0], name='YEAR'),
+            columns=columns,
+        )
+
+    @node(*RAW_DATA_INPUTS)
     def get_aggregated_years(self):
-        self.logger.log('Aggregating quarters to years')
-        return self.get_net_values().groupby(
-            level='YEAR'
-        ).agg(self.aggregate_mappings())
+        self.logger.debug('Aggregating quarters to years')
+        net_values = self.get_net_values()
+        mappings = self.aggregate_mappings()
+        result = self.aggregate_quarters(net_values, mappings)
+        if result is None:
+            return net_values.groupby(level='YEAR').agg(mappings)
+        return result
 
-    def get_moving_averages(self, window=5):
-        self.logger.log(f'Calculating {window} year moving averages for Net Values')
-        self.moving_averages = (
-            self.get_aggregated_years()
-                .rolling(window=window, min_periods=1)
-                .median()
-        )
+    @node(*RAW_DATA_INPUTS)
+    def get_annual_net_values(self):
+        return self.get_aggregated_years()
+
+    def get_moving_average_data(self):
+        return self.get_aggregated_years()
 
     def get_net_shares(self, dataframe):
         return dataframe["NET_SHARES"]
@@ -582,11 +927,18 @@ class StockPup(Stock):
 
 class Edgar(Stock):
 
-    def __init__(self, ticker=None, filename=None):
+    def __init__(
+        self, ticker=None, filename=None, cache=True, store=None,
+        raw_data=None, analyze=True,
+    ):
         self.ticker = ticker if ticker else self.get_ticker(filename)
         self.filename = filename if filename else self.get_filename(ticker)
-        super().__init__(ticker=self.ticker, filename=self.filename)
-        self.get_moving_averages()
+        super().__init__(
+            ticker=self.ticker, filename=self.filename,
+            cache=cache, store=store, raw_data=raw_data,
+        )
+        if analyze:
+            self.get_moving_averages()
 
     def get_filename(self, ticker):
         return f'{ticker}.csv'
@@ -600,6 +952,17 @@ class Edgar(Stock):
     def get_index_column(self):
         return 'fiscal_year'
 
+    def has_date_index(self):
+        return False
+
+    def used_columns(self):
+        return {*self.columns_mapping(), 'NET_INCOME', 'DOC_TYPE'}
+
+    def get_column_dtype(self, name):
+        if name.upper() == 'DOC_TYPE':
+            return str
+        return 'float64'
+
     def set_index(self, dataframe):
         try:
             dataframe.index = dataframe.index.year
@@ -656,8 +1019,9 @@ class Edgar(Stock):
             columns=dataframe.dtypes[dataframe.dtypes.apply(is_object_dtype)].index.to_list()
         )
 
+    @timed('set_numeric_datatypes')
     def set_numeric_datatypes(self, dataframe):
-        self.logger.log('Converting to Numeric DataTypes')
+        self.logger.debug('Converting to Numeric DataTypes')
         return self.replace_null_values_with_zero(
             self.drop_non_numeric_data_types(dataframe)
         ).apply(to_numeric)
@@ -674,14 +1038,6 @@ class Edgar(Stock):
     def get_net_shares(self, dataframe):
         return dataframe["NET_INCOME"] / dataframe["PER_SHARE_EARNINGS_DILUTED"]
 
-    def get_moving_averages(self, window=5):
-        self.logger.log(f'Calculating {window} year moving averages for Net Values')
-        self.moving_averages = (
-            self.get_net_values()
-                .rolling(window=window, min_periods=1)
-                .median()
-        )
-
 
 
 class AssignSector(Stock):
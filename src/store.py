@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+
+from numpy import array, concatenate, full, load, nan, save
+from pandas import DataFrame, Index
+from pandas.api.types import is_datetime64_dtype, is_object_dtype
+from pandas.errors import EmptyDataError
+from src.columnar import (
+    decode_strings, encode_strings, is_fresh, is_wanted, read_raw_csv
+)
+from src.utilities import (
+    file_fingerprint, list_filetype, makedir, store_folder
+)
+
+
+def storage_kind(values):
+    """numbers and booleans are stored as float64 and cast back on read"""
+    if is_datetime64_dtype(values.dtype):
+        return 'datetime64[ns]'
+    if is_object_dtype(values.dtype):
+        if all(isinstance(value, str) for value in values.dropna()):
+            return 'str'
+        raise ValueError(f'{values.name} holds values that are not strings')
+    return 'float64'
+
+def empty_values(kind, length):
+    if kind == 'str':
+        return full(length, ''), full(length, True)
+    return full(length, nan, dtype=kind), None
+
+def encode_values(kind, values):
+    if kind == 'str':
+        return encode_strings(values)
+    return values.to_numpy(dtype=kind), None
+
+def describe(values):
+    return [str(values.name), values.dtype.name, storage_kind(values)]
+
+def get_store_folder(from_folder):
+    return store_folder(os.path.basename(os.path.normpath(from_folder)))
+
+def build_store(from_folder=None, index_col=None, to_folder=None):
+    """pack every csv in from_folder into one long table with a row offset
+       index per file, so a single ticker can be sliced out of the store
+    """
+    to_folder = to_folder if to_folder else get_store_folder(from_folder)
+    files = {}
+    frames = []
+    rows = 0
+    for filename in list_filetype(in_folder=from_folder):
+        source = os.path.join(from_folder, filename)
+        fingerprint = file_fingerprint(source, checksum=True)
+        try:
+            frame = read_raw_csv(source, index_col=index_col)
+            index = frame.index.to_series().rename(frame.index.name)
+            files[filename] = {
+                'start': rows,
+                'stop': rows + len(frame),
+                'fingerprint': fingerprint,
+                'index': describe(index),
+                'columns': [describe(frame[name]) for name in frame.columns],
+            }
+        except (ValueError, EmptyDataError):
+            continue
+        frames.append((filename, index, frame))
+        rows += len(frame)
+
+    columns = sorted({
+        (name, kind)
+        for record in files.values()
+        for name, _, kind in [record['index'], *record['columns']]
+    })
+    keys = {column: f'column_{key}' for key, column in enumerate(columns)}
+
+    temporary = f'{to_folder}.{os.getpid()}.tmp'
+    makedir(temporary)
+    for (name, kind), key in keys.items():
+        pieces, nulls = [], []
+        for filename, index, frame in frames:
+            record = files[filename]
+            values = index if record['index'][0] == name else frame.get(name)
+            if values is None or storage_kind(values) != kind:
+                values, null = empty_values(kind, len(frame))
+            else:
+                values, null = encode_values(kind, values)
+            pieces.append(values)
+            nulls.append(null)
+        if kind == 'str':
+            save(f'{temporary}/{key}.npy', concatenate(pieces).astype(str))
+            save(f'{temporary}/{key}_null.npy', concatenate(nulls))
+        else:
+            save(f'{temporary}/{key}.npy', concatenate(pieces))
+
+    for record in files.values():
+        for column in [record['index'], *record['columns']]:
+            column.append(keys[(column[0], column[2])])
+    with open(f'{temporary}/index.json', 'w') as out_file:
+        json.dump({'source': from_folder, 'rows': rows, 'files': files}, out_file)
+
+    shutil.rmtree(to_folder, ignore_errors=True)
+    os.replace(temporary, to_folder)
+    print(f'::packed {len(files)} files with {rows} rows into {to_folder}::')
+
+
+class Store:
+    """read only view of a store written by build_store
+       columns are memory mapped so slicing a ticker only reads its rows
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.arrays = {}
+        self.header = None
+
+    def __getstate__(self):
+        return {'folder': self.folder, 'arrays': {}, 'header': None}
+
+    def get_header(self):
+        if self.header is None:
+            with open(f'{self.folder}/index.json') as in_file:
+                self.header = json.load(in_file)
+        return self.header
+
+    def tickers(self):
+        return list(self.get_header()['files'])
+
+    def get_array(self, key):
+        if key not in self.arrays:
+            self.arrays[key] = load(f'{self.folder}/{key}.npy', mmap_mode='r')
+        return self.arrays[key]
+
+    def get_values(self, column, start, stop):
+        _, dtype, kind, key = column
+        values = self.get_array(key)[start:stop]
+        if kind == 'str':
+            return decode_strings(
+                array(values), self.get_array(f'{key}_null')[start:stop]
+            )
+        return values.astype(dtype)
+
+    def get(self, filename, columns=None):
+        """return the raw data for filename or None if it is not stored
+           or the source file changed since the store was built
+        """
+        try:
+            header = self.get_header()
+            record = header['files'][filename]
+        except (FileNotFoundError, KeyError):
+            return
+        if not is_fresh(
+            os.path.join(header['source'], filename), record['fingerprint']
+        ):
+            return
+        start, stop = record['start'], record['stop']
+        wanted = [
+            column for column in record['columns']
+            if is_wanted(column[0], columns)
+        ]
+        return DataFrame(
+            {
+                column[0]: self.get_values(column, start, stop)
+                for column in wanted
+            },
+            index=Index(
+                self.get_values(record['index'], start, stop),
+                name=record['index'][0]
+            ),
+            columns=[column[0] for column in wanted],
+        )
+
+
+def open_store(from_folder):
+    """return the Store built from from_folder or None if there is none"""
+    folder = get_store_folder(from_folder)
+    if os.path.exists(f'{folder}/index.json'):
+        return Store(folder)
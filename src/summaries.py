@@ -0,0 +1,120 @@
+import itertools
+import json
+import os
+import time
+
+from numpy import load, savez
+from pandas import DataFrame, Series, concat
+from src.columnar import from_column_arrays, to_column_arrays
+from src.utilities import list_filetype, makedir
+
+INDEX = 'SYMBOL'
+sequence = itertools.count()
+
+
+def to_rows(summaries):
+    """return one row per ticker from (ticker, summary) pairs,
+       summaries that are not a Series of metrics are left out
+    """
+    rows = {
+        ticker: summary for ticker, summary in summaries
+        if isinstance(summary, Series) and summary.index.is_unique
+    }
+    rows = DataFrame.from_dict(rows, orient='index', dtype='float64')
+    rows.index.name = INDEX
+    return rows
+
+
+class SummaryTable:
+    """one row per ticker and one column per metric
+
+       every append writes a new part file with a batch of rows so writers
+       never rewrite what is already stored, reading concatenates the parts
+       and keeps the latest row for each ticker
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    def parts(self):
+        return [
+            os.path.join(self.folder, filename)
+            for filename in list_filetype(in_folder=self.folder, extension='npz')
+            if filename.startswith('part_')
+        ]
+
+    def write_part(self, rows, target=None):
+        makedir(self.folder)
+        header, arrays = to_column_arrays(rows)
+        if target is None:
+            target = os.path.join(
+                self.folder,
+                f'part_{time.time_ns():020d}_{os.getpid()}_{next(sequence)}.npz'
+            )
+        temporary = f'{target}.tmp'
+        with open(temporary, 'wb') as out_file:
+            savez(out_file, header=json.dumps(header), **arrays)
+        os.replace(temporary, target)
+        return target
+
+    def append(self, summaries):
+        """write (ticker, summary) pairs as one batch and return the tickers written"""
+        return self.append_rows(to_rows(summaries))
+
+    def append_rows(self, rows):
+        """write a DataFrame with one row per ticker as one batch and return
+           the tickers written
+        """
+        if len(rows):
+            self.write_part(rows)
+            print(f"::writing {len(rows)} summaries to '{self.folder}'::")
+        return list(rows.index)
+
+    def read_part(self, filename, columns=None):
+        with load(filename, allow_pickle=False) as part:
+            return from_column_arrays(
+                json.loads(str(part['header'])),
+                {key: part[key] for key in part.files},
+                columns=columns,
+            )
+
+    def read(self, columns=None, parts=None):
+        """return every stored summary as one DataFrame or None if there are
+           none, only reading parts when given
+        """
+        parts = self.parts() if parts is None else parts
+        parts = [self.read_part(part, columns=columns) for part in parts]
+        if not parts:
+            return
+        table = concat(parts, axis=0, sort=False)
+        return table[~table.index.duplicated(keep='last')].sort_index()
+
+    def tickers(self):
+        """return the set of tickers with a stored summary"""
+        table = self.read(columns=[])
+        return set() if table is None else set(table.index)
+
+    def compact(self, remove=()):
+        """rewrite all parts as a single part without the tickers in remove,
+           named after the newest part it replaces
+        """
+        parts = self.parts()
+        table = self.read(parts=parts)
+        if table is None:
+            return
+        # parts appended while compacting sort after the newest part
+        # so their rows are still read as the latest
+        self.write_part(
+            table.drop(index=list(remove), errors='ignore'), target=parts[-1]
+        )
+        for part in parts[:-1]:
+            os.remove(part)
+
+    def remove(self, tickers):
+        if tickers:
+            self.compact(remove=tickers)
+
+
+def read_summaries(folder, columns=None):
+    """return the summary table in folder with one row per ticker"""
+    return SummaryTable(folder).read(columns=columns)
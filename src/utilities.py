@@ -1,4 +1,5 @@
 import datetime
+import hashlib
 import os
 import random
 import shutil
@@ -6,30 +7,44 @@ import sys
 import time
 import traceback
 
+# src.spans like every other module, a bare spans import would record
+# spans in a second copy of the module that is never written
+from src.spans import timed
+
 def get_folder_name(parent, value=''):
     return f'{parent}/{value}'
 
 def analysis_folder(value=''):
     return get_folder_name('analysis', value)
 
+def cache_folder(value=''):
+    return get_folder_name('cache', value)
+
 def edgar_folder(value=''):
     return get_folder_name('edgar_data', value)
 
 def industry_folder(value=''):
     return get_folder_name('industry_data', value)
 
+def panel_folder(value=''):
+    return get_folder_name('panel', value)
+
 def processed_folder(value=''):
     return get_folder_name('processed', value)
 
 def sectors_folder(value=''):
     return get_folder_name('sectors_data', value)
 
+def store_folder(value=''):
+    return get_folder_name('store', value)
+
 def stockpup_folder(value=''):
     return get_folder_name('stockpup_data', value)
 
 def testing_folder(value=''):
     return get_folder_name('tests/test_run', value)
 
+@timed('write_report')
 def write_report(data_frame=None, report='', to_file=None,
                  to_folder=None):
     def filename():
@@ -53,6 +68,7 @@ def write_report(data_frame=None, report='', to_file=None,
 
     print(f"::writing {to_file}'s {report.lower()} "
             f"report to '{to_folder}'::")
+    return filename()
 
 def benchmark(report=None, job=None, folder='benchmarks/', *args, **kwargs):
     if report is None:
@@ -69,6 +85,17 @@ def benchmark(report=None, job=None, folder='benchmarks/', *args, **kwargs):
             )
         print(f'{report} is done ')
 
+def file_fingerprint(filename, checksum=False):
+    """return size and modification time of filename, with an optional
+       sha1 checksum of its contents
+    """
+    status = os.stat(filename)
+    result = {'size': status.st_size, 'mtime': status.st_mtime_ns}
+    if checksum:
+        with open(filename, 'rb') as in_file:
+            result['sha1'] = hashlib.sha1(in_file.read()).hexdigest()
+    return result
+
 def janitor(folder):
     if os.path.exists(folder):
         shutil.rmtree(folder)
@@ -0,0 +1,90 @@
+import shutil
+import unittest
+
+from pandas.testing import assert_frame_equal, assert_series_equal
+from src.batch import get_summary_columns, summarize, summarize_windows
+from src.stock import Edgar, StockPup
+from src.store import Store, build_store
+from src.utilities import janitor, makedir, testing_folder
+
+EDGAR = ['A.csv', 'AAPL.csv', 'ABT.csv', 'AC.csv', 'ACMR.csv', 'ZYXI.csv']
+
+
+class TestBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        makedir(testing_folder('batch_source'))
+        for filename in EDGAR:
+            shutil.copy2(
+                f'edgar_data/{filename}', testing_folder(f'batch_source/{filename}')
+            )
+        build_store(
+            from_folder=testing_folder('batch_source/'),
+            index_col='fiscal_year',
+            to_folder=testing_folder('batch_store'),
+        )
+        cls.summaries, cls.failed = summarize(
+            Edgar, EDGAR, store=Store(testing_folder('batch_store'))
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        janitor(testing_folder('batch_source'))
+        janitor(testing_folder('batch_store'))
+
+    def test_summaries_match_stock_summaries(self):
+        self.assertEqual(list(self.summaries.index), ['A', 'AAPL', 'ABT', 'AC'])
+        for ticker in self.summaries.index:
+            assert_series_equal(
+                self.summaries.loc[ticker],
+                Edgar(ticker=ticker).get_summary(),
+                check_names=False,
+            )
+
+    def test_summary_columns_are_known_without_reading_a_file(self):
+        self.assertEqual(
+            get_summary_columns(Edgar), list(self.summaries.columns)
+        )
+
+    def test_files_without_two_years_fail(self):
+        self.assertEqual(sorted(self.failed), ['ACMR.csv', 'ZYXI.csv'])
+
+    def test_summaries_without_store_are_read_one_ticker_at_a_time(self):
+        summaries, failed = summarize(
+            StockPup, ['BAC_quarterly_financial_data.csv']
+        )
+        self.assertEqual(failed, [])
+        assert_series_equal(
+            summaries.loc['BAC'],
+            StockPup(ticker='BAC').get_summary(),
+            check_names=False,
+        )
+
+    def test_window_summaries_match_stock_window_summaries(self):
+        summaries, short = summarize_windows(
+            Edgar, Edgar(ticker='AAPL').get_moving_average_data()
+                .assign(TICKER='AAPL')
+                .set_index('TICKER', append=True)
+                .swaplevel(),
+            windows=[3, 5],
+        )
+        self.assertEqual(short, [])
+        expected = Edgar(ticker='AAPL').get_window_summaries([3, 5])
+        for window in [3, 5]:
+            assert_series_equal(
+                summaries.loc[(window, 'AAPL')],
+                expected.loc[window],
+                check_names=False,
+            )
+
+    def test_window_summary_of_default_window_is_summary(self):
+        stock = Edgar(ticker='AAPL')
+        summary = stock.get_summary()
+        summaries = stock.get_window_summaries([3, 5])
+        assert_series_equal(summaries.loc[5], summary, check_names=False)
+        assert_series_equal(stock.get_summary(), summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
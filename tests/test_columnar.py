@@ -0,0 +1,90 @@
+import json
+import os
+import unittest
+
+from numpy import load
+from pandas import read_csv
+from pandas.testing import assert_frame_equal
+from src.columnar import cache_filename, cached_read, read_cache, write_cache
+from src.utilities import janitor, makedir, testing_folder
+
+
+class TestColumnarCache(unittest.TestCase):
+
+    def setUp(self):
+        makedir(testing_folder('columnar'))
+        self.filename = testing_folder('columnar/AAA.csv')
+        with open(self.filename, 'w') as out_file:
+            out_file.write(
+                'fiscal_year,doc_type,amend,assets,debt\n'
+                '2018,10-K,False,4.5,\n'
+                '2017,10-Q,True,3,None\n'
+                '2016,,False,2.25,1\n'
+            )
+
+    def tearDown(self):
+        janitor(testing_folder('columnar'))
+        janitor(os.path.dirname(cache_filename(self.filename)))
+
+    def read(self):
+        return read_csv(
+            self.filename, index_col='fiscal_year', parse_dates=True
+        )
+
+    def test_cached_frame_matches_parsed_csv(self):
+        write_cache(self.filename, self.read())
+        assert_frame_equal(read_cache(self.filename), self.read())
+
+    def test_read_cache_returns_requested_columns_only(self):
+        write_cache(self.filename, self.read())
+        assert_frame_equal(
+            read_cache(self.filename, columns=['debt', 'assets']),
+            self.read()[['assets', 'debt']]
+        )
+
+    def test_read_cache_returns_none_when_source_changes(self):
+        write_cache(self.filename, self.read())
+        with open(self.filename, 'a') as out_file:
+            out_file.write('2015,10-K,False,1,1\n')
+        self.assertIsNone(read_cache(self.filename))
+
+    def test_read_cache_ignores_touched_source_with_same_contents(self):
+        write_cache(self.filename, self.read())
+        os.utime(self.filename, ns=(0, 0))
+        self.assertIsNotNone(read_cache(self.filename))
+
+    def test_read_cache_refreshes_modification_time_of_touched_source(self):
+        write_cache(self.filename, self.read())
+        os.utime(self.filename, ns=(0, 0))
+        read_cache(self.filename)
+        with load(cache_filename(self.filename)) as cached:
+            header = json.loads(str(cached['header']))
+        self.assertEqual(header['fingerprint']['mtime'], 0)
+
+    def test_cache_loads_without_pickle(self):
+        write_cache(self.filename, self.read())
+        with load(cache_filename(self.filename), allow_pickle=False) as cached:
+            self.assertNotIn('O', [cached[key].dtype.kind for key in cached.files])
+
+    def test_frames_of_other_objects_are_not_cached(self):
+        frame = self.read()
+        frame['debt'] = [[1], None, (2,)]
+        with self.assertRaises(ValueError):
+            write_cache(self.filename, frame)
+        assert_frame_equal(cached_read(self.filename, lambda: frame), frame)
+        self.assertIsNone(read_cache(self.filename))
+
+    def test_cached_read_only_parses_csv_when_cache_is_stale(self):
+        calls = []
+
+        def reader():
+            calls.append(self.filename)
+            return self.read()
+
+        cached_read(self.filename, reader)
+        assert_frame_equal(cached_read(self.filename, reader), self.read())
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
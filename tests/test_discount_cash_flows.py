@@ -1,7 +1,10 @@
 import unittest
-from src.stock import get_discount_cash_flow_value
-from numpy import nan
-from numpy.testing import assert_equal
+from src.stock import (
+    get_discount_cash_flow_value, get_discount_cash_flow_values
+)
+from numpy import array, exp, nan, stack
+from numpy.testing import assert_allclose, assert_equal
+from pandas import Series
 
 
 class TestGetDiscountCashFlowValue(unittest.TestCase):
@@ -32,5 +35,52 @@ class TestGetDiscountCashFlowValue(unittest.TestCase):
         )
 
 
+class TestGetDiscountCashFlowValues(unittest.TestCase):
+
+    values = array([nan, 1, 1.5, 1.2, nan, 1.1, 3.0])
+
+    def expanding(self, values):
+        return Series(values).expanding(min_periods=1).apply(
+            get_discount_cash_flow_value, raw=True
+        ).to_numpy()
+
+    def test_dcf_values_match_dcf_value_of_every_prefix(self):
+        for values in (self.values, self.values[1:], self.values[1:4]):
+            assert_allclose(
+                get_discount_cash_flow_values(values),
+                self.expanding(values),
+                rtol=1e-12,
+            )
+
+    def test_dcf_values_are_computed_for_every_column(self):
+        values = stack([self.values[1:], -self.values[1:]], axis=1)
+        assert_allclose(
+            get_discount_cash_flow_values(values),
+            stack([self.expanding(column) for column in values.T], axis=1),
+            rtol=1e-12,
+        )
+
+    def test_dcf_values_are_computed_for_every_ticker_along_axis(self):
+        values = array([[[1.0], [2.0]], [[3.0], [4.0]]])
+        assert_allclose(
+            get_discount_cash_flow_values(values, discount_rate=0.1, axis=1),
+            array([[[1.0], [1 + 2 / 1.1]], [[3.0], [3 + 4 / 1.1]]]),
+        )
+
+    def test_dcf_values_with_compounding(self):
+        assert_allclose(
+            get_discount_cash_flow_values(
+                [1.0, 1.0], discount_rate=0.1, compounding='continuous'
+            ),
+            [1.0, 1 + exp(-0.1)],
+        )
+        assert_allclose(
+            get_discount_cash_flow_values(
+                [1.0, 1.0], discount_rate=0.1, compounding=4
+            ),
+            [1.0, 1 + 1.025 ** -4],
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
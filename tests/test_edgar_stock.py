@@ -1,7 +1,7 @@
 import unittest
 
 from src.stock import Stock
-from pandas.testing import assert_index_equal
+from pandas.testing import assert_frame_equal, assert_index_equal
 from pandas.api.types import is_numeric_dtype
 from pandas import Index, concat
 from numpy import median
@@ -76,6 +76,36 @@ class TestEdgar(unittest.TestCase):
             ])
         )
 
+    def test_raw_data_with_used_columns_only(self):
+        assert_index_equal(
+            stock.get_raw_data(used_columns_only=True).columns,
+            Index([
+                'doc_type',
+                'revenues',
+                'net_income',
+                'eps_basic',
+                'eps_diluted',
+                'dividend',
+                'assets',
+                'cur_assets',
+                'cur_liab',
+                'cash',
+                'equity',
+                'cash_flow_op',
+                'cash_flow_inv',
+                'cash_flow_fin',
+                'debt',
+                'goodwill',
+            ])
+        )
+
+    def test_read_used_columns_matches_raw_data(self):
+        assert_frame_equal(
+            stock.read_used_columns(),
+            stock.read_raw_data()[stock.read_used_columns().columns],
+            check_dtype=False,
+        )
+
     def test_set_numeric_datatypes(self):
         self.assertTrue(
             stock.set_numeric_datatypes(stock.get_raw_data())
@@ -0,0 +1,39 @@
+import unittest
+
+from src.executor import Job, get_chunksize, get_jobs, get_workers, interleave
+
+
+class TestExecutor(unittest.TestCase):
+
+    def test_workers_are_not_more_than_tasks(self):
+        self.assertEqual(get_workers(8, tasks=3), 3)
+        self.assertEqual(get_workers(8, tasks=0), 1)
+        self.assertGreaterEqual(get_workers(), 1)
+
+    def test_chunksize_gives_every_worker_several_chunks(self):
+        self.assertEqual(get_chunksize(6000, 4), 375)
+        self.assertEqual(get_chunksize(6000, 4, in_flight=64), 8)
+        self.assertEqual(get_chunksize(10, 4), 1)
+
+    def test_interleave_takes_one_from_each_in_turn(self):
+        self.assertEqual(
+            interleave([1, 2, 3], ['a'], [None, None]),
+            [1, 'a', None, 2, None, 3],
+        )
+
+    def test_jobs_of_every_source_are_interleaved(self):
+        self.assertEqual(
+            get_jobs([
+                ('StockPup', 'stockpup/', 'out/stockpup/', ['BAC.csv']),
+                ('Edgar', 'edgar/', 'out/edgar/', ['A.csv', 'AAPL.csv']),
+            ]),
+            [
+                Job('StockPup', 'stockpup/', 'out/stockpup/', 'BAC.csv'),
+                Job('Edgar', 'edgar/', 'out/edgar/', 'A.csv'),
+                Job('Edgar', 'edgar/', 'out/edgar/', 'AAPL.csv'),
+            ],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ import pandas
 import numpy
 
 from src.stock import get_ratio
+from src.ratios import ratio_kernel
 
 def create_series(elements):
     return pandas.Series(
@@ -113,6 +114,26 @@ class TestGetRatio(unittest.TestCase):
             -(self.negative_floats_series())
         )
 
+    def test_get_ratio_keeps_index_order_and_returns_nan_for_missing_values(self):
+        pandas.testing.assert_series_equal(
+            get_ratio(
+                pandas.Series([1.0, numpy.nan, -2.0, 0.0], index=[2012, 2010, 2011, 2010]),
+                pandas.Series([2.0, 1.0, 0.0, numpy.nan], index=[2012, 2010, 2011, 2010]),
+            ),
+            pandas.Series([0.5, numpy.nan, -2.0, numpy.nan], index=[2012, 2010, 2011, 2010])
+        )
+
+    def test_ratio_kernel_evaluates_matrices_like_get_ratio(self):
+        values = numpy.array([-2.0, -1.0, 0.0, 1.0, 2.0])
+        numerators, denominators = numpy.meshgrid(values, values)
+        self.assertEqual(
+            ratio_kernel(numerators, denominators).tolist(),
+            [
+                [get_ratio(numerator, denominator) for numerator, denominator in zip(*row)]
+                for row in zip(numerators, denominators)
+            ]
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,60 @@
+import os
+import time
+import unittest
+
+from src.haystack_munger import Munge, munge_folder, substitute
+from src.utilities import janitor, makedir, testing_folder
+
+
+class TestHaystackMunger(unittest.TestCase):
+
+    def setUp(self):
+        self.from_folder = testing_folder('munge_source')
+        self.to_folder = testing_folder('munge_output')
+        makedir(self.from_folder)
+        with open(f'{self.from_folder}/abc_quarterly_financial_data.csv', 'w') as out_file:
+            out_file.write('Quarter end,Shares\n2000-01-01,None\n1999-09-30,NaN\n')
+
+    def tearDown(self):
+        janitor(self.from_folder)
+        janitor(self.to_folder)
+
+    def output(self):
+        with open(f'{self.to_folder}/ABC.csv') as in_file:
+            return in_file.read()
+
+    def test_substitute_replaces_none_nan_and_new_year(self):
+        self.assertEqual(
+            substitute(b'2000-01-01,None,NaN,1.0'), b'1999-12-31,0,0,1.0'
+        )
+
+    def test_munge_folder_writes_munged_file_per_ticker(self):
+        self.assertEqual(munge_folder(self.from_folder, self.to_folder, processes=2), [])
+        self.assertEqual(
+            self.output(), 'Quarter end,Shares\n1999-12-31,0\n1999-09-30,0\n'
+        )
+
+    def test_munge_folder_skips_files_that_are_up_to_date(self):
+        munge_folder(self.from_folder, self.to_folder, processes=1)
+        with open(f'{self.to_folder}/ABC.csv', 'w') as out_file:
+            out_file.write('kept')
+        munge_folder(self.from_folder, self.to_folder, processes=1)
+        self.assertEqual(self.output(), 'kept')
+
+        time.sleep(0.01)
+        os.utime(f'{self.from_folder}/abc_quarterly_financial_data.csv')
+        munge_folder(self.from_folder, self.to_folder, processes=1)
+        self.assertNotEqual(self.output(), 'kept')
+
+    def test_munge_writes_munged_file(self):
+        Munge(
+            f'{self.from_folder}/abc_quarterly_financial_data.csv',
+            to_folder=f'{self.to_folder}/',
+        )
+        self.assertEqual(
+            self.output(), 'Quarter end,Shares\n1999-12-31,0\n1999-09-30,0\n'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import json
+import multiprocessing
+import unittest
+
+from src import logger
+from src.utilities import janitor, makedir, testing_folder
+
+
+class Unformattable:
+
+    def __str__(self):
+        raise AssertionError('formatted a message that is not logged')
+
+
+def log_in_worker(queue):
+    logger.configure(sink=logger.QueueSink(queue))
+    logger.Logger('B').log('from %s', 'worker')
+    logger.flush()
+
+
+class TestLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.level, self.sink = logger.LEVEL, logger.get_sink()
+        self.stream = io.StringIO()
+        self.folder = testing_folder('logs/')
+        makedir(self.folder)
+
+    def tearDown(self):
+        logger.configure(level=self.level, sink=self.sink)
+        janitor(self.folder)
+
+    def use(self, level='INFO', **options):
+        logger.configure(
+            level=level, sink=logger.StreamSink(stream=self.stream, **options)
+        )
+
+    def test_messages_below_the_level_are_not_formatted(self):
+        self.use(level='INFO')
+        ticker = logger.Logger('A')
+        self.assertFalse(ticker.is_enabled(logger.DEBUG))
+        ticker.debug('skipped %s', Unformattable())
+        ticker.log('kept %s', 1)
+        logger.flush()
+        lines = self.stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith('::Ticker::A::kept 1'))
+
+    def test_entries_are_buffered_until_the_buffer_is_full(self):
+        self.use(buffer_size=3)
+        ticker = logger.Logger('A')
+        ticker.log('one')
+        ticker.log('two')
+        self.assertEqual(self.stream.getvalue(), '')
+        ticker.log('three')
+        self.assertEqual(len(self.stream.getvalue().splitlines()), 3)
+
+    def test_errors_are_written_at_once(self):
+        self.use()
+        logger.Logger('A').error('Munging data from File::%s::', 'A.csv')
+        self.assertTrue(self.stream.getvalue().startswith('[ERROR] '))
+        self.assertIn(
+            '::Ticker::A::Munging data from File::A.csv::::FAILED::',
+            self.stream.getvalue(),
+        )
+
+    def test_json_lines(self):
+        self.use(format='json')
+        logger.Logger('A').warning('careful')
+        logger.flush()
+        entry = json.loads(self.stream.getvalue())
+        self.assertEqual(
+            (entry['level'], entry['ticker'], entry['message']),
+            ('WARNING', 'A', 'careful'),
+        )
+
+    def test_log_writer_writes_entries_of_every_process(self):
+        filename = f'{self.folder}log.jsonl'
+        with logger.LogWriter(format='json', filename=filename) as writer:
+            logger.Logger('A').log('from parent')
+            worker = multiprocessing.Process(target=log_in_worker, args=(writer.queue,))
+            worker.start()
+            worker.join()
+        with open(filename) as in_file:
+            entries = [json.loads(line) for line in in_file]
+        self.assertEqual(
+            sorted(entry['message'] for entry in entries),
+            ['from parent', 'from worker'],
+        )
+        self.assertIs(logger.get_sink(), self.sink)
+
+
+if __name__ == '__main__':
+    unittest.main()
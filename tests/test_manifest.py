@@ -0,0 +1,133 @@
+import os
+import shutil
+import unittest
+
+from pandas import Series
+from src.manifest import Manifest, code_version
+from src.summaries import SummaryTable
+from src.utilities import janitor, makedir, testing_folder
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        makedir(testing_folder('manifest_source'))
+        makedir(testing_folder('manifest_output'))
+        for filename in ('A.csv', 'B.csv'):
+            for folder in ('manifest_source', 'manifest_output'):
+                with open(testing_folder(f'{folder}/{filename}'), 'w') as out_file:
+                    out_file.write(f'{filename}\n')
+        self.folder = testing_folder('manifest_source')
+        self.manifest = Manifest(testing_folder('manifest/manifest.json'))
+        for filename in ('A.csv', 'B.csv'):
+            self.manifest.record(
+                self.source(filename),
+                testing_folder(f'manifest_output/{filename}'),
+                'v1',
+            )
+
+    def tearDown(self):
+        for folder in ('manifest', 'manifest_source', 'manifest_output'):
+            janitor(testing_folder(folder))
+
+    def source(self, filename):
+        return os.path.join(self.folder, filename)
+
+    def test_unchanged_files_are_skipped(self):
+        self.assertEqual(
+            self.manifest.get_changed(self.folder, ['A.csv', 'B.csv'], 'v1'),
+            []
+        )
+
+    def test_new_and_modified_files_are_processed(self):
+        with open(self.source('B.csv'), 'a') as out_file:
+            out_file.write('changed\n')
+        self.assertEqual(
+            self.manifest.get_changed(
+                self.folder, ['A.csv', 'B.csv', 'C.csv'], 'v1'
+            ),
+            ['B.csv', 'C.csv']
+        )
+
+    def test_every_file_is_processed_when_version_changes(self):
+        self.assertEqual(
+            self.manifest.get_changed(self.folder, ['A.csv', 'B.csv'], 'v2'),
+            ['A.csv', 'B.csv']
+        )
+
+    def test_files_without_output_are_processed(self):
+        os.remove(testing_folder('manifest_output/A.csv'))
+        self.assertEqual(
+            self.manifest.get_changed(self.folder, ['A.csv', 'B.csv'], 'v1'),
+            ['A.csv']
+        )
+
+    def test_files_whose_summary_was_removed_are_processed(self):
+        table = SummaryTable(testing_folder('manifest_output/summaries'))
+        table.append([
+            ('A', Series({'AVERAGE_GROWTH': 1.0})),
+            ('B', Series({'AVERAGE_GROWTH': 2.0})),
+        ])
+        for filename in ('A.csv', 'B.csv'):
+            self.manifest.record(self.source(filename), filename[0], 'v1')
+        table.remove(['B'])
+        self.assertEqual(
+            self.manifest.get_changed(
+                self.folder, ['A.csv', 'B.csv'], 'v1',
+                exists=table.tickers().__contains__,
+            ),
+            ['B.csv']
+        )
+
+    def test_files_that_could_not_be_processed_are_not_retried(self):
+        self.manifest.record(self.source('A.csv'), None, 'v1')
+        os.remove(testing_folder('manifest_output/B.csv'))
+        self.assertEqual(
+            self.manifest.get_changed(self.folder, ['A.csv', 'B.csv'], 'v1'),
+            ['B.csv']
+        )
+
+    def test_remove_deleted_drops_entry_and_output(self):
+        self.assertEqual(
+            self.manifest.remove_deleted(self.folder, ['A.csv']),
+            [self.source('B.csv')]
+        )
+        self.assertFalse(
+            os.path.exists(testing_folder('manifest_output/B.csv'))
+        )
+        self.assertNotIn(self.source('B.csv'), self.manifest.entries)
+
+    def test_remove_deleted_passes_outputs_to_remove(self):
+        removed = []
+        self.manifest.remove_deleted(self.folder, ['B.csv'], remove=removed.extend)
+        self.assertEqual(removed, [testing_folder('manifest_output/A.csv')])
+        self.assertTrue(os.path.exists(testing_folder('manifest_output/A.csv')))
+
+    def test_save_and_reload(self):
+        self.manifest.save()
+        self.assertEqual(
+            Manifest(self.manifest.filename).entries, self.manifest.entries
+        )
+
+    def test_code_version_depends_on_configuration(self):
+        self.assertNotEqual(
+            code_version(discount_rate=0.0316),
+            code_version(discount_rate=0.05)
+        )
+
+    def test_code_version_depends_on_modules_the_analysis_imports(self):
+        folder = testing_folder('manifest_code')
+        janitor(folder)
+        shutil.copytree('src', folder)
+        version = code_version(folder=folder)
+        self.assertEqual(version, code_version())
+        for module in ('rolling.py', 'metrics.py'):
+            with open(os.path.join(folder, module), 'a') as out_file:
+                out_file.write('\n# changed\n')
+            self.assertNotEqual(code_version(folder=folder), version)
+            version = code_version(folder=folder)
+        janitor(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
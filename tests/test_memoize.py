@@ -0,0 +1,100 @@
+import unittest
+
+from pandas.testing import assert_frame_equal, assert_series_equal
+from src.memoize import Memoized, node
+from src.stock import StockPup
+
+
+class Account(Memoized):
+
+    inputs = ('balance', 'rate')
+
+    def __init__(self, balance, rate):
+        self.balance = balance
+        self.rate = rate
+
+    @node('balance')
+    def get_doubled(self):
+        return self.balance * 2
+
+    @node('rate')
+    def get_rate(self):
+        return self.rate
+
+    @node()
+    def get_interest(self):
+        return self.get_doubled() * self.get_rate()
+
+
+class TestMemoized(unittest.TestCase):
+
+    def setUp(self):
+        self.account = Account(10, 0.5)
+
+    def stats(self):
+        return self.account.get_node_stats().to_dict(orient='index')
+
+    def test_nodes_are_computed_once(self):
+        self.assertEqual(self.account.get_interest(), 10)
+        self.assertEqual(self.account.get_interest(), 10)
+        self.assertEqual(
+            self.stats(),
+            {
+                'get_doubled': {'COMPUTED': 1, 'HITS': 0},
+                'get_interest': {'COMPUTED': 1, 'HITS': 1},
+                'get_rate': {'COMPUTED': 1, 'HITS': 0},
+            }
+        )
+
+    def test_setting_an_input_invalidates_nodes_computed_from_it(self):
+        self.account.get_interest()
+        self.account.rate = 1
+        self.assertEqual(self.account.get_interest(), 20)
+        self.assertEqual(self.stats()['get_rate'], {'COMPUTED': 2, 'HITS': 0})
+        self.assertEqual(self.stats()['get_doubled'], {'COMPUTED': 1, 'HITS': 1})
+
+
+class TestStockNodes(unittest.TestCase):
+
+    def test_summary_reuses_intermediate_results(self):
+        stock = StockPup(ticker='BAC')
+        summary = stock.get_summary()
+        stats = stock.get_node_stats()
+        self.assertEqual(stats['COMPUTED'].max(), 1)
+        self.assertGreater(stats.loc['get_average_moving_averages', 'HITS'], 0)
+        assert_series_equal(stock.get_summary(), summary)
+        self.assertEqual(stock.get_node_stats().loc['get_summary', 'HITS'], 1)
+
+    def test_changing_a_summary_leaves_the_cached_summary(self):
+        stock = StockPup(ticker='BAC')
+        summary = stock.get_summary()
+        expected = summary.copy()
+        summary['ADDED'] = 1.0
+        summary.iloc[0] = -1.0
+        assert_series_equal(stock.get_summary(), expected)
+
+    def test_changing_a_node_result_leaves_the_cached_result(self):
+        stock = StockPup(ticker='BAC')
+        stock.get_summary()
+        ratios = stock.get_moving_average_ratios()
+        expected = ratios.copy()
+        ratios.iloc[:, 0] = -1.0
+        ratios['ADDED'] = 1.0
+        assert_frame_equal(stock.get_moving_average_ratios(), expected)
+        self.assertEqual(
+            stock.get_node_stats().loc['get_moving_average_ratios', 'COMPUTED'], 1
+        )
+
+    def test_setting_discount_rate_keeps_net_values(self):
+        stock = StockPup(ticker='BAC')
+        forward = stock.get_averages()['PER_SHARE_DCF_FORWARD']
+        stock.discount_rate = stock.discount_rate * 2
+        self.assertAlmostEqual(
+            stock.get_averages()['PER_SHARE_DCF_FORWARD'], forward / 2
+        )
+        self.assertEqual(stock.get_node_stats().loc['get_aggregated_years', 'COMPUTED'], 1)
+        self.assertEqual(stock.get_node_stats().loc['get_averages', 'COMPUTED'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+from numpy import nan
+from pandas import DataFrame, Series
+from pandas.testing import assert_series_equal
+from src.metrics import Registry, Symbols, metric, ratio
+from src.ratios import get_ratio
+from src.stock import StockPup
+
+
+def definitions(data):
+    return {
+        'NET': data['ASSETS'] - data['DEBT'],
+        'RATIO': ratio(data['ASSETS'] - data['DEBT'], data['DEBT']),
+        'HALF': metric('NET') / 2,
+        'NEGATIVE': -data['DEBT'],
+        'ZERO': 0.0,
+    }
+
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = Registry(definitions(Symbols()))
+        self.data = DataFrame(
+            {'ASSETS': [10.0, 4.0, nan], 'DEBT': [4.0, 0.0, 1.0], 'OTHER': [1.0, 2.0, 3.0]},
+            index=[2001, 2002, 2003],
+        )
+
+    def test_common_subexpressions_are_evaluated_once(self):
+        steps, outputs = self.registry.get_plan(['NET', 'RATIO', 'HALF'])
+        operations = [operation for _, operation, _ in steps]
+        self.assertEqual(operations.count('sub'), 1)
+        self.assertEqual(operations.count('column'), 2)
+        self.assertEqual(outputs['NET'], steps[2][0])
+
+    def test_only_requested_metrics_are_evaluated(self):
+        steps, outputs = self.registry.get_plan(['NEGATIVE'])
+        self.assertEqual(list(outputs), ['NEGATIVE'])
+        self.assertEqual(
+            [operation for _, operation, _ in steps], ['column', 'neg']
+        )
+
+    def test_evaluate_dataframe(self):
+        results = self.registry.evaluate(self.data)
+        self.assertEqual(list(results), self.registry.names())
+        assert_series_equal(
+            results['NET'], Series([6.0, 4.0, nan], index=self.data.index, name='NET')
+        )
+        assert_series_equal(
+            results['RATIO'],
+            get_ratio(self.data['ASSETS'] - self.data['DEBT'], self.data['DEBT']),
+            check_names=False,
+        )
+        self.assertEqual(list(results['HALF'][:2]), [3.0, 2.0])
+        self.assertEqual(list(results['ZERO']), [0.0, 0.0, 0.0])
+
+    def test_evaluate_series(self):
+        results = self.registry.evaluate(self.data.iloc[0], ['NET', 'RATIO'])
+        self.assertEqual(results, {'NET': 6.0, 'RATIO': 1.5})
+
+    def test_metrics_defined_in_terms_of_themselves_raise(self):
+        registry = Registry({'A': metric('B') + 1, 'B': metric('A')})
+        with self.assertRaises(ValueError):
+            registry.evaluate(self.data)
+
+    def test_columns_named_like_metrics_are_columns(self):
+        registry = Registry({'DEBT': -Symbols()['DEBT']})
+        self.assertEqual(list(registry.evaluate(self.data)['DEBT']), [-4.0, -0.0, -1.0])
+
+
+class TestStockMetrics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stock = StockPup(ticker='BAC')
+        cls.stock.get_summary()
+
+    def test_selected_metrics_match_all_metrics(self):
+        names = ['RATIO_CASH_DEBT', 'DIFF_CASH_DEBT', 'PER_SHARE_NET_INCOME']
+        selected = self.stock.get_metrics(names)
+        every = self.stock.get_metrics(None)
+        self.assertEqual(list(selected), names)
+        for name in names:
+            assert_series_equal(selected[name], every[name])
+
+    def test_per_share_metrics_match_moving_averages_per_share(self):
+        per_share = self.stock.get_moving_averages_per_share()
+        names = [name for name in per_share.columns if 'DCF' not in name]
+        metrics = self.stock.get_metrics(names)
+        for name in names:
+            assert_series_equal(metrics[name], per_share[name], check_names=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import jadecobra.tester
+import numpy
 import pandas
 import src.stock
 import src.munger
@@ -93,4 +94,42 @@ class TestMungerWithStockPupData(jadecobra.tester.TestCase):
                 'FREE CASH FLOW PER SHARE',
                 'CURRENT RATIO'
             ])
-        )
\ No newline at end of file
+        )
+    def copy_free_munger(self, raw_data):
+        return src.munger.Munger(
+            ticker='TIN',
+            raw_data=raw_data,
+            filename='TIN_quarterly_financial_data.csv',
+            mappings=self.stockpup.columns_mapping(),
+            copy=False,
+        )
+
+    def test_copy_free_munger_renames_columns_like_rename_columns(self):
+        raw_data = self.stockpup.get_raw_data()
+        pandas.testing.assert_index_equal(
+            self.copy_free_munger(raw_data).munged_data.columns,
+            self.munger().rename_columns(
+                dataframe=raw_data, mappings=self.stockpup.columns_mapping()
+            ).columns
+        )
+
+    def test_copy_free_munger_makes_no_copies(self):
+        raw_data = self.stockpup.get_raw_data()
+        munger = self.copy_free_munger(raw_data)
+        self.assertEqual(munger.copies, 0)
+        self.assertEqual(self.munger().copies, 3)
+        self.assertTrue(
+            numpy.shares_memory(
+                munger.munged_data['NET_ASSETS'].to_numpy(),
+                raw_data['Assets'].to_numpy(),
+            )
+        )
+        self.assertEqual(raw_data.columns[0], 'Shares')
+
+    def test_copy_free_munger_converts_2000_new_year_in_index(self):
+        raw_data = src.stock.StockPup(ticker='TIN', analyze=False).get_raw_data()
+        self.assertIn(pandas.Timestamp('2000-01-01'), raw_data.index)
+        index = self.copy_free_munger(raw_data).munged_data.index
+        self.assertNotIn(pandas.Timestamp('2000-01-01'), index)
+        self.assertIn(pandas.Timestamp('1999-12-31'), index)
+        self.assertIn(pandas.Timestamp('2000-01-01'), raw_data.index)
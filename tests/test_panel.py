@@ -0,0 +1,80 @@
+import pickle
+import unittest
+
+from numpy import nanmedian, stack
+from numpy.testing import assert_array_equal
+from pandas.testing import assert_frame_equal
+from src.panel import Panel, build_panel
+from src.stock import Edgar
+from src.utilities import janitor, testing_folder
+
+
+class TestPanel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.folder = testing_folder('panel')
+        build_panel(
+            stock=Edgar, to_folder=cls.folder,
+            filenames=['A.csv', 'AAPL.csv', 'ABT.csv'],
+        )
+        cls.panel = Panel(cls.folder)
+        cls.net_values = {
+            ticker: Edgar(ticker=ticker, analyze=False).get_annual_net_values()
+            for ticker in ('A', 'AAPL', 'ABT')
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.panel
+        janitor(cls.folder)
+
+    def test_panel_is_tickers_by_years_by_metrics(self):
+        self.assertEqual(list(self.panel.tickers), ['A', 'AAPL', 'ABT'])
+        self.assertEqual(
+            self.panel.values.shape,
+            (3, len(self.panel.years), len(self.panel.metrics))
+        )
+
+    def test_get_returns_annual_net_values(self):
+        assert_frame_equal(
+            self.panel.get('AAPL'),
+            self.net_values['AAPL'].sort_index()[self.panel.metrics],
+            check_names=False, check_column_type=False,
+        )
+
+    def test_median_is_median_across_tickers(self):
+        assert_array_equal(
+            self.panel.median(['A', 'AAPL'])[:, 0],
+            nanmedian(stack([
+                self.panel.metric(self.panel.metrics[0], ['A'])[0],
+                self.panel.metric(self.panel.metrics[0], ['AAPL'])[0],
+            ]), axis=0),
+        )
+
+    def test_cross_section_of_a_year(self):
+        year = self.panel.years[-1]
+        assert_array_equal(
+            self.panel.cross_section(year, ['AAPL'])[0],
+            self.panel.values[1, -1],
+        )
+
+    def test_missing_metric_is_a_key_error(self):
+        with self.assertRaises(KeyError):
+            self.panel.metric('NET_NOTHING')
+        with self.assertRaises(KeyError):
+            self.panel.metric('ZZZ_PAST_THE_LAST_METRIC')
+
+    def test_missing_year_is_a_key_error(self):
+        with self.assertRaises(KeyError):
+            self.panel.cross_section(self.panel.years[0] - 1)
+        with self.assertRaises(KeyError):
+            self.panel.cross_section(self.panel.years[-1] + 1)
+
+    def test_pickled_panel_only_holds_folder(self):
+        self.assertLess(len(pickle.dumps(self.panel)), 200)
+        assert_array_equal(pickle.loads(pickle.dumps(self.panel)).values, self.panel.values)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import threading
+import unittest
+
+from pandas.testing import assert_frame_equal, assert_series_equal
+from pandas import Series
+from src.executor import Record, get_jobs
+from src.pipeline import Pipeline
+from src.shared import SharedSummaries
+from src.stock import Edgar, StockPup
+from src.summaries import read_summaries
+from src.utilities import (
+    edgar_folder, janitor, list_filetype, stockpup_folder, testing_folder,
+)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.to_folder = testing_folder('pipeline')
+        self.results = Pipeline(
+            stock=Edgar, source=edgar_folder(), to_folder=self.to_folder,
+            processes=2, queue_depth=2, batch_size=2,
+        ).run(['A.csv', 'AAPL.csv', 'AAC.csv'])
+
+    def tearDown(self):
+        janitor(self.to_folder)
+
+    def test_run_returns_source_and_summary_for_every_file(self):
+        self.assertEqual(
+            sorted(source for source, _ in self.results),
+            [edgar_folder('A.csv'), edgar_folder('AAC.csv'), edgar_folder('AAPL.csv')]
+        )
+
+    def test_run_appends_same_summary_as_stock(self):
+        ticker = dict(self.results)[edgar_folder('A.csv')]
+        assert_series_equal(
+            read_summaries(self.to_folder).loc[ticker],
+            Edgar(ticker='A').get_summary(),
+            check_names=False,
+        )
+
+
+class TestPipelineSources(unittest.TestCase):
+
+    def setUp(self):
+        self.completed = []
+        self.folders = {
+            edgar_folder(): testing_folder('pipeline_edgar'),
+            stockpup_folder(): testing_folder('pipeline_stockpup'),
+        }
+        self.records = Pipeline(
+            processes=2, queue_depth=4, batch_size=2,
+            callbacks=[self.completed.append],
+        ).run_jobs(get_jobs([
+            (Edgar, edgar_folder(), self.folders[edgar_folder()], ['A.csv', 'AAC.csv']),
+            (
+                StockPup, stockpup_folder(), self.folders[stockpup_folder()],
+                ['BAC_quarterly_financial_data.csv'],
+            ),
+        ]))
+
+    def tearDown(self):
+        for folder in self.folders.values():
+            janitor(folder)
+
+    def test_every_completed_record_is_called_back(self):
+        self.assertEqual(
+            sorted(record.filename for record in self.completed),
+            sorted(record.filename for record in self.records),
+        )
+
+    def test_records_of_both_sources_are_written_to_their_folders(self):
+        records = {record.filename: record for record in self.records}
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records['A.csv'].source, edgar_folder())
+        self.assertIsNone(records['A.csv'].error)
+        self.assertGreater(records['A.csv'].seconds, 0)
+        assert_series_equal(
+            read_summaries(self.folders[stockpup_folder()]).loc['BAC'],
+            StockPup(ticker='BAC').get_summary(),
+            check_names=False,
+        )
+        self.assertEqual(
+            list(read_summaries(self.folders[edgar_folder()]).index),
+            [records['A.csv'].ticker, records['AAC.csv'].ticker],
+        )
+
+
+class TestPipelineSharedSummaries(unittest.TestCase):
+
+    def setUp(self):
+        self.to_folder = testing_folder('pipeline_shared')
+        self.pipeline = Pipeline(processes=2, queue_depth=4, shared=True)
+        self.records = self.pipeline.run_jobs(get_jobs([
+            (Edgar, edgar_folder(), self.to_folder, ['A.csv', 'AAPL.csv', 'ACMR.csv']),
+        ]))
+
+    def tearDown(self):
+        self.pipeline.close()
+        janitor(self.to_folder)
+
+    def test_summaries_are_not_returned_in_records(self):
+        self.assertEqual(
+            [record.summary for record in self.records], [None, None, None]
+        )
+
+    def test_shared_summaries_match_stock_summaries(self):
+        summaries = self.pipeline.get_summaries(edgar_folder())
+        self.assertEqual(sorted(summaries.index), ['A', 'AAPL'])
+        assert_series_equal(
+            summaries.loc['AAPL'], Edgar(ticker='AAPL').get_summary(),
+            check_names=False,
+        )
+        assert_frame_equal(read_summaries(self.to_folder), summaries.sort_index())
+
+    def test_summaries_that_do_not_fit_are_read_from_their_record(self):
+        self.pipeline.close()
+        self.pipeline.summaries = SharedSummaries(['A', 'B'], 2)
+        self.pipeline.summaries.write(0, Series({'A': 1.0, 'B': 2.0}))
+        rows = self.pipeline.read_summaries([
+            Record('source', 'X.csv', 'X', None, 0.0, 1, None, 0),
+            Record('source', 'Y.csv', 'Y', Series({'A': 3.0, 'C': 4.0}), 0.0, 1, None, 1),
+        ])
+        self.assertEqual(rows.loc['X', 'B'], 2.0)
+        self.assertEqual(rows.loc['Y', 'C'], 4.0)
+
+
+
+class TestPipelineFailures(unittest.TestCase):
+
+    def setUp(self):
+        self.to_folder = testing_folder('pipeline_failures')
+        self.filenames = list_filetype(in_folder=edgar_folder())[:12]
+
+    def tearDown(self):
+        janitor(self.to_folder)
+
+    def run_in_thread(self, pipeline):
+        """return what run raised, failing when it does not return"""
+        raised = []
+        def run():
+            try:
+                pipeline.run(self.filenames)
+            except Exception as error:
+                raised.append(error)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=120)
+        self.assertFalse(thread.is_alive(), 'run did not return')
+        return raised
+
+    def test_failure_in_completed_stops_the_reader(self):
+        def fail(record):
+            raise RuntimeError('callback failed')
+        raised = self.run_in_thread(Pipeline(
+            stock=Edgar, source=edgar_folder(), to_folder=self.to_folder,
+            processes=1, queue_depth=1, chunksize=1, callbacks=[fail],
+        ))
+        self.assertEqual([str(error) for error in raised], ['callback failed'])
+
+    def test_chunksize_larger_than_queue_depth(self):
+        pipeline = Pipeline(
+            stock=Edgar, source=edgar_folder(), to_folder=self.to_folder,
+            processes=1, queue_depth=2, chunksize=8,
+        )
+        self.assertEqual(self.run_in_thread(pipeline), [])
+        self.assertEqual(len(pipeline.records), len(self.filenames))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import datetime
+import unittest
+
+from numpy import isnan
+from pandas import Series
+from src.price_store import PriceStore
+from src.utilities import janitor, makedir, testing_folder
+
+
+class TestPriceStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = PriceStore(testing_folder('price_store'))
+        self.store.append(Series({'A': 1.0, 'B': 2.0}), '2020-01-01')
+        self.store.append(Series({'A': 3.0, 'C': float('nan')}), '2020-01-03')
+        self.store.append(Series({'A': 4.0, 'C': 5.0}), '2020-01-03')
+        self.store.append(Series({'B': 6.0}), '2020-01-05')
+
+    def tearDown(self):
+        janitor(self.store.folder)
+        janitor(testing_folder('price_pickles'))
+
+    def test_last_price_appended_for_a_day_is_kept(self):
+        frame = self.store.to_frame()
+        self.assertEqual(len(frame), 5)
+        self.assertEqual(frame.loc[('A', '2020-01-03'), 'PRICE'], 4.0)
+
+    def test_as_of_finds_the_latest_price_of_every_ticker(self):
+        prices, dates = self.store.lookup(['A', 'B', 'C', 'Z'], '2020-01-04')
+        self.assertEqual(prices[:3].tolist(), [4.0, 2.0, 5.0])
+        self.assertTrue(isnan(prices['Z']))
+        self.assertEqual(
+            dates[:3].dt.strftime('%d').tolist(), ['03', '01', '03']
+        )
+        self.assertEqual(
+            self.store.as_of(['A', 'B'], ['2020-01-02', '2020-01-05']).tolist(),
+            [1.0, 6.0],
+        )
+        self.assertTrue(self.store.as_of(['A'], '2019-12-31').isna().all())
+
+    def test_compaction_keeps_as_of_answers(self):
+        dates = ['2020-01-03', '2020-01-04', '2020-01-06']
+        expected = [self.store.as_of(['A', 'B', 'C'], date) for date in dates]
+        self.store.compact(before='2020-01-04')
+        self.assertEqual(len(self.store.parts()), 1)
+        self.assertEqual(len(self.store.to_frame()), 4)
+        for date, prices in zip(dates, expected):
+            self.assertEqual(self.store.as_of(['A', 'B', 'C'], date).tolist(), prices.tolist())
+
+    def test_import_pickles(self):
+        folder = testing_folder('price_pickles/')
+        makedir(folder)
+        Series({'A': 7.0, 'D': 8.0}).to_pickle(f'{folder}2020-01-04_current_prices.pkl')
+        Series(dtype='float64').to_frame().to_pickle(f'{folder}2020-01-05_current_prices.pkl')
+        self.assertEqual(self.store.import_pickles(folder), 2)
+        self.assertEqual(
+            self.store.as_of(['A', 'D'], datetime.date(2020, 1, 4)).tolist(), [7.0, 8.0]
+        )
+
+    def test_import_pickles_skips_pickles_imported_before(self):
+        folder = testing_folder('price_pickles/')
+        makedir(folder)
+        Series({'A': 7.0, 'D': 8.0}).to_pickle(f'{folder}2020-01-04_current_prices.pkl')
+        self.assertEqual(self.store.import_pickles(folder), 2)
+        parts = self.store.parts()
+        self.assertEqual(self.store.import_pickles(folder), 0)
+        self.assertEqual(self.store.parts(), parts)
+        Series({'A': 9.0, 'D': 8.0}).to_pickle(f'{folder}2020-01-04_current_prices.pkl')
+        self.assertEqual(self.store.import_pickles(folder), 2)
+        self.assertEqual(self.store.as_of(['A'], '2020-01-04').tolist(), [9.0])
+
+    def test_compacted_part_is_named_after_the_newest_part(self):
+        newest = self.store.parts()[-1]
+        self.store.compact()
+        self.assertEqual(self.store.parts(), [newest])
+        self.store.append(Series({'A': 10.0}), '2020-01-05')
+        self.assertEqual(self.store.as_of(['A'], '2020-01-05').tolist(), [10.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import datetime
+import io
+import threading
+import time
+import unittest
+
+from pandas import DataFrame, MultiIndex, Series, date_range
+from pandas.testing import assert_series_equal
+from src import logger
+from src.price_store import PriceStore
+from src.prices import (
+    StubProvider, YahooProvider, get_current_prices, to_last_prices,
+)
+from src.utilities import janitor, testing_folder
+
+
+def download(tickers):
+    """a download of two days with the close of ticker X at len(X)"""
+    return DataFrame(
+        [[float(len(ticker)) for ticker in tickers]] * 2,
+        index=date_range('2020-01-01', periods=2),
+        columns=MultiIndex.from_product([['Close'], tickers]),
+    )
+
+
+class TestProviders(unittest.TestCase):
+
+    def test_stub_prices_are_deterministic(self):
+        prices = StubProvider({'A': 10.0}).get_prices(['A', 'AAPL', 'A'])
+        self.assertEqual(list(prices.index), ['A', 'AAPL'])
+        self.assertEqual(prices['A'], 10.0)
+        assert_series_equal(prices, StubProvider({'A': 10.0}).get_prices(['A', 'AAPL']))
+
+    def test_last_prices_of_one_or_more_tickers(self):
+        self.assertEqual(
+            to_last_prices(download(['A', 'BB']), ['A', 'BB']).to_dict(),
+            {'A': 1.0, 'BB': 2.0},
+        )
+        single = download(['CCC']).droplevel(1, axis=1)
+        self.assertEqual(to_last_prices(single, ['CCC'])['CCC'], 3.0)
+
+    def test_batches_are_merged(self):
+        batches = []
+        def record(tickers):
+            batches.append(list(tickers))
+            return download(tickers)
+        provider = YahooProvider(batch_size=2, rate=1000, download=record)
+        prices = provider.get_prices(['A', 'BB', 'CCC', 'DDDD', 'EEEEE'])
+        self.assertEqual(sorted(map(len, batches)), [1, 2, 2])
+        self.assertEqual(prices.to_dict(), {'A': 1.0, 'BB': 2.0, 'CCC': 3.0, 'DDDD': 4.0, 'EEEEE': 5.0})
+
+    def test_batches_are_downloaded_concurrently_up_to_a_limit(self):
+        running, most = [0], [0]
+        lock = threading.Lock()
+        def slow(tickers):
+            with lock:
+                running[0] += 1
+                most[0] = max(most[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return download(tickers)
+        YahooProvider(batch_size=1, concurrency=2, rate=1000, download=slow).get_prices(list('ABCDEF'))
+        self.assertEqual(most[0], 2)
+
+    def test_batches_start_at_the_rate_limit(self):
+        starts = []
+        def record(tickers):
+            starts.append(time.monotonic())
+            return download(tickers)
+        YahooProvider(batch_size=1, rate=20, download=record).get_prices(list('ABCD'))
+        self.assertGreaterEqual(min(b - a for a, b in zip(starts, starts[1:])), 0.04)
+
+    def test_failed_batches_are_retried_and_partial_results_kept(self):
+        attempts = {}
+        def flaky(tickers):
+            attempts[tickers[0]] = attempts.get(tickers[0], 0) + 1
+            if tickers[0] == 'BB' and attempts['BB'] < 2 or tickers[0] == 'CCC':
+                raise ConnectionError('no network')
+            return download(tickers)
+        provider = YahooProvider(
+            batch_size=1, rate=1000, retries=2, backoff=0.001, download=flaky,
+        )
+        sink, stream = logger.get_sink(), io.StringIO()
+        logger.configure(sink=logger.StreamSink(stream=stream))
+        try:
+            prices = provider.get_prices(['A', 'BB', 'CCC'])
+            logger.flush()
+        finally:
+            logger.configure(sink=sink)
+        self.assertEqual(prices.to_dict(), {'A': 1.0, 'BB': 2.0})
+        self.assertEqual(attempts, {'A': 1, 'BB': 2, 'CCC': 3})
+        self.assertEqual(provider.failed, ['CCC'])
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(sum(line.startswith('[WARNING]') for line in lines), 4)
+        self.assertTrue(lines[-1].startswith('[ERROR]'))
+        self.assertIn('::Ticker::CCC::Downloading 1 prices::FAILED::', lines[-1])
+
+
+    def test_prices_from_within_a_running_event_loop(self):
+        async def notebook_cell():
+            return YahooProvider(download=download, batch_size=1, rate=1000).get_prices(
+                ['A', 'BB']
+            )
+        self.assertEqual(asyncio.run(notebook_cell()).to_dict(), {'A': 1.0, 'BB': 2.0})
+
+
+class TestGetCurrentPrices(unittest.TestCase):
+
+    def setUp(self):
+        self.store = PriceStore(testing_folder('prices'))
+        self.today = datetime.date(2020, 1, 2)
+
+    def tearDown(self):
+        janitor(self.store.folder)
+
+    def test_prices_are_stored_once_a_day(self):
+        prices = get_current_prices(
+            ['A', 'B'], provider=StubProvider({'A': 1.0, 'B': 2.0}),
+            store=self.store, today=self.today,
+        )
+        self.assertEqual(prices.to_dict(), {'A': 1.0, 'B': 2.0})
+        again = get_current_prices(
+            'A', provider=StubProvider({'A': 5.0}),
+            store=self.store, today=self.today,
+        )
+        self.assertEqual(again.to_dict(), {'A': 1.0})
+
+    def test_prices_stored_today_for_other_tickers_are_kept(self):
+        get_current_prices(
+            ['A'], provider=StubProvider({'A': 1.0}),
+            store=self.store, today=self.today,
+        )
+        get_current_prices(
+            ['B'], provider=StubProvider({'B': 2.0}),
+            store=self.store, today=self.today,
+        )
+        self.assertEqual(
+            self.store.as_of(['A', 'B'], self.today).to_dict(),
+            {'A': 1.0, 'B': 2.0},
+        )
+
+    def test_tickers_without_a_price_today_get_their_last_stored_price(self):
+        self.store.append(Series({'A': 1.0}), '2019-12-30')
+        self.store.append(Series({'B': 2.0}), '2019-12-31')
+        prices = get_current_prices(
+            ['A', 'B', 'C'],
+            provider=YahooProvider(
+                download=lambda tickers: download([ticker for ticker in tickers if ticker != 'A']),
+                rate=1000,
+            ),
+            store=self.store, today=self.today,
+        )
+        self.assertEqual(prices.tolist(), [1.0, 1.0, 1.0])
+        self.assertEqual(
+            self.store.lookup(['A', 'B'], self.today)[1].dt.day.tolist(), [30, 2]
+        )
+
+    def test_last_known_prices_are_used_when_the_provider_has_none(self):
+        self.store.append(Series({'A': 1.0}), '2019-12-30')
+        prices = get_current_prices(
+            ['A', 'B'], provider=YahooProvider(download=lambda tickers: None),
+            store=self.store, today=self.today,
+        )
+        self.assertEqual(prices['A'], 1.0)
+        self.assertEqual(list(prices.index), ['A', 'B'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+
+from numpy import inf, isnan, nan
+from numpy.random import default_rng
+from numpy.testing import assert_allclose, assert_array_equal
+from pandas import DataFrame
+from scipy.stats import trim_mean
+from src.rolling import (
+    rolling_mean, rolling_median, rolling_medians, rolling_trimmed_mean,
+)
+
+
+class TestRollingMedians(unittest.TestCase):
+
+    def setUp(self):
+        self.values = default_rng(0).normal(size=(3, 12, 2))
+        self.values[0, 2, 0] = nan
+        self.values[1, :4, 1] = nan
+        self.values[2, 5, 0] = inf
+        self.values[2, 7, 1] = -inf
+
+    def expected(self, window, min_periods=1, statistic='median'):
+        return [
+            getattr(
+                DataFrame(self.values[ticker])
+                    .rolling(window=window, min_periods=min_periods),
+                statistic,
+            )().to_numpy()
+            for ticker in range(len(self.values))
+        ]
+
+    def test_every_window_matches_pandas(self):
+        windows = [1, 2, 3, 5, 10]
+        result = rolling_medians(self.values, windows, axis=1)
+        self.assertEqual(result.shape, (len(windows), *self.values.shape))
+        for position, window in enumerate(windows):
+            for ticker, expected in enumerate(self.expected(window)):
+                assert_array_equal(result[position, ticker], expected)
+
+    def test_axis_zero(self):
+        result = rolling_medians(self.values[0], [4])
+        assert_array_equal(result[0], self.expected(4)[0])
+
+    def test_windows_of_nan_are_nan(self):
+        result = rolling_medians([nan, nan, 1.0, nan, nan, nan], [2])
+        assert_array_equal(result[0], [nan, nan, 1.0, 1.0, nan, nan])
+
+    def test_min_periods(self):
+        result = rolling_median(self.values, 5, axis=1, min_periods=3)
+        for ticker, expected in enumerate(self.expected(5, min_periods=3)):
+            assert_array_equal(result[ticker], expected)
+
+    def test_min_periods_larger_than_window_raise(self):
+        with self.assertRaises(ValueError):
+            rolling_median(self.values, 3, min_periods=4)
+
+
+class TestRollingMeans(unittest.TestCase):
+
+    def setUp(self):
+        self.values = default_rng(1).normal(size=(14, 3))
+        self.values[2, 0] = nan
+        self.values[:5, 1] = nan
+
+    def test_mean_matches_pandas(self):
+        for min_periods in [0, 1, 3]:
+            assert_allclose(
+                rolling_mean(self.values, 4, min_periods=min_periods),
+                DataFrame(self.values).rolling(4, min_periods=min_periods)
+                    .mean().to_numpy(),
+            )
+
+    def test_mean_leaves_out_infinite_values_like_pandas(self):
+        self.values[6, 0] = inf
+        self.values[9, 2] = -inf
+        assert_allclose(
+            rolling_mean(self.values, 4, min_periods=2),
+            DataFrame(self.values).rolling(4, min_periods=2).mean().to_numpy(),
+        )
+
+    def test_trimmed_mean_leaves_out_infinite_values_like_pandas(self):
+        self.values[6, 0] = inf
+        self.values[9, 2] = -inf
+        assert_allclose(
+            rolling_trimmed_mean(self.values, 4, proportion=0, min_periods=2),
+            DataFrame(self.values).rolling(4, min_periods=2).mean().to_numpy(),
+        )
+        assert_allclose(
+            rolling_trimmed_mean([1, inf, 3, 4], 3, proportion=0), [1, 1, 2, 3.5]
+        )
+
+    def test_mean_along_axis(self):
+        assert_allclose(
+            rolling_mean(self.values.T, 4, axis=1),
+            rolling_mean(self.values, 4).T,
+        )
+
+    def test_trimmed_mean_matches_scipy(self):
+        window, proportion = 6, 0.2
+        result = rolling_trimmed_mean(self.values, window, proportion=proportion)
+        for column in range(self.values.shape[1]):
+            for end in range(len(self.values)):
+                values = self.values[max(0, end - window + 1):end + 1, column]
+                values = values[~isnan(values)]
+                if len(values):
+                    self.assertAlmostEqual(
+                        result[end, column], trim_mean(values, proportion),
+                        places=12,
+                    )
+                else:
+                    self.assertTrue(isnan(result[end, column]))
+
+    def test_trimmed_mean_without_trimming_is_mean(self):
+        assert_allclose(
+            rolling_trimmed_mean(self.values, 5, proportion=0),
+            rolling_mean(self.values, 5),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
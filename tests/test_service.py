@@ -0,0 +1,125 @@
+import json
+import shutil
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from src.service import Analysis, Server
+from src.stock import Edgar
+from src.utilities import janitor, makedir, testing_folder
+
+TICKERS = ['A', 'AAPL', 'ABT']
+FAILING = ['CI', 'AES', 'ADT']
+
+
+class TestService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        makedir(testing_folder('service_source'))
+        makedir(testing_folder('service_sectors'))
+        for ticker in TICKERS + FAILING:
+            shutil.copy2(
+                f'edgar_data/{ticker}.csv',
+                testing_folder(f'service_source/{ticker}.csv'),
+            )
+        with open(testing_folder('service_sectors/xlk.csv'), 'w') as out_file:
+            out_file.write('"Holdings",\n"Symbol","Company Name"\n')
+            out_file.write(''.join(f'"{ticker}","{ticker} Inc."\n' for ticker in TICKERS))
+        cls.server = Server(
+            ('127.0.0.1', 0),
+            analysis=Analysis(
+                sources=[(Edgar, testing_folder('service_source/'))],
+                sectors=testing_folder('service_sectors/'),
+            ),
+            concurrency=2,
+        )
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        janitor(testing_folder('service_source'))
+        janitor(testing_folder('service_sectors'))
+
+    def get(self, path):
+        url = f'http://127.0.0.1:{self.server.server_address[1]}{path}'
+        try:
+            with urllib.request.urlopen(url) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as error:
+            return error.code, json.load(error)
+
+    def test_summary_matches_stock_summary(self):
+        status, body = self.get('/summary/aapl')
+        self.assertEqual(status, 200)
+        summary = Edgar(ticker='AAPL').get_summary()
+        self.assertEqual(list(body['summary']), list(summary.index))
+        self.assertAlmostEqual(
+            body['summary']['AVERAGE_GROWTH'], summary['AVERAGE_GROWTH']
+        )
+
+    def test_repeated_queries_hit_the_warm_stock(self):
+        self.get('/summary/ABT')
+        hits = self.server.analysis.stocks.counts['hits']
+        status, body = self.get('/ratios/ABT')
+        self.assertEqual(status, 200)
+        self.assertIn('RATIO_CASH_DEBT', body['ratios']['average'])
+        self.assertEqual(self.server.analysis.stocks.counts['hits'], hits + 1)
+
+    def test_held_locks_are_not_evicted_with_stocks(self):
+        analysis = Analysis(
+            sources=[(Edgar, testing_folder('service_source/'))], max_stocks=1,
+        )
+        with analysis.get_lock('abt'):
+            for ticker in ['A', 'AAPL']:
+                analysis.get_summary(ticker)
+            self.assertEqual(len(analysis.stocks.items), 1)
+            self.assertTrue(analysis.get_lock('ABT').locked())
+
+    def test_sector_ranking(self):
+        status, body = self.get('/sectors/XLK?by=AVERAGE_RETURNS&top=2')
+        self.assertEqual(status, 200)
+        values = list(body['sectors'].values())
+        self.assertEqual(len(values), 2)
+        self.assertGreaterEqual(values[0], values[1])
+        status, body = self.get('/rank/A?by=AVERAGE_RETURNS')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['rank']['sector'], 'XLK')
+        self.assertEqual(body['rank']['of'], 3)
+
+    def test_unknown_tickers_and_routes_are_not_found(self):
+        self.assertEqual(self.get('/summary/ZZZZZ')[0], 404)
+        self.assertEqual(self.get('/nothing/here')[0], 404)
+        self.assertEqual(self.get('/sectors/XLK?by=NOTHING')[0], 400)
+        self.assertEqual(self.get('/sectors/XLK?top=two')[0], 400)
+
+    def test_files_that_fail_to_summarize_are_server_errors(self):
+        for ticker in FAILING:
+            status, body = self.get(f'/summary/{ticker}')
+            self.assertEqual(status, 500)
+            self.assertIn('Error', body['error'])
+
+    def test_admin_status_reports_memory_and_hit_rates(self):
+        self.get('/summary/A')
+        self.get('/summary/A')
+        status, body = self.get('/admin/status')
+        self.assertEqual(status, 200)
+        self.assertGreater(body['memory']['peak_resident_bytes'], 0)
+        self.assertGreater(body['caches']['stocks']['hit_rate'], 0)
+
+    def test_requests_over_the_concurrency_limit_are_refused(self):
+        slots = self.server.slots
+        self.server.slots, self.server.wait = threading.BoundedSemaphore(1), 0.01
+        self.server.slots.acquire()
+        try:
+            self.assertEqual(self.get('/admin/status')[0], 503)
+        finally:
+            self.server.slots, self.server.wait = slots, 1.0
+
+
+if __name__ == '__main__':
+    unittest.main()
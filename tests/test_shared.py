@@ -0,0 +1,63 @@
+import unittest
+
+from multiprocessing import Pool
+from pandas import DataFrame, Series
+from pandas.testing import assert_frame_equal
+from src.shared import SharedSummaries
+
+
+def write_summary(layout, slot, values):
+    summaries = SharedSummaries.attach(layout)
+    summaries.write(slot, Series(values))
+    summaries.close()
+
+
+class TestSharedSummaries(unittest.TestCase):
+
+    def setUp(self):
+        self.summaries = SharedSummaries(['A', 'B'], 3)
+
+    def tearDown(self):
+        self.summaries.unlink()
+
+    def test_summaries_written_by_workers_are_read_in_the_parent(self):
+        with Pool(2) as pool:
+            pool.starmap(write_summary, [
+                (self.summaries.get_layout(), 0, {'B': 2.0, 'A': 1.0}),
+                (self.summaries.get_layout(), 2, {'A': 3.0, 'B': 4.0}),
+            ])
+        assert_frame_equal(
+            self.summaries.read([0, 1, 2], ['X', 'Y', 'Z']),
+            DataFrame(
+                {'A': [1.0, 3.0], 'B': [2.0, 4.0]}, index=['X', 'Z'],
+            ).rename_axis('SYMBOL'),
+        )
+
+    def test_summaries_with_other_metrics_are_not_written(self):
+        self.assertFalse(self.summaries.write(0, Series({'A': 1.0})))
+        self.assertFalse(self.summaries.write(1, Series({'A': 1.0, 'C': 2.0})))
+        self.assertFalse(
+            self.summaries.write(2, Series({'A': 1.0, 'B': 2.0, 'C': 3.0}))
+        )
+        self.assertEqual(len(self.summaries.read([0, 1, 2], ['X', 'Y', 'Z'])), 0)
+
+    def test_summaries_that_are_not_series_are_not_written(self):
+        self.assertFalse(self.summaries.write(0, None))
+        self.assertFalse(self.summaries.write(1, Series([1.0, 2.0], index=['A', 'A'])))
+        self.assertEqual(len(self.summaries.read([0, 1], ['X', 'Y'])), 0)
+
+    def test_summaries_that_are_not_numbers_are_not_written(self):
+        self.assertFalse(self.summaries.write(0, Series({'A': 'one', 'B': 2.0})))
+        self.assertFalse(self.summaries.write(1, Series({'A': [1.0], 'B': 2.0})))
+        self.assertEqual(len(self.summaries.read([0, 1], ['X', 'Y'])), 0)
+
+    def test_last_slot_of_a_ticker_is_read(self):
+        self.summaries.write(0, Series({'A': 1.0, 'B': 1.0}))
+        self.summaries.write(1, Series({'A': 2.0, 'B': 2.0}))
+        self.assertEqual(
+            list(self.summaries.read([0, 1], ['X', 'X'])['A']), [2.0]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
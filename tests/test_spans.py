@@ -0,0 +1,79 @@
+import unittest
+
+from numpy import percentile
+from numpy.random import default_rng
+from src import spans
+from src.pipeline import Pipeline
+from src.stock import StockPup
+from src.utilities import janitor, stockpup_folder, testing_folder
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_percentiles_are_within_a_bucket_of_exact(self):
+        durations = default_rng(0).lognormal(mean=-6, sigma=1.5, size=5000)
+        histogram = spans.Histogram()
+        for seconds in durations:
+            histogram.add(seconds)
+        for value in spans.PERCENTILES:
+            exact = percentile(durations, value, method='inverted_cdf')
+            self.assertAlmostEqual(
+                histogram.get_percentile(value) / exact, 1, delta=0.05
+            )
+        self.assertEqual(histogram.max, durations.max())
+        self.assertAlmostEqual(histogram.total, durations.sum())
+
+    def test_merged_histograms_count_both(self):
+        first, second = spans.Histogram(), spans.Histogram()
+        first.add(0.001)
+        second.add(0.1)
+        first.merge(second)
+        self.assertEqual((first.count, first.min, first.max), (2, 0.001, 0.1))
+        self.assertEqual(first.get_percentile(99), 0.1)
+
+
+class TestSpans(unittest.TestCase):
+
+    def setUp(self):
+        self.spans = spans.SPANS.get_histograms(by_worker=True)
+        spans.SPANS.clear()
+
+    def tearDown(self):
+        spans.SPANS.histograms = self.spans
+        janitor(testing_folder('spans/'))
+
+    def test_table_by_stage_and_by_worker(self):
+        spans.SPANS.add_all([('a', 0.1), ('b', 0.2)], worker=1)
+        spans.SPANS.add_all([('a', 0.3)], worker=2)
+        table = spans.SPANS.get_table()
+        self.assertEqual(table['COUNT'].to_dict(), {'a': 2, 'b': 1})
+        self.assertAlmostEqual(table.loc['a', 'TOTAL'], 0.4)
+        by_worker = spans.SPANS.get_table(by_worker=True)
+        self.assertEqual(list(by_worker.index), [('a', 1), ('a', 2), ('b', 1)])
+
+    def test_collected_spans_are_not_added(self):
+        timed = spans.timed('timed')(lambda value: value)
+        with spans.collect() as collected:
+            self.assertEqual(timed(1), 1)
+            with spans.span('span'):
+                pass
+        self.assertEqual([stage for stage, _ in collected], ['timed', 'span'])
+        self.assertEqual(spans.SPANS.get_histograms(), {})
+        timed(2)
+        self.assertEqual(spans.SPANS.get_table()['COUNT'].to_dict(), {'timed': 1})
+
+    def test_pipeline_adds_the_spans_of_its_workers(self):
+        Pipeline(
+            stock=StockPup, source=stockpup_folder(),
+            to_folder=testing_folder('spans/'), processes=1,
+        ).run(['AAPL_quarterly_financial_data.csv'])
+        self.assertLessEqual(
+            {'get_raw_data', 'Munger', 'set_numeric_datatypes',
+             'get_net_values', 'get_moving_averages', 'get_summary'},
+            set(spans.SPANS.get_table().index),
+        )
+        by_worker = spans.SPANS.get_table(by_worker=True)
+        self.assertEqual(len(by_worker.loc['get_summary']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
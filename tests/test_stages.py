@@ -0,0 +1,92 @@
+import os
+import threading
+import unittest
+
+from src.stages import Graph, Scheduler, Stage, write_timings
+from src.utilities import janitor, makedir, testing_folder
+
+
+def write(filename, text='data'):
+    with open(filename, 'w') as out_file:
+        out_file.write(text)
+
+
+class TestStages(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = testing_folder('stages/')
+        makedir(f'{self.folder}raw')
+        write(f'{self.folder}raw/a.csv')
+        self.calls = []
+        self.graph = Graph([
+            Stage('report', self.stage('report', 'report'), [f'{self.folder}processed'], [f'{self.folder}report']),
+            Stage('process', self.stage('process', 'processed'), [f'{self.folder}raw'], [f'{self.folder}processed']),
+            Stage('other', self.stage('other', 'other'), [f'{self.folder}raw'], [f'{self.folder}other']),
+        ])
+        self.state_file = f'{self.folder}stages.json'
+
+    def tearDown(self):
+        janitor(self.folder)
+
+    def stage(self, name, output):
+        def function():
+            self.calls.append(name)
+            makedir(f'{self.folder}{output}')
+            write(f'{self.folder}{output}/{name}.txt', str(len(self.calls)))
+        return function
+
+    def run_stages(self, targets=None):
+        return Scheduler(self.graph, state_file=self.state_file).run(targets=targets)
+
+    def test_stages_run_after_the_stages_writing_their_inputs(self):
+        self.assertEqual(self.graph.dependencies['report'], {'process'})
+        self.assertEqual(self.graph.get_order(['report']), ['process', 'report'])
+        timings = self.run_stages()
+        self.assertLess(self.calls.index('process'), self.calls.index('report'))
+        self.assertEqual({timing.status for timing in timings}, {'ran'})
+
+    def test_stages_with_unchanged_inputs_are_skipped(self):
+        self.run_stages()
+        self.calls.clear()
+        self.assertEqual(
+            [timing.status for timing in self.run_stages()],
+            ['skipped', 'skipped', 'skipped'],
+        )
+        write(f'{self.folder}raw/b.csv')
+        self.run_stages(['report'])
+        self.assertEqual(self.calls, ['process', 'report'])
+
+    def test_stages_depending_on_failed_stages_are_blocked(self):
+        def fail():
+            raise ValueError('failed')
+        graph = Graph([
+            Stage('first', fail, [f'{self.folder}raw'], [f'{self.folder}first']),
+            Stage('second', self.stage('second', 'second'), [f'{self.folder}first']),
+        ])
+        self.assertEqual(
+            [timing.status for timing in Scheduler(graph).run()],
+            ['failed', 'blocked'],
+        )
+        self.assertEqual(self.calls, [])
+
+    def test_independent_stages_run_at_the_same_time(self):
+        barrier = threading.Barrier(2, timeout=5)
+        graph = Graph([
+            Stage('one', barrier.wait, [f'{self.folder}raw']),
+            Stage('two', barrier.wait, [f'{self.folder}raw']),
+        ])
+        timings = Scheduler(graph, workers=2).run()
+        self.assertEqual([timing.status for timing in timings], ['ran', 'ran'])
+
+    def test_stages_depending_on_each_other_raise(self):
+        with self.assertRaises(ValueError):
+            Graph([Stage('a', None, ['x'], ['y']), Stage('b', None, ['y'], ['x'])])
+
+    def test_timings_are_appended_to_a_benchmark(self):
+        write_timings(self.run_stages(), folder=self.folder)
+        with open(f'{self.folder}STAGES_benchmark.txt') as in_file:
+            self.assertEqual(len(in_file.readlines()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
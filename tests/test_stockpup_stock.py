@@ -78,6 +78,17 @@ class TestStockPup(jadecobra.tester.TestCase):
             ])
         )
 
+    def test_read_used_columns_pins_float_dtypes(self):
+        self.assertTrue(
+            (STOCK.read_used_columns().dtypes == numpy.float64).all()
+        )
+
+    def test_read_used_columns_only_keeps_mapped_columns(self):
+        self.assertEqual(
+            set(STOCK.read_used_columns().columns.str.upper()),
+            set(STOCK.columns_mapping())
+        )
+
     @unittest.skip
     def test_set_index_creates_multi_index_of_years_and_quarters(self):
         pandas.testing.assert_index_equal(
@@ -256,6 +267,49 @@ class TestStockPup(jadecobra.tester.TestCase):
             STOCK.get_net_values().columns
         )
 
+    def test_aggregate_quarters_matches_groupby(self):
+        net_values = STOCK.get_net_values()
+        pandas.testing.assert_frame_equal(
+            STOCK.get_aggregated_years(),
+            net_values.groupby(level='YEAR').agg(STOCK.aggregate_mappings()),
+            check_exact=True,
+        )
+
+    def test_aggregate_quarters_sums_like_groupby(self):
+        net_values = pandas.DataFrame(
+            {
+                'NET_CASH': [4.0, 3.0, 2.0, 1.0, 5.0, 6.0, 7.0, 8.0],
+                'NET_INCOME': [
+                    0.1, numpy.nan, 0.2, 0.3,
+                    numpy.inf, 1.0, 2.0, 3.0,
+                ],
+            },
+            index=pandas.MultiIndex.from_product(
+                [[2001, 2000], [4, 3, 2, 1]], names=['YEAR', 'QUARTER']
+            ),
+        )
+        mappings = {'NET_CASH': STOCK.fourth_quarter, 'NET_INCOME': sum}
+        pandas.testing.assert_frame_equal(
+            STOCK.aggregate_quarters(net_values, mappings),
+            net_values.groupby(level='YEAR').agg(mappings),
+            check_exact=True,
+        )
+
+    def test_aggregate_quarters_leaves_other_data_to_groupby(self):
+        net_values = STOCK.get_net_values()
+        self.assertIsNone(STOCK.aggregate_quarters(net_values.iloc[:3], STOCK.aggregate_mappings()))
+        self.assertIsNone(STOCK.aggregate_quarters(net_values, {'NET_CASH': max}))
+
+    def test_get_incomplete_years(self):
+        data = STOCK.set_index(STOCK.get_raw_data())
+        self.assertEqual(
+            STOCK.get_incomplete_years(data),
+            [
+                year for year in data.index.levels[0]
+                if len(data.loc[year]) != 4
+            ]
+        )
+
     def test_moving_averages_keep_same_columns_as_net_calculations(self):
         pandas.testing.assert_index_equal(
             STOCK.moving_averages.columns,
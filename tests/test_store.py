@@ -0,0 +1,74 @@
+import unittest
+
+from pandas.testing import assert_frame_equal
+from src.columnar import read_raw_csv
+from src.stock import Stock
+from src.store import Store, build_store
+from src.utilities import janitor, makedir, testing_folder
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        makedir(testing_folder('store_source'))
+        self.files = {
+            'AAA.csv': (
+                'symbol,fiscal_year,doc_type,amend,assets,debt\n'
+                'AAA,2018,10-K,False,4.5,\n'
+                'AAA,2017,10-Q,True,3,1\n'
+            ),
+            'BBB.csv': (
+                'symbol,fiscal_year,doc_type,amend,assets,debt\n'
+                'BBB,2016,10-K,False,1,2\n'
+                'BBB,2015,,False,2,3\n'
+                'BBB,2014,10-K,False,3,4\n'
+            ),
+            'CCC.csv': '',
+        }
+        for filename, contents in self.files.items():
+            with open(self.source(filename), 'w') as out_file:
+                out_file.write(contents)
+        build_store(
+            from_folder=testing_folder('store_source/'),
+            index_col='fiscal_year',
+            to_folder=testing_folder('store'),
+        )
+        self.store = Store(testing_folder('store'))
+
+    def tearDown(self):
+        janitor(testing_folder('store_source'))
+        janitor(testing_folder('store'))
+
+    def source(self, filename):
+        return testing_folder(f'store_source/{filename}')
+
+    def test_store_indexes_every_readable_file(self):
+        self.assertEqual(self.store.tickers(), ['AAA.csv', 'BBB.csv'])
+
+    def test_get_slices_one_file_out_of_the_store(self):
+        for filename in ('AAA.csv', 'BBB.csv'):
+            with self.subTest(filename=filename):
+                assert_frame_equal(
+                    self.store.get(filename),
+                    read_raw_csv(self.source(filename), index_col='fiscal_year')
+                )
+
+    def test_get_returns_requested_columns(self):
+        self.assertEqual(
+            self.store.get('BBB.csv', columns=['debt']).columns.to_list(),
+            ['debt']
+        )
+
+    def test_get_returns_none_for_unknown_or_changed_files(self):
+        self.assertIsNone(self.store.get('CCC.csv'))
+        with open(self.source('AAA.csv'), 'a') as out_file:
+            out_file.write('AAA,2016,10-K,False,1,1\n')
+        self.assertIsNone(self.store.get('AAA.csv'))
+
+    def test_stock_reads_raw_data_from_store(self):
+        stock = Stock(filename='BBB.csv', store=self.store, cache=False)
+        assert_frame_equal(stock.load_raw_data(), self.store.get('BBB.csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
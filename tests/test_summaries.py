@@ -0,0 +1,75 @@
+import unittest
+
+from pandas import DataFrame, Series
+from pandas.testing import assert_frame_equal
+from src.summaries import SummaryTable, read_summaries
+from src.utilities import janitor, testing_folder
+
+
+class TestSummaryTable(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = testing_folder('summaries')
+        self.table = SummaryTable(self.folder)
+        self.table.append([
+            ('A', Series({'AVERAGE_GROWTH': 1.0, 'AVERAGE_RETURNS': 2.0})),
+            ('B', Series({'AVERAGE_GROWTH': 3.0, 'AVERAGE_RETURNS': 4.0})),
+        ])
+        self.table.append([
+            ('C', Series({'AVERAGE_GROWTH': 5.0, 'AVERAGE_SAFETY': 6.0})),
+        ])
+
+    def tearDown(self):
+        janitor(self.folder)
+
+    def expected(self):
+        return DataFrame(
+            {
+                'AVERAGE_GROWTH': [1.0, 3.0, 5.0],
+                'AVERAGE_RETURNS': [2.0, 4.0, None],
+                'AVERAGE_SAFETY': [None, None, 6.0],
+            },
+            index=['A', 'B', 'C'],
+        ).rename_axis('SYMBOL')
+
+    def test_each_batch_is_one_part(self):
+        self.assertEqual(len(self.table.parts()), 2)
+
+    def test_read_returns_one_row_per_ticker(self):
+        assert_frame_equal(read_summaries(self.folder), self.expected())
+
+    def test_latest_summary_replaces_earlier_one(self):
+        self.table.append([('A', Series({'AVERAGE_GROWTH': 7.0}))])
+        self.assertEqual(read_summaries(self.folder).loc['A', 'AVERAGE_GROWTH'], 7.0)
+
+    def test_summaries_that_are_not_series_are_not_written(self):
+        self.assertEqual(self.table.append([('D', DataFrame([[1.0]]))]), [])
+
+    def test_remove_compacts_parts(self):
+        self.table.remove(['B'])
+        self.assertEqual(len(self.table.parts()), 1)
+        assert_frame_equal(
+            read_summaries(self.folder), self.expected().drop(index='B')
+        )
+
+    def test_rows_appended_while_compacting_are_kept(self):
+        read_part = self.table.read_part
+
+        def append_after_reading(filename, columns=None):
+            part = read_part(filename, columns=columns)
+            if filename == self.table.parts()[-1]:
+                self.table.append([('A', Series({'AVERAGE_GROWTH': 9.0}))])
+            return part
+
+        self.table.read_part = append_after_reading
+        self.table.compact()
+        del self.table.read_part
+        self.assertEqual(len(self.table.parts()), 2)
+        self.assertEqual(read_summaries(self.folder).loc['A', 'AVERAGE_GROWTH'], 9.0)
+
+    def test_read_returns_none_when_there_are_no_summaries(self):
+        self.assertIsNone(read_summaries(testing_folder('no_summaries')))
+
+
+if __name__ == '__main__':
+    unittest.main()